@@ -5,10 +5,35 @@ from flask_jwt_extended import JWTManager
 import os
 
 from config import config
+from app.services.analysis.analysis_queue import AnalysisQueue
+from app.services.analytics.workspace_analytics import WorkspaceAnalytics
+from app.services.archiving.discussion_archiver import DiscussionArchiver
+from app.services.auth.password_hasher import PasswordHasher
+from app.services.bias_detection.intervention_engine import InterventionEngine
+from app.services.cache.cache import Cache
+from app.services.database.routing import RoutingSession, tune_engines
+from app.services.projections.opinion_map import OpinionMap
+from app.services.database.sharding import ShardRouter
+from app.services.decisions.quality_metrics import DecisionQualityMetrics
+from app.services.ratelimit.rate_limiter import RateLimiter
+from app.services.writes.group_commit import GroupCommitWriter
+from app.services.events.event_hub import EventHub
 
 # Initialize extensions
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 jwt = JWTManager()
+analysis_queue = AnalysisQueue()
+event_hub = EventHub()
+cache = Cache()
+rate_limiter = RateLimiter()
+password_hasher = PasswordHasher()
+group_commit = GroupCommitWriter()
+shard_router = ShardRouter()
+archiver = DiscussionArchiver()
+workspace_analytics = WorkspaceAnalytics()
+opinion_map = OpinionMap()
+decision_metrics = DecisionQualityMetrics()
+intervention_engine = InterventionEngine()
 
 def create_app(config_name=None):
     if config_name is None:
@@ -18,24 +43,72 @@ def create_app(config_name=None):
     app.config.from_object(config[config_name])
     
     # Initialize extensions with app
+    shard_router.init_app(app)
     db.init_app(app)
+    with app.app_context():
+        tune_engines(db.engines, app.config['SQLITE_PRAGMAS'])
     jwt.init_app(app)
+    analysis_queue.init_app(app)
+    event_hub.init_app(app)
+    cache.init_app(app)
+    rate_limiter.init_app(app, queue_depth=analysis_queue.pending)
+    password_hasher.init_app(app)
+    group_commit.init_app(app)
+    archiver.init_app(app)
+    workspace_analytics.init_app(app)
+    opinion_map.init_app(app)
+    decision_metrics.init_app(app, hub=event_hub)
+    intervention_engine.init_app(app, hub=event_hub)
     CORS(app)
     
     # Register blueprints
     from app.api import api_bp
     app.register_blueprint(api_bp, url_prefix='/api')
     
+    # Register CLI commands
+    from app.cli import register_commands
+    register_commands(app)
+    
     # Import models to ensure they're registered with SQLAlchemy
     from app.models.user import User
     from app.models.workspace import Workspace, WorkspaceMember
     from app.models.discussion import Discussion, Message
-    from app.models.analysis import MessageAnalysis, CognitiveBias
+    from app.models.analysis import MessageAnalysis, CognitiveBias, BiasIntervention
     # Import the decision models from the correct location
-    from app.models.decision import DecisionProcess, DecisionStage, DecisionDocument
+    from app.models.decision import DecisionProcess, DecisionStage, DecisionDocument, DecisionQualityMetric, DecisionQualityState
+    from app.models.event import DiscussionEvent
+    from app.models.shard import WorkspaceShard
+    from app.models.archive import DiscussionArchive
+    
+    # Stamp change sequence numbers used by delta sync
+    from app.services.sync.sequencer import register_sequencer
+    register_sequencer(db.session)
     
     # Create database tables
-    with app.app_context():
-        db.create_all()
+    if app.config['AUTO_CREATE_TABLES']:
+        with app.app_context():
+            init_db()
+    
+    # Build analyzers up front so preloaded gunicorn workers share them copy-on-write
+    if app.config['PRELOAD_ANALYZERS']:
+        analysis_queue.warm_up()
     
     return app
+
+def init_db():
+    """
+    Create missing tables, upgrade tables from earlier releases, install the
+    full-text search index and number legacy rows for delta sync.
+    """
+    db.create_all(bind_key=None)
+    
+    from app.services.database.schema_upgrade import upgrade_schema
+    from app.services.search.message_search import install_search_index
+    from app.services.sync.sequencer import backfill_sequences
+    upgrade_schema(db.engine)
+    install_search_index(db.engine)
+    backfill_sequences(db.engine)
+    
+    for shard in shard_router.shards:
+        shard_router.create_shard_schema(shard)
+        backfill_sequences(shard_router.engine(shard))
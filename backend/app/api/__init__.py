@@ -4,4 +4,4 @@ from flask import Blueprint
 api_bp = Blueprint('api', __name__)
 
 from . import users, workspaces, discussions, analysis
-from . import decision
\ No newline at end of file
+from . import decision, health, analytics
\ No newline at end of file
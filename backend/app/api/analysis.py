@@ -3,15 +3,16 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 import uuid
 from datetime import datetime
 
-from app import db
+from app import db, event_hub, cache
 from app.api import api_bp
 from app.models.discussion import Discussion, Message
-from app.models.analysis import MessageAnalysis, CognitiveBias
+from app.models.analysis import MessageAnalysis, CognitiveBias, BiasIntervention
 from app.models.workspace import WorkspaceMember
-from app.utils.api_config import error_response
+from app.utils.api_config import error_response, rate_limited, replica_reads
 
 @api_bp.route('/messages/<message_id>/analysis', methods=['GET'])
 @jwt_required()
+@replica_reads()
 def get_message_analysis(message_id):
     user_id = get_jwt_identity()
     
@@ -40,16 +41,23 @@ def get_message_analysis(message_id):
 
 @api_bp.route('/biases', methods=['GET'])
 @jwt_required()
+@replica_reads()
 def get_cognitive_biases():
-    biases = CognitiveBias.query.all()
+    # The bias catalogue only changes when it is seeded
+    biases = cache.get_or_set(
+        'biases', 'all',
+        lambda: [bias.to_dict() for bias in CognitiveBias.query.all()],
+        ttl=3600
+    )
     
     return jsonify({
-        "biases": [bias.to_dict() for bias in biases]
+        "biases": biases
     }), 200
 
 # This would normally be a background task
 @api_bp.route('/messages/<message_id>/analyze', methods=['POST'])
 @jwt_required()
+@rate_limited('analyze')
 def analyze_message(message_id):
     user_id = get_jwt_identity()
     
@@ -110,11 +118,14 @@ def analyze_message(message_id):
     db.session.add(analysis)
     db.session.commit()
     
+    event_hub.publish(message.discussion_id, 'analysis.created', analysis.to_dict())
+    
     return jsonify(analysis.to_dict()), 201
 
 
 @api_bp.route('/discussions/<discussion_id>/analysis', methods=['GET'])
 @jwt_required()
+@replica_reads()
 def get_discussion_analysis(discussion_id):
     user_id = get_jwt_identity()
     
@@ -182,6 +193,71 @@ def get_discussion_analysis(discussion_id):
         "analyses": analyses
     }), 200
 
+@api_bp.route('/discussions/<discussion_id>/interventions', methods=['GET'])
+@jwt_required()
+@replica_reads()
+def get_bias_interventions(discussion_id):
+    user_id = get_jwt_identity()
+    
+    # Check if discussion exists
+    discussion = Discussion.query.get(discussion_id)
+    if not discussion:
+        return error_response("Discussion not found", 404)
+    
+    # Check if user is a member of the workspace
+    member = WorkspaceMember.query.filter_by(
+        workspace_id=discussion.workspace_id, 
+        user_id=user_id
+    ).first()
+    
+    if not member:
+        return error_response("Access denied", 403)
+    
+    query = BiasIntervention.query.filter_by(discussion_id=discussion_id)
+    if request.args.get('unacknowledged', 'false').lower() == 'true':
+        query = query.filter(BiasIntervention.acknowledged_at.is_(None))
+    interventions = query.order_by(BiasIntervention.created_at.desc()).limit(100).all()
+    
+    return jsonify({
+        "interventions": [intervention.to_dict() for intervention in interventions]
+    }), 200
+
+@api_bp.route('/interventions/<intervention_id>', methods=['PATCH'])
+@jwt_required()
+@rate_limited('write')
+def update_bias_intervention(intervention_id):
+    user_id = get_jwt_identity()
+    data = request.get_json()
+    
+    if not data or data.get('status') not in ('displayed', 'acknowledged'):
+        return error_response("Status must be 'displayed' or 'acknowledged'", 400)
+    
+    intervention = BiasIntervention.query.get(intervention_id)
+    if not intervention:
+        return error_response("Intervention not found", 404)
+    
+    discussion = Discussion.query.get(intervention.discussion_id)
+    
+    # Check if user is a member of the workspace
+    member = WorkspaceMember.query.filter_by(
+        workspace_id=discussion.workspace_id, 
+        user_id=user_id
+    ).first()
+    
+    if not member:
+        return error_response("Access denied", 403)
+    
+    now = datetime.utcnow()
+    if not intervention.displayed_at:
+        intervention.displayed_at = now
+    if data['status'] == 'acknowledged' and not intervention.acknowledged_at:
+        intervention.acknowledged_at = now
+    
+    db.session.commit()
+    event_hub.publish(discussion.id, 'intervention.updated', intervention.to_dict())
+    
+    return jsonify(intervention.to_dict()), 200
+
 # Seed database with common cognitive biases
 @api_bp.route('/seed/biases', methods=['POST'])
 @jwt_required()
@@ -241,6 +317,7 @@ def seed_biases():
         db.session.add(bias)
     
     db.session.commit()
+    cache.invalidate('biases')
     
     return jsonify({
         "message": "Biases seeded successfully",
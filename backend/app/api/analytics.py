@@ -0,0 +1,104 @@
+from datetime import datetime, timezone
+
+from flask import Response, jsonify, request
+from flask_jwt_extended import jwt_required, get_jwt_identity
+
+from app import opinion_map, workspace_analytics
+from app.api import api_bp
+from app.models.discussion import Discussion
+from app.models.workspace import WorkspaceMember
+from app.services.analytics.workspace_analytics import BUCKETS, METRICS
+from app.services.projections.opinion_map import encode_points
+from app.utils.api_config import error_response, rate_limited, replica_reads, restores_archives
+
+@api_bp.route('/workspaces/<workspace_id>/analytics', methods=['GET'])
+@jwt_required()
+@rate_limited('analytics')
+@restores_archives()
+@replica_reads()
+def get_workspace_analytics(workspace_id):
+    user_id = get_jwt_identity()
+    
+    member = WorkspaceMember.query.filter_by(
+        workspace_id=workspace_id, 
+        user_id=user_id
+    ).first()
+    
+    if not member:
+        return error_response("Access denied", 403)
+    
+    metric = request.args.get('metric', 'bias_frequency')
+    bucket = request.args.get('bucket', 'week')
+    if metric not in METRICS:
+        return error_response(f"metric must be one of: {', '.join(METRICS)}", 400)
+    if bucket not in BUCKETS:
+        return error_response(f"bucket must be one of: {', '.join(BUCKETS)}", 400)
+    
+    try:
+        since = _parse_time(request.args.get('since'))
+        until = _parse_time(request.args.get('until'))
+    except ValueError:
+        return error_response("since and until must be ISO 8601 timestamps", 400)
+    
+    series = workspace_analytics.series(workspace_id, metric, bucket, since, until)
+    
+    return jsonify({
+        "workspace_id": workspace_id,
+        "metric": metric,
+        "bucket": bucket,
+        "series": series
+    }), 200
+
+@api_bp.route('/discussions/<discussion_id>/opinion-map', methods=['GET'])
+@jwt_required()
+@replica_reads()
+def get_opinion_map(discussion_id):
+    user_id = get_jwt_identity()
+    
+    discussion = Discussion.query.get(discussion_id)
+    if not discussion:
+        return error_response("Discussion not found", 404)
+    
+    member = WorkspaceMember.query.filter_by(
+        workspace_id=discussion.workspace_id, 
+        user_id=user_id
+    ).first()
+    
+    if not member:
+        return error_response("Access denied", 403)
+    
+    level = request.args.get('level', 'message')
+    if level not in ('message', 'participant'):
+        return error_response("level must be 'message' or 'participant'", 400)
+    
+    points = opinion_map.project(discussion)
+    if level == 'participant':
+        ids, coords = opinion_map.participants(points)
+    else:
+        ids, coords = points['ids'], points['coords']
+    
+    # Binary: header, float32 x/y pairs, then IDs; see encode_points
+    if request.args.get('format') == 'binary':
+        return Response(
+            encode_points(ids, coords, points['version']),
+            mimetype='application/octet-stream'
+        )
+    
+    return jsonify({
+        "discussion_id": discussion_id,
+        "level": level,
+        "version": points['version'],
+        "explained_variance": points['explained_variance'],
+        "ids": ids,
+        # Flat [x0, y0, x1, y1, ...] so clients can wrap it in a Float32Array
+        "coords": coords.reshape(-1).tolist()
+    }), 200
+
+def _parse_time(value):
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value)
+    # Stored timestamps are naive UTC
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
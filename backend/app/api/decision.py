@@ -1,15 +1,20 @@
 # app/api/decision.py
-from flask import jsonify, request
+from flask import current_app, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime
+from sqlalchemy.exc import IntegrityError
 
-from app import db
+from app import db, decision_metrics, event_hub
 from app.api import api_bp
 from app.models.discussion import Discussion
 from app.models.workspace import WorkspaceMember
 from app.models.decision import DecisionProcess, DecisionStage, DecisionDocument
+from app.services.documents.version_store import DocumentVersionStore
 from app.utils.api_config import error_response
 
+def _version_store():
+    return DocumentVersionStore(snapshot_interval=current_app.config['DOCUMENT_SNAPSHOT_INTERVAL'])
+
 @api_bp.route('/discussions/<discussion_id>/decision-process', methods=['GET'])
 @jwt_required()
 def get_decision_process(discussion_id):
@@ -130,6 +135,10 @@ def create_decision_process(discussion_id):
     for stage in stages:
         db.session.add(stage)
     
+    # Metrics updates claim this row, so concurrent first updates never race to create it
+    from app.models.decision import DecisionQualityState
+    db.session.add(DecisionQualityState(process.id))
+    
     db.session.commit()
     
     print(f"Created decision process with ID {process.id}")
@@ -175,6 +184,7 @@ def update_decision_stage(stage_id):
         stage.completed_at = datetime.utcnow()
     
     db.session.commit()
+    event_hub.publish(discussion.id, 'stage.updated', stage.to_dict())
     
     return jsonify(stage.to_dict()), 200
 
@@ -200,8 +210,8 @@ def get_decision_document(process_id):
     if not member:
         return error_response("Access denied", 403)
     
-    # Get the latest document
-    document = DecisionDocument.query.filter_by(process_id=process_id).order_by(DecisionDocument.version.desc()).first()
+    # Get the latest document; it always holds its full content
+    document = _version_store().latest(process_id)
     
     if not document:
         return error_response("Document not found", 404)
@@ -236,16 +246,11 @@ def create_decision_document(process_id):
     if not member:
         return error_response("Access denied", 403)
     
-    # Create the document
-    document = DecisionDocument(
-        process_id=process_id,
-        title=data['title'],
-        content=data['content'],
-        version=1
-    )
-    
-    db.session.add(document)
-    db.session.commit()
+    # Create the document, or a new version if one already exists
+    try:
+        document = _version_store().commit_version(process_id, data['title'], data['content'])
+    except IntegrityError:
+        return error_response("The document is being edited concurrently, please retry", 409)
     
     return jsonify({
         "document": document.to_dict()
@@ -278,21 +283,144 @@ def update_decision_document(document_id):
     if not member:
         return error_response("Access denied", 403)
     
-    # Create a new version
-    new_document = DecisionDocument(
-        process_id=document.process_id,
-        title=data['title'],
-        content=data['content'],
-        version=document.version + 1
-    )
-    
-    db.session.add(new_document)
-    db.session.commit()
+    # Create a new version on top of the latest one
+    try:
+        new_document = _version_store().commit_version(document.process_id, data['title'], data['content'])
+    except IntegrityError:
+        return error_response("The document is being edited concurrently, please retry", 409)
     
     return jsonify({
         "document": new_document.to_dict()
     }), 200
     
+@api_bp.route('/decision-processes/<process_id>/document/versions', methods=['GET'])
+@jwt_required()
+def get_decision_document_versions(process_id):
+    user_id = get_jwt_identity()
+    
+    # Get the process
+    process = DecisionProcess.query.get(process_id)
+    if not process:
+        return error_response("Process not found", 404)
+    
+    # Get the discussion
+    discussion = Discussion.query.get(process.discussion_id)
+    
+    # Check if user is a member of the workspace
+    member = WorkspaceMember.query.filter_by(
+        workspace_id=discussion.workspace_id, 
+        user_id=user_id
+    ).first()
+    
+    if not member:
+        return error_response("Access denied", 403)
+    
+    versions = DecisionDocument.query.filter_by(process_id=process_id).order_by(DecisionDocument.version).all()
+    
+    return jsonify({
+        "versions": [v.version_summary() for v in versions]
+    }), 200
+
+@api_bp.route('/decision-processes/<process_id>/document/versions/<int:version>', methods=['GET'])
+@jwt_required()
+def get_decision_document_version(process_id, version):
+    user_id = get_jwt_identity()
+    
+    # Get the process
+    process = DecisionProcess.query.get(process_id)
+    if not process:
+        return error_response("Process not found", 404)
+    
+    # Get the discussion
+    discussion = Discussion.query.get(process.discussion_id)
+    
+    # Check if user is a member of the workspace
+    member = WorkspaceMember.query.filter_by(
+        workspace_id=discussion.workspace_id, 
+        user_id=user_id
+    ).first()
+    
+    if not member:
+        return error_response("Access denied", 403)
+    
+    document = _version_store().content_at(process_id, version)
+    
+    if not document:
+        return error_response("Document version not found", 404)
+    
+    return jsonify({
+        "document": document.to_dict()
+    }), 200
+
+@api_bp.route('/decision-processes/<process_id>/document/diff', methods=['GET'])
+@jwt_required()
+def get_decision_document_diff(process_id):
+    user_id = get_jwt_identity()
+    
+    from_version = request.args.get('from', type=int)
+    to_version = request.args.get('to', type=int)
+    
+    if from_version is None or to_version is None:
+        return error_response("Both 'from' and 'to' versions are required", 400)
+    
+    # Get the process
+    process = DecisionProcess.query.get(process_id)
+    if not process:
+        return error_response("Process not found", 404)
+    
+    # Get the discussion
+    discussion = Discussion.query.get(process.discussion_id)
+    
+    # Check if user is a member of the workspace
+    member = WorkspaceMember.query.filter_by(
+        workspace_id=discussion.workspace_id, 
+        user_id=user_id
+    ).first()
+    
+    if not member:
+        return error_response("Access denied", 403)
+    
+    diff = _version_store().diff(process_id, from_version, to_version)
+    
+    if diff is None:
+        return error_response("Document version not found", 404)
+    
+    return jsonify({
+        "from": from_version,
+        "to": to_version,
+        "diff": diff
+    }), 200
+
+@api_bp.route('/decision-processes/<process_id>/metrics', methods=['GET'])
+@jwt_required()
+def get_decision_metrics(process_id):
+    user_id = get_jwt_identity()
+    
+    # Get the process
+    process = DecisionProcess.query.get(process_id)
+    if not process:
+        return error_response("Process not found", 404)
+    
+    # Get the discussion
+    discussion = Discussion.query.get(process.discussion_id)
+    
+    # Check if user is a member of the workspace
+    member = WorkspaceMember.query.filter_by(
+        workspace_id=discussion.workspace_id, 
+        user_id=user_id
+    ).first()
+    
+    if not member:
+        return error_response("Access denied", 403)
+    
+    metrics = decision_metrics.metrics(process)
+    
+    return jsonify({
+        "process_id": process_id,
+        "metrics": {metric.metric_name: metric.metric_value for metric in metrics},
+        "calculated_at": max(metric.calculated_at for metric in metrics).isoformat() if metrics else None
+    }), 200
+    
 @api_bp.route('/test-decision', methods=['GET'])
 def test_decision():
     """Test endpoint to verify decision module is loaded."""
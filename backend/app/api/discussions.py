@@ -1,14 +1,115 @@
-from flask import jsonify, request
+import uuid
+from concurrent.futures import TimeoutError
+from datetime import datetime
+
+from flask import Response, current_app, jsonify, request, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
 
-from app import db
+from app import db, analysis_queue, event_hub, group_commit
 from app.api import api_bp
 from app.models.discussion import Discussion, Message
 from app.models.workspace import WorkspaceMember
-from app.utils.api_config import error_response
+from app.services.exporting.discussion_exporter import DiscussionExporter, EXPORT_FORMATS
+from app.services.importing.discussion_importer import DiscussionImporter
+from app.services.database.sharding import WorkspaceMoving
+from app.services.documents.version_store import DocumentVersionStore
+from app.services.events.event_hub import issue_stream_ticket, read_stream_ticket
+from app.services.search.message_search import MessageSearch
+from app.services.snapshots.discussion_snapshot import DiscussionSnapshot
+from app.services.sync.delta_sync import DeltaSync
+from app.services.threads.thread_builder import ThreadBuilder
+from app.utils.api_config import error_response, rate_limited, replica_reads, restores_archives
+
+MAX_THREAD_DEPTH = 50
+MAX_THREAD_PAGE_SIZE = 200
+MAX_SEARCH_PAGE_SIZE = 100
+MAX_SYNC_PAGE_SIZE = 1000
+MAX_SNAPSHOT_PAGE_SIZE = 200
+
+def _thread_builder():
+    max_depth = min(max(request.args.get('max_depth', 10, type=int), 0), MAX_THREAD_DEPTH)
+    limit = min(max(request.args.get('limit', 50, type=int), 1), MAX_THREAD_PAGE_SIZE)
+    return ThreadBuilder(max_depth=max_depth, limit=limit)
+
+def _export_response(filename, discussion_id=None, workspace_id=None):
+    export_format = request.args.get('format', 'ndjson')
+    
+    if export_format not in EXPORT_FORMATS:
+        return error_response("Unsupported export format", 400)
+    
+    exporter = DiscussionExporter(
+        discussion_id=discussion_id,
+        workspace_id=workspace_id,
+        chunk_size=current_app.config['EXPORT_CHUNK_SIZE']
+    )
+    
+    return Response(
+        stream_with_context(exporter.stream(export_format)),
+        mimetype=EXPORT_FORMATS[export_format],
+        headers={'Content-Disposition': f'attachment; filename={filename}.{export_format}'}
+    )
+
+def _post_message_grouped(discussion_id, user_id, data):
+    now = datetime.utcnow()
+    message_id = str(uuid.uuid4())
+    future = group_commit.submit({
+        'id': message_id,
+        'discussion_id': discussion_id,
+        'parent_id': data.get('parent_id'),
+        'user_id': user_id,
+        'content': data['content'],
+        'created_at': now,
+        'updated_at': now
+    })
+    
+    # Don't hold this request's transaction open while the batch commits
+    db.session.rollback()
+    
+    try:
+        message = future.result(timeout=current_app.config['GROUP_COMMIT_TIMEOUT'])
+    except WorkspaceMoving:
+        # Refused before anything was written, so retrying is safe
+        response = error_response("Workspace is being moved, please retry shortly", 503)
+        response.headers['Retry-After'] = '2'
+        return response
+    except TimeoutError:
+        # The batch may still commit, so a retry could post the message twice.
+        # Hand out its ID instead; it arrives as message.created if it lands
+        return jsonify({
+            "id": message_id,
+            "discussion_id": discussion_id,
+            "status": "pending"
+        }), 202
+    except Exception:
+        return error_response("Message could not be saved", 500)
+    
+    return jsonify(message), 201
+
+def _search_results(discussion_id=None, workspace_id=None):
+    query = request.args.get('q', '').strip()
+    
+    if not query:
+        return error_response("Search query is required", 400)
+    
+    limit = min(max(request.args.get('limit', 20, type=int), 1), MAX_SEARCH_PAGE_SIZE)
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    
+    results = MessageSearch(limit=limit, offset=offset).search(
+        query,
+        discussion_id=discussion_id,
+        workspace_id=workspace_id
+    )
+    
+    return jsonify({
+        "query": query,
+        "limit": limit,
+        "offset": offset,
+        "results": results
+    }), 200
 
 @api_bp.route('/workspaces/<workspace_id>/discussions', methods=['GET'])
 @jwt_required()
+@replica_reads()
 def get_discussions(workspace_id):
     user_id = get_jwt_identity()
     
@@ -78,8 +179,35 @@ def get_discussion(discussion_id):
     
     return jsonify(discussion.to_dict()), 200
 
+@api_bp.route('/discussions/<discussion_id>/snapshot', methods=['GET'])
+@jwt_required()
+@replica_reads()
+def get_discussion_snapshot(discussion_id):
+    user_id = get_jwt_identity()
+    limit = min(max(request.args.get('limit', 50, type=int), 1), MAX_SNAPSHOT_PAGE_SIZE)
+    
+    # Discussions may live on a workspace shard and memberships on the primary,
+    # so these stay two lookups
+    discussion = Discussion.query.get(discussion_id)
+    
+    if not discussion:
+        return error_response("Discussion not found", 404)
+    
+    member = WorkspaceMember.query.filter_by(
+        workspace_id=discussion.workspace_id, 
+        user_id=user_id
+    ).first()
+    
+    if not member:
+        return error_response("Access denied", 403)
+    
+    version_store = DocumentVersionStore(snapshot_interval=current_app.config['DOCUMENT_SNAPSHOT_INTERVAL'])
+    
+    return jsonify(DiscussionSnapshot(discussion, version_store, limit).build()), 200
+
 @api_bp.route('/discussions/<discussion_id>/messages', methods=['GET'])
 @jwt_required()
+@replica_reads()
 def get_messages(discussion_id):
     user_id = get_jwt_identity()
     
@@ -105,6 +233,7 @@ def get_messages(discussion_id):
 
 @api_bp.route('/discussions/<discussion_id>/messages', methods=['POST'])
 @jwt_required()
+@rate_limited('write')
 def post_message(discussion_id):
     user_id = get_jwt_identity()
     data = request.get_json()
@@ -126,6 +255,9 @@ def post_message(discussion_id):
     if not member:
         return error_response("Access denied", 403)
     
+    if current_app.config['GROUP_COMMIT_ENABLED']:
+        return _post_message_grouped(discussion_id, user_id, data)
+    
     message = Message(
         discussion_id=discussion_id,
         user_id=user_id,
@@ -136,7 +268,268 @@ def post_message(discussion_id):
     db.session.add(message)
     db.session.commit()
     
+    event_hub.publish(discussion_id, 'message.created', message.to_dict())
+    
     # Here we would trigger message analysis in the background
     # For now, we'll just return the message
     
     return jsonify(message.to_dict()), 201
+
+@api_bp.route('/discussions/<discussion_id>/thread', methods=['GET'])
+@jwt_required()
+@replica_reads()
+def get_discussion_thread(discussion_id):
+    user_id = get_jwt_identity()
+    
+    discussion = Discussion.query.get(discussion_id)
+    
+    if not discussion:
+        return error_response("Discussion not found", 404)
+    
+    # Check if user is a member of the workspace
+    member = WorkspaceMember.query.filter_by(
+        workspace_id=discussion.workspace_id, 
+        user_id=user_id
+    ).first()
+    
+    if not member:
+        return error_response("Access denied", 403)
+    
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    
+    return jsonify(_thread_builder().discussion_thread(discussion_id, offset=offset)), 200
+
+@api_bp.route('/messages/<message_id>/thread', methods=['GET'])
+@jwt_required()
+@replica_reads()
+def get_message_thread(message_id):
+    user_id = get_jwt_identity()
+    
+    message = Message.query.get(message_id)
+    
+    if not message:
+        return error_response("Message not found", 404)
+    
+    # Check if user is a member of the workspace
+    member = WorkspaceMember.query.filter_by(
+        workspace_id=message.discussion.workspace_id, 
+        user_id=user_id
+    ).first()
+    
+    if not member:
+        return error_response("Access denied", 403)
+    
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    
+    return jsonify(_thread_builder().message_thread(message_id, offset=offset)), 200
+
+@api_bp.route('/discussions/<discussion_id>/search', methods=['GET'])
+@jwt_required()
+@rate_limited('search')
+@replica_reads()
+def search_discussion_messages(discussion_id):
+    user_id = get_jwt_identity()
+    
+    discussion = Discussion.query.get(discussion_id)
+    
+    if not discussion:
+        return error_response("Discussion not found", 404)
+    
+    # Check if user is a member of the workspace
+    member = WorkspaceMember.query.filter_by(
+        workspace_id=discussion.workspace_id, 
+        user_id=user_id
+    ).first()
+    
+    if not member:
+        return error_response("Access denied", 403)
+    
+    return _search_results(discussion_id=discussion_id)
+
+@api_bp.route('/workspaces/<workspace_id>/search', methods=['GET'])
+@jwt_required()
+@rate_limited('search')
+@restores_archives()
+@replica_reads()
+def search_workspace_messages(workspace_id):
+    user_id = get_jwt_identity()
+    
+    # Check if user is a member of the workspace
+    member = WorkspaceMember.query.filter_by(
+        workspace_id=workspace_id, 
+        user_id=user_id
+    ).first()
+    
+    if not member:
+        return error_response("Access denied", 403)
+    
+    return _search_results(workspace_id=workspace_id)
+
+@api_bp.route('/discussions/<discussion_id>/import', methods=['POST'])
+@jwt_required()
+@rate_limited('write')
+def import_messages(discussion_id):
+    user_id = get_jwt_identity()
+    
+    discussion = Discussion.query.get(discussion_id)
+    
+    if not discussion:
+        return error_response("Discussion not found", 404)
+    
+    # Check if current user is an admin of the workspace
+    member = WorkspaceMember.query.filter_by(
+        workspace_id=discussion.workspace_id, 
+        user_id=user_id,
+        role='admin'
+    ).first()
+    
+    if not member:
+        return error_response("Only workspace admins can import messages", 403)
+    
+    importer = DiscussionImporter(
+        discussion_id,
+        batch_size=current_app.config['IMPORT_BATCH_SIZE'],
+        analysis_queue=analysis_queue
+    )
+    
+    # Read the NDJSON body line by line instead of buffering it
+    stats = importer.import_lines(request.stream)
+    
+    return jsonify(stats), 201
+
+@api_bp.route('/discussions/<discussion_id>/export', methods=['GET'])
+@jwt_required()
+@rate_limited('export')
+@replica_reads()
+def export_discussion(discussion_id):
+    user_id = get_jwt_identity()
+    
+    discussion = Discussion.query.get(discussion_id)
+    
+    if not discussion:
+        return error_response("Discussion not found", 404)
+    
+    # Check if user is a member of the workspace
+    member = WorkspaceMember.query.filter_by(
+        workspace_id=discussion.workspace_id, 
+        user_id=user_id
+    ).first()
+    
+    if not member:
+        return error_response("Access denied", 403)
+    
+    return _export_response(f'discussion-{discussion_id}', discussion_id=discussion_id)
+
+@api_bp.route('/workspaces/<workspace_id>/export', methods=['GET'])
+@jwt_required()
+@rate_limited('export')
+@restores_archives()
+@replica_reads()
+def export_workspace(workspace_id):
+    user_id = get_jwt_identity()
+    
+    # Check if user is a member of the workspace
+    member = WorkspaceMember.query.filter_by(
+        workspace_id=workspace_id, 
+        user_id=user_id
+    ).first()
+    
+    if not member:
+        return error_response("Access denied", 403)
+    
+    return _export_response(f'workspace-{workspace_id}', workspace_id=workspace_id)
+
+@api_bp.route('/discussions/<discussion_id>/events/ticket', methods=['POST'])
+@jwt_required()
+def create_events_ticket(discussion_id):
+    user_id = get_jwt_identity()
+    
+    discussion = Discussion.query.get(discussion_id)
+    
+    if not discussion:
+        return error_response("Discussion not found", 404)
+    
+    # Check if user is a member of the workspace
+    member = WorkspaceMember.query.filter_by(
+        workspace_id=discussion.workspace_id, 
+        user_id=user_id
+    ).first()
+    
+    if not member:
+        return error_response("Access denied", 403)
+    
+    return jsonify({
+        "ticket": issue_stream_ticket(current_app.config['SECRET_KEY'], user_id, discussion_id),
+        "expires_in": current_app.config['EVENT_TICKET_TTL']
+    }), 201
+
+@api_bp.route('/discussions/<discussion_id>/events', methods=['GET'])
+@jwt_required(optional=True)
+def subscribe_discussion_events(discussion_id):
+    # Browsers' EventSource can't set headers; they connect with ?ticket= from the ticket endpoint
+    user_id = get_jwt_identity()
+    if user_id is None and request.args.get('ticket'):
+        user_id = read_stream_ticket(
+            current_app.config['SECRET_KEY'],
+            request.args['ticket'],
+            discussion_id,
+            current_app.config['EVENT_TICKET_TTL']
+        )
+    
+    if user_id is None:
+        return error_response("Authentication required", 401)
+    
+    discussion = Discussion.query.get(discussion_id)
+    
+    if not discussion:
+        return error_response("Discussion not found", 404)
+    
+    # Check if user is a member of the workspace
+    member = WorkspaceMember.query.filter_by(
+        workspace_id=discussion.workspace_id, 
+        user_id=user_id
+    ).first()
+    
+    if not member:
+        return error_response("Access denied", 403)
+    
+    heartbeat = current_app.config['EVENT_HEARTBEAT_INTERVAL']
+    subscription = event_hub.subscribe(discussion_id)
+    
+    # The generator runs after the request context is gone, so it must not touch the DB
+    def stream():
+        with subscription:
+            yield "retry: 3000\n\n"
+            for event in subscription.events(heartbeat):
+                yield event.to_sse() if event is not None else ": keep-alive\n\n"
+    
+    return Response(
+        stream(),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@api_bp.route('/discussions/<discussion_id>/sync', methods=['GET'])
+@jwt_required()
+@replica_reads()
+def sync_discussion(discussion_id):
+    user_id = get_jwt_identity()
+    
+    discussion = Discussion.query.get(discussion_id)
+    
+    if not discussion:
+        return error_response("Discussion not found", 404)
+    
+    # Check if user is a member of the workspace
+    member = WorkspaceMember.query.filter_by(
+        workspace_id=discussion.workspace_id, 
+        user_id=user_id
+    ).first()
+    
+    if not member:
+        return error_response("Access denied", 403)
+    
+    cursor = max(request.args.get('cursor', 0, type=int), 0)
+    limit = min(max(request.args.get('limit', 500, type=int), 1), MAX_SYNC_PAGE_SIZE)
+    
+    return jsonify(DeltaSync(discussion, limit=limit).changes_since(cursor)), 200
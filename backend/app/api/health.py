@@ -0,0 +1,43 @@
+from flask import current_app, jsonify
+from flask_jwt_extended import jwt_required
+from sqlalchemy import text
+
+from app import db, analysis_queue, cache
+from app.api import api_bp
+
+@api_bp.route('/health/live', methods=['GET'])
+def liveness():
+    return jsonify({"status": "alive"}), 200
+
+@api_bp.route('/health/ready', methods=['GET'])
+def readiness():
+    # Analyzers only gate readiness when the deployment is meant to preload them
+    if analysis_queue.is_warm:
+        analyzers = "warm"
+    elif current_app.config['PRELOAD_ANALYZERS']:
+        analyzers = "cold"
+    else:
+        analyzers = "lazy"
+    
+    checks = {
+        "analyzers": analyzers,
+        "database": "ok"
+    }
+    
+    try:
+        db.session.execute(text('SELECT 1'))
+    except Exception:
+        checks["database"] = "unavailable"
+    
+    ready = checks["analyzers"] != "cold" and checks["database"] == "ok"
+    
+    return jsonify({
+        "status": "ready" if ready else "not_ready",
+        "checks": checks
+    }), 200 if ready else 503
+
+@api_bp.route('/cache/stats', methods=['GET'])
+@jwt_required()
+def cache_stats():
+    # Counters are per worker process; entry counts come from the shared backend
+    return jsonify(cache.stats_dict()), 200
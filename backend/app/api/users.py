@@ -1,10 +1,20 @@
 from flask import jsonify, request
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+from sqlalchemy.exc import IntegrityError
 
-from app import db
+from app import db, shard_router
 from app.api import api_bp
 from app.models.user import User
-from app.utils.api_config import error_response
+from app.services.auth.password_hasher import HashingOverloaded
+from app.utils.api_config import error_response, replica_reads
+
+MAX_USER_PAGE_SIZE = 200
+MAX_USER_SEARCH_RESULTS = 50
+
+def _hashing_overloaded():
+    response = error_response("Too many sign-in attempts in progress, please retry", 503)
+    response.headers['Retry-After'] = '1'
+    return response
 
 @api_bp.route('/users/register', methods=['POST'])
 def register():
@@ -13,20 +23,35 @@ def register():
     if not data or not data.get('username') or not data.get('email') or not data.get('password'):
         return error_response("Missing required fields", 400)
     
-    if User.query.filter_by(username=data['username']).first():
+    # One lookup for both unique fields, before paying for the hash
+    existing = db.session.query(User.username, User.email).filter(
+        db.or_(User.username == data['username'], User.email == data['email'])
+    ).all()
+    
+    if any(row.username == data['username'] for row in existing):
         return error_response("Username already exists", 400)
         
-    if User.query.filter_by(email=data['email']).first():
+    if existing:
         return error_response("Email already exists", 400)
     
     user = User(
         username=data['username'],
         email=data['email']
     )
-    user.set_password(data['password'])
+    try:
+        user.set_password(data['password'])
+    except HashingOverloaded:
+        return _hashing_overloaded()
     
     db.session.add(user)
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # A concurrent registration took the username or email after our check
+        db.session.rollback()
+        return error_response("Username or email already exists", 400)
+    
+    shard_router.replicate_user(user)
     
     return jsonify({"message": "User created successfully"}), 201
 
@@ -39,7 +64,12 @@ def login():
     
     user = User.query.filter_by(username=data['username']).first()
     
-    if not user or not user.check_password(data['password']):
+    try:
+        valid = user is not None and user.check_password(data['password'])
+    except HashingOverloaded:
+        return _hashing_overloaded()
+    
+    if not valid:
         return error_response("Invalid credentials", 401)
     
     access_token = create_access_token(identity=user.id)
@@ -62,8 +92,58 @@ def get_user():
 
 @api_bp.route('/users', methods=['GET'])
 @jwt_required()
+@replica_reads()
 def get_users():
-    users = User.query.all()
+    limit = min(max(request.args.get('limit', 50, type=int), 1), MAX_USER_PAGE_SIZE)
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    
+    # Fetch one extra row to know whether another page exists
+    users = User.query.order_by(User.username).offset(offset).limit(limit + 1).all()
+    
+    return jsonify({
+        "users": [user.to_dict() for user in users[:limit]],
+        "limit": limit,
+        "offset": offset,
+        "has_more": len(users) > limit
+    }), 200
+
+def _prefix_upper_bound(prefix):
+    """Return the smallest string above every string starting with prefix, or None if there is none."""
+    stripped = prefix.rstrip(chr(0x10FFFF))
+    if not stripped:
+        return None
+    following = ord(stripped[-1]) + 1
+    if 0xD800 <= following <= 0xDFFF:
+        # Surrogates can't be encoded; the next character that can is U+E000
+        following = 0xE000
+    return stripped[:-1] + chr(following)
+
+@api_bp.route('/users/search', methods=['GET'])
+@jwt_required()
+@replica_reads()
+def search_users():
+    prefix = request.args.get('q', '').strip().lower()
+    limit = min(max(request.args.get('limit', 10, type=int), 1), MAX_USER_SEARCH_RESULTS)
+    
+    if not prefix:
+        return error_response("Search query is required", 400)
+    
+    username = db.func.lower(User.username)
+    escaped = prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    filters = [username.like(escaped + '%', escape='\\')]
+    
+    # PostgreSQL serves the left-anchored LIKE from the text_pattern_ops index
+    # under any collation, where a >=/< range would need "C". SQLite never uses
+    # an index for LIKE with ESCAPE, so bound the range on lower(username) too
+    # and let the LIKE re-check the rows inside it
+    if db.session.get_bind(mapper=User).dialect.name == 'sqlite':
+        filters.append(username >= prefix)
+        upper_bound = _prefix_upper_bound(prefix)
+        if upper_bound is not None:
+            filters.append(username < upper_bound)
+    
+    users = db.session.query(User.id, User.username).filter(*filters).order_by(username).limit(limit).all()
+    
     return jsonify({
-        "users": [user.to_dict() for user in users]
+        "users": [{"id": user.id, "username": user.username} for user in users]
     }), 200
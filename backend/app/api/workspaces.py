@@ -1,14 +1,20 @@
+from datetime import datetime
+
 from flask import jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
 
-from app import db
+from app import db, cache, shard_router
 from app.api import api_bp
+from app.models.discussion import Discussion
+from app.models.shard import WorkspaceShard
 from app.models.workspace import Workspace, WorkspaceMember
+from app.services.database.sharding import DEFAULT_SHARD
 from app.models.user import User
-from app.utils.api_config import error_response
+from app.utils.api_config import error_response, replica_reads
 
 @api_bp.route('/workspaces', methods=['GET'])
 @jwt_required()
+@replica_reads()
 def get_workspaces():
     user_id = get_jwt_identity()
     
@@ -21,6 +27,148 @@ def get_workspaces():
         "workspaces": [w.to_dict() for w in workspaces]
     }), 200
 
+@api_bp.route('/workspaces/dashboard', methods=['GET'])
+@jwt_required()
+@replica_reads()
+def get_workspace_dashboard():
+    user_id = get_jwt_identity()
+    
+    # Member counts for just this user's workspaces
+    my_workspaces = db.select(WorkspaceMember.workspace_id).where(WorkspaceMember.user_id == user_id)
+    member_counts = db.select(
+        WorkspaceMember.workspace_id,
+        db.func.count().label('member_count')
+    ).where(
+        WorkspaceMember.workspace_id.in_(my_workspaces)
+    ).group_by(WorkspaceMember.workspace_id).subquery()
+    
+    if shard_router.enabled:
+        rows = _sharded_dashboard_rows(user_id, member_counts)
+    else:
+        rows = _dashboard_rows(user_id, member_counts)
+    
+    result = []
+    for workspace, role, last_read_at, member_count, discussion_count, last_activity_at, unread_discussions in rows:
+        workspace_data = workspace.to_dict()
+        workspace_data.update({
+            'role': role,
+            'member_count': member_count,
+            'discussion_count': discussion_count,
+            'last_activity_at': last_activity_at.isoformat() if last_activity_at else None,
+            'last_read_at': last_read_at.isoformat() if last_read_at else None,
+            'unread_discussions': unread_discussions,
+            'has_unread': unread_discussions > 0
+        })
+        result.append(workspace_data)
+    
+    return jsonify({
+        "workspaces": result
+    }), 200
+
+def _dashboard_rows(user_id, member_counts):
+    # Discussions with messages newer than the member's read marker are unread
+    read_marker = db.func.coalesce(WorkspaceMember.last_read_at, WorkspaceMember.joined_at)
+    unread = db.case((Discussion.last_message_at > read_marker, Discussion.id))
+    
+    return db.session.query(
+        Workspace,
+        WorkspaceMember.role,
+        WorkspaceMember.last_read_at,
+        member_counts.c.member_count,
+        db.func.count(Discussion.id).label('discussion_count'),
+        db.func.max(Discussion.last_message_at).label('last_activity_at'),
+        db.func.count(unread).label('unread_discussions')
+    ).join(
+        WorkspaceMember, WorkspaceMember.workspace_id == Workspace.id
+    ).join(
+        member_counts, member_counts.c.workspace_id == Workspace.id
+    ).outerjoin(
+        Discussion, Discussion.workspace_id == Workspace.id
+    ).filter(
+        WorkspaceMember.user_id == user_id
+    ).group_by(
+        Workspace.id,
+        WorkspaceMember.role,
+        WorkspaceMember.last_read_at,
+        member_counts.c.member_count
+    ).order_by(
+        db.func.max(Discussion.last_message_at).desc().nullslast(),
+        Workspace.name
+    ).all()
+
+def _sharded_dashboard_rows(user_id, member_counts):
+    # Workspaces and memberships live on the primary; discussions are
+    # aggregated with one grouped query per shard holding the user's workspaces
+    memberships = db.session.query(
+        Workspace,
+        WorkspaceMember.role,
+        WorkspaceMember.last_read_at,
+        WorkspaceMember.joined_at,
+        member_counts.c.member_count
+    ).join(
+        WorkspaceMember, WorkspaceMember.workspace_id == Workspace.id
+    ).join(
+        member_counts, member_counts.c.workspace_id == Workspace.id
+    ).filter(
+        WorkspaceMember.user_id == user_id
+    ).all()
+    
+    placement = dict(db.session.query(WorkspaceShard.workspace_id, WorkspaceShard.shard).filter(
+        WorkspaceShard.workspace_id.in_([row[0].id for row in memberships])
+    ).all())
+    
+    by_shard = {}
+    for workspace, role, last_read_at, joined_at, member_count in memberships:
+        markers = by_shard.setdefault(placement.get(workspace.id, DEFAULT_SHARD), {})
+        markers[workspace.id] = last_read_at or joined_at
+    
+    stats = {}
+    for shard, markers in by_shard.items():
+        unread = db.case(*[
+            (db.and_(Discussion.workspace_id == workspace_id, Discussion.last_message_at > marker), Discussion.id)
+            for workspace_id, marker in markers.items()
+        ])
+        with shard_router.use(shard):
+            for workspace_id, discussion_count, last_activity_at, unread_discussions in db.session.query(
+                Discussion.workspace_id,
+                db.func.count(Discussion.id),
+                db.func.max(Discussion.last_message_at),
+                db.func.count(unread)
+            ).filter(
+                Discussion.workspace_id.in_(list(markers))
+            ).group_by(Discussion.workspace_id).all():
+                stats[workspace_id] = (discussion_count, last_activity_at, unread_discussions)
+    
+    rows = [
+        (workspace, role, last_read_at, member_count) + stats.get(workspace.id, (0, None, 0))
+        for workspace, role, last_read_at, joined_at, member_count in memberships
+    ]
+    # Most recently active first, matching the single-database ordering
+    rows.sort(key=lambda row: row[0].name)
+    rows.sort(key=lambda row: row[5] is None)
+    rows.sort(key=lambda row: row[5] or datetime.min, reverse=True)
+    return rows
+
+@api_bp.route('/workspaces/<workspace_id>/read', methods=['POST'])
+@jwt_required()
+def mark_workspace_read(workspace_id):
+    user_id = get_jwt_identity()
+    
+    member = WorkspaceMember.query.filter_by(
+        workspace_id=workspace_id, 
+        user_id=user_id
+    ).first()
+    
+    if not member:
+        return error_response("Access denied", 403)
+    
+    member.last_read_at = datetime.utcnow()
+    db.session.commit()
+    # The cached member list carries each member's last_read_at
+    cache.invalidate(f'workspace:{workspace_id}')
+    
+    return jsonify(member.to_dict()), 200
+
 @api_bp.route('/workspaces', methods=['POST'])
 @jwt_required()
 def create_workspace():
@@ -45,6 +193,7 @@ def create_workspace():
         role='admin'
     )
     db.session.add(member)
+    shard_router.assign_new_workspace(workspace.id)
     
     db.session.commit()
     
@@ -73,6 +222,7 @@ def get_workspace(workspace_id):
 
 @api_bp.route('/workspaces/<workspace_id>/members', methods=['GET'])
 @jwt_required()
+@replica_reads()
 def get_workspace_members(workspace_id):
     user_id = get_jwt_identity()
     
@@ -85,17 +235,10 @@ def get_workspace_members(workspace_id):
     if not member:
         return error_response("Access denied", 403)
     
-    members = WorkspaceMember.query.filter_by(workspace_id=workspace_id).all()
-    
-    # Get user details for each member
-    result = []
-    for m in members:
-        user = User.query.get(m.user_id)
-        if user:
-            member_data = m.to_dict()
-            member_data['username'] = user.username
-            member_data['email'] = user.email
-            result.append(member_data)
+    result = cache.get_or_set(
+        f'workspace:{workspace_id}', 'members',
+        lambda: _member_list(workspace_id)
+    )
     
     return jsonify({
         "members": result
@@ -144,8 +287,24 @@ def add_workspace_member(workspace_id):
     
     db.session.add(new_member)
     db.session.commit()
+    cache.invalidate(f'workspace:{workspace_id}')
     
     return jsonify({
         "message": "Member added successfully",
         "member": new_member.to_dict()
     }), 201
+
+def _member_list(workspace_id):
+    members = db.session.query(WorkspaceMember, User).join(
+        User, User.id == WorkspaceMember.user_id
+    ).filter(WorkspaceMember.workspace_id == workspace_id).all()
+    
+    # Get user details for each member
+    result = []
+    for m, user in members:
+        member_data = m.to_dict()
+        member_data['username'] = user.username
+        member_data['email'] = user.email
+        result.append(member_data)
+    
+    return result
@@ -0,0 +1,198 @@
+# app/cli.py
+import json
+import os
+import time
+from collections import Counter
+
+import click
+from flask import current_app
+
+from app import db, analysis_queue, archiver, init_db, shard_router
+from app.models.discussion import Discussion, Message
+from app.models.user import User
+from app.models.workspace import Workspace
+from app.services.clustering.hashing_perspective_analyzer import HashingPerspectiveAnalyzer, measure_load, weak_labels
+from app.services.database.workspace_mover import WorkspaceMover
+from app.services.exporting.discussion_exporter import DiscussionExporter, EXPORT_FORMATS
+from app.services.importing.discussion_importer import DiscussionImporter
+
+def register_commands(app):
+    """Register the platform's maintenance commands with the Flask CLI."""
+    app.cli.add_command(init_db_command)
+    app.cli.add_command(import_discussion)
+    app.cli.add_command(export_messages)
+    app.cli.add_command(move_workspace)
+    app.cli.add_command(sync_shard_users)
+    app.cli.add_command(archive_discussions)
+    app.cli.add_command(restore_discussion)
+    app.cli.add_command(train_perspective_model)
+
+def _shard_of(key, value):
+    """Return the shard holding the workspace that owns a discussion or workspace ID."""
+    workspace_id = shard_router.workspace_for(key, value)
+    return shard_router.shard_for_workspace(workspace_id) if workspace_id else None
+
+@click.command('init-db')
+def init_db_command():
+    """Create missing tables and the full-text search index."""
+    init_db()
+    click.echo("Database initialized")
+
+@click.command('import-discussion')
+@click.argument('discussion_id')
+@click.argument('source', type=click.File('rb'))
+@click.option('--batch-size', type=int, default=None, help='Messages inserted per transaction.')
+@click.option('--analyze/--no-analyze', default=True, help='Analyze imported messages before exiting.')
+def import_discussion(discussion_id, source, batch_size, analyze):
+    """Import NDJSON chat history from SOURCE ('-' for stdin) into a discussion."""
+    with shard_router.use(_shard_of('discussion_id', discussion_id)):
+        _import_discussion(discussion_id, source, batch_size, analyze)
+
+def _import_discussion(discussion_id, source, batch_size, analyze):
+    if not db.session.get(Discussion, discussion_id):
+        raise click.ClickException("Discussion not found")
+    
+    importer = DiscussionImporter(
+        discussion_id,
+        batch_size=batch_size or current_app.config['IMPORT_BATCH_SIZE']
+    )
+    stats = importer.import_lines(source)
+    click.echo(json.dumps(stats, indent=2))
+    
+    if analyze and stats['imported']:
+        # Analyze in the foreground so the work isn't lost when the CLI exits
+        message_ids = db.session.query(Message.id).filter_by(discussion_id=discussion_id)
+        analysis_queue.enqueue((row.id for row in message_ids), start_worker=False)
+        click.echo(f"Analyzed {analysis_queue.drain()} messages")
+
+@click.command('export-messages')
+@click.option('--discussion', 'discussion_id', default=None, help='Export a single discussion.')
+@click.option('--workspace', 'workspace_id', default=None, help='Export every discussion in a workspace.')
+@click.option('--format', 'export_format', type=click.Choice(sorted(EXPORT_FORMATS)), default='ndjson')
+@click.option('--output', '-o', type=click.File('w'), default='-', help='Output file, stdout by default.')
+def export_messages(discussion_id, workspace_id, export_format, output):
+    """Export messages with their authors and analyses."""
+    if (discussion_id is None) == (workspace_id is None):
+        raise click.UsageError("Pass exactly one of --discussion or --workspace")
+    
+    exporter = DiscussionExporter(
+        discussion_id=discussion_id,
+        workspace_id=workspace_id,
+        chunk_size=current_app.config['EXPORT_CHUNK_SIZE']
+    )
+    
+    key, value = ('discussion_id', discussion_id) if discussion_id else ('workspace_id', workspace_id)
+    with shard_router.use(_shard_of(key, value)):
+        for chunk in exporter.stream(export_format):
+            output.write(chunk)
+
+@click.command('move-workspace')
+@click.argument('workspace_id')
+@click.argument('target')
+@click.option('--batch-size', type=int, default=1000, help='Rows copied per statement.')
+@click.option('--grace', type=float, default=2.0, help='Seconds to wait for in-flight writes after pausing them.')
+def move_workspace(workspace_id, target, batch_size, grace):
+    """Move a workspace's discussions and decision data to shard TARGET."""
+    if not db.session.get(Workspace, workspace_id):
+        raise click.ClickException("Workspace not found")
+    
+    mover = WorkspaceMover(shard_router, workspace_id, target, batch_size=batch_size, grace=grace, log=click.echo)
+    try:
+        counts = mover.run()
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    click.echo(json.dumps(counts, indent=2))
+
+@click.command('sync-shard-users')
+def sync_shard_users():
+    """Copy every user to every shard, e.g. after adding a shard."""
+    if not shard_router.enabled:
+        raise click.ClickException("No shards configured")
+    
+    count = 0
+    for user in User.query.yield_per(1000):
+        shard_router.replicate_user(user)
+        count += 1
+    click.echo(f"Copied {count} users to {len(shard_router.shards)} shards")
+
+@click.command('archive-discussions')
+@click.option('--days', type=int, default=None, help='Archive discussions inactive this long (ARCHIVE_AFTER_DAYS by default).')
+@click.option('--limit', type=int, default=None, help='Archive at most this many discussions per shard.')
+@click.option('--dry-run', is_flag=True, help='Only list the discussions that would be archived.')
+@click.option('--probe-term', default='decision', help='Search term used to measure query latency.')
+def archive_discussions(days, limit, dry_run, probe_term):
+    """Move messages of closed or inactive discussions into compressed archives."""
+    report = {}
+    for shard in shard_router.shard_names() if shard_router.enabled else [None]:
+        with shard_router.use(shard):
+            candidates = archiver.candidates(older_than_days=days, limit=limit)
+            if dry_run:
+                report[shard or 'default'] = {'candidates': candidates}
+                continue
+            
+            before = {'tables': archiver.table_sizes(), 'latency': archiver.probe_latency(probe_term)}
+            archived = [result for result in map(archiver.archive, candidates) if result]
+            after = {'tables': archiver.table_sizes(), 'latency': archiver.probe_latency(probe_term)}
+            
+            report[shard or 'default'] = {
+                'archived_discussions': len(archived),
+                'archived_messages': sum(result['message_count'] for result in archived),
+                'archived_analyses': sum(result['analysis_count'] for result in archived),
+                'raw_bytes': sum(result['raw_bytes'] for result in archived),
+                'compressed_bytes': sum(result['compressed_bytes'] for result in archived),
+                'before': before,
+                'after': after
+            }
+    click.echo(json.dumps(report, indent=2))
+
+@click.command('restore-discussion')
+@click.argument('discussion_id')
+def restore_discussion(discussion_id):
+    """Move an archived discussion's messages back into the hot tables."""
+    with shard_router.use(_shard_of('discussion_id', discussion_id)):
+        click.echo(f"Restored {archiver.restore(discussion_id)} messages")
+
+@click.command('train-perspective-model')
+@click.option('--input', 'source', type=click.File('r'), default=None,
+              help='NDJSON of {"text": ..., "perspective": ...}; stored messages labelled by the keyword analyzer by default.')
+@click.option('--limit', type=int, default=None, help='Use at most this many stored messages per shard.')
+@click.option('--output', '-o', default=None, help='Model file, PERSPECTIVE_MODEL_PATH by default.')
+@click.option('--c', 'c', type=float, default=10.0, help='Inverse regularization strength.')
+def train_perspective_model(source, limit, output, c):
+    """Train the model used by the 'hashing' perspective backend."""
+    if source is not None:
+        records = [json.loads(line) for line in source if line.strip()]
+        texts = [record['text'] for record in records]
+        labels = [record['perspective'] for record in records]
+    else:
+        contents = []
+        for shard in shard_router.shard_names() if shard_router.enabled else [None]:
+            with shard_router.use(shard):
+                query = db.session.query(Message.content).order_by(Message.created_at.desc())
+                if limit is not None:
+                    query = query.limit(limit)
+                contents.extend(row.content for row in query.yield_per(1000))
+        texts, labels = weak_labels(contents)
+    
+    if len(set(labels)) < 2:
+        raise click.ClickException("Training needs examples of at least two perspectives")
+    
+    started = time.perf_counter()
+    try:
+        analyzer = HashingPerspectiveAnalyzer.train(texts, labels, c=c)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    trained = time.perf_counter() - started
+    
+    path = output or current_app.config['PERSPECTIVE_MODEL_PATH']
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    analyzer.save(path)
+    
+    click.echo(json.dumps({
+        'path': path,
+        'samples': len(texts),
+        'per_perspective': dict(Counter(labels)),
+        'training_seconds': round(trained, 1),
+        'file_mb': round(os.path.getsize(path) / 2 ** 20, 2),
+        **measure_load(path)
+    }, indent=2))
@@ -9,17 +9,24 @@ class MessageAnalysis(db.Model):
     
     id = db.Column(db.String(36), primary_key=True)
     message_id = db.Column(db.String(36), db.ForeignKey('messages.id'), nullable=False, unique=True)
+    discussion_id = db.Column(db.String(36), db.ForeignKey('discussions.id'), nullable=True)
     sentiment_score = db.Column(db.Float, nullable=True)
     perspective_vector = db.Column(db.Text, nullable=True)  # JSON string
     detected_biases = db.Column(db.Text, nullable=True)  # JSON string
+    change_seq = db.Column(db.Integer, nullable=True)  # Change sequence number within the discussion
     analyzed_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    __table_args__ = (
+        db.Index('ix_message_analysis_discussion_change_seq', 'discussion_id', 'change_seq'),
+    )
+    
     # Relationships
     message = db.relationship('Message', back_populates='analysis')
     
-    def __init__(self, message_id, sentiment_score=None, perspective_vector=None, detected_biases=None):
+    def __init__(self, message_id, sentiment_score=None, perspective_vector=None, detected_biases=None, discussion_id=None):
         self.id = str(uuid.uuid4())
         self.message_id = message_id
+        self.discussion_id = discussion_id
         self.sentiment_score = sentiment_score
         
         if perspective_vector is not None:
@@ -89,3 +96,38 @@ class CognitiveBias(db.Model):
             'detection_patterns': self.get_detection_patterns(),
             'mitigation_strategies': self.mitigation_strategies
         }
+
+class BiasIntervention(db.Model):
+    __tablename__ = 'bias_interventions'
+    
+    id = db.Column(db.String(36), primary_key=True)
+    discussion_id = db.Column(db.String(36), db.ForeignKey('discussions.id'), nullable=False)
+    bias_id = db.Column(db.String(36), db.ForeignKey('cognitive_biases.id'), nullable=False)
+    intervention_type = db.Column(db.String(100), nullable=False)
+    content = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    displayed_at = db.Column(db.DateTime, nullable=True)
+    acknowledged_at = db.Column(db.DateTime, nullable=True)
+    
+    __table_args__ = (
+        db.Index('ix_bias_interventions_discussion_created', 'discussion_id', 'created_at'),
+    )
+    
+    def __init__(self, discussion_id, bias_id, intervention_type, content):
+        self.id = str(uuid.uuid4())
+        self.discussion_id = discussion_id
+        self.bias_id = bias_id
+        self.intervention_type = intervention_type
+        self.content = content
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'discussion_id': self.discussion_id,
+            'bias_id': self.bias_id,
+            'intervention_type': self.intervention_type,
+            'content': self.content,
+            'created_at': self.created_at.isoformat(),
+            'displayed_at': self.displayed_at.isoformat() if self.displayed_at else None,
+            'acknowledged_at': self.acknowledged_at.isoformat() if self.acknowledged_at else None
+        }
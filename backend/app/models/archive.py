@@ -0,0 +1,40 @@
+import uuid
+from datetime import datetime
+
+from app import db
+
+class DiscussionArchive(db.Model):
+    __tablename__ = 'discussion_archives'
+    
+    id = db.Column(db.String(36), primary_key=True)
+    discussion_id = db.Column(db.String(36), db.ForeignKey('discussions.id'), nullable=False, unique=True)
+    previous_status = db.Column(db.String(50))  # Discussion status to put back on restore
+    codec = db.Column(db.String(20), nullable=False, default='zlib+json')
+    payload = db.Column(db.LargeBinary, nullable=False)  # Compressed messages and analyses
+    message_count = db.Column(db.Integer, nullable=False, default=0)
+    analysis_count = db.Column(db.Integer, nullable=False, default=0)
+    raw_bytes = db.Column(db.Integer, nullable=False, default=0)  # Payload size before compression
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __init__(self, discussion_id, payload, previous_status=None, message_count=0, analysis_count=0, raw_bytes=0):
+        self.id = str(uuid.uuid4())
+        self.discussion_id = discussion_id
+        self.payload = payload
+        self.previous_status = previous_status
+        self.codec = 'zlib+json'
+        self.message_count = message_count
+        self.analysis_count = analysis_count
+        self.raw_bytes = raw_bytes
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'discussion_id': self.discussion_id,
+            'previous_status': self.previous_status,
+            'codec': self.codec,
+            'message_count': self.message_count,
+            'analysis_count': self.analysis_count,
+            'raw_bytes': self.raw_bytes,
+            'compressed_bytes': len(self.payload),
+            'archived_at': self.archived_at.isoformat() if self.archived_at else None
+        }
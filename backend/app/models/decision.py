@@ -1,4 +1,5 @@
 # app/models/decision.py
+import json
 import uuid
 from datetime import datetime
 
@@ -76,11 +77,18 @@ class DecisionDocument(db.Model):
     id = db.Column(db.String(36), primary_key=True)
     process_id = db.Column(db.String(36), db.ForeignKey('decision_processes.id'), nullable=False)
     title = db.Column(db.String(200), nullable=False)
-    content = db.Column(db.Text, nullable=False)
+    content = db.Column(db.Text, nullable=False)  # Full text for snapshots and the latest version, '' otherwise
+    delta = db.Column(db.Text, nullable=True)  # JSON line delta from the previous version
+    is_snapshot = db.Column(db.Boolean, nullable=False, default=True)
     version = db.Column(db.Integer, default=1)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    __table_args__ = (
+        # Concurrent edits can't both claim the next version number
+        db.Index('ix_decision_documents_process_version', 'process_id', 'version', unique=True),
+    )
+    
     # Relationships
     process = db.relationship('DecisionProcess', back_populates='documents')
     
@@ -100,4 +108,64 @@ class DecisionDocument(db.Model):
             'version': self.version,
             'created_at': self.created_at.isoformat(),
             'updated_at': self.updated_at.isoformat()
-        }
\ No newline at end of file
+        }
+    
+    def version_summary(self):
+        return {
+            'id': self.id,
+            'process_id': self.process_id,
+            'title': self.title,
+            'version': self.version,
+            'is_snapshot': self.is_snapshot,
+            'created_at': self.created_at.isoformat()
+        }
+
+class DecisionQualityMetric(db.Model):
+    __tablename__ = 'decision_quality_metrics'
+    
+    id = db.Column(db.String(36), primary_key=True)
+    process_id = db.Column(db.String(36), db.ForeignKey('decision_processes.id'), nullable=False)
+    metric_name = db.Column(db.String(100), nullable=False)
+    metric_value = db.Column(db.Float, nullable=False)
+    calculated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        db.Index('ix_decision_quality_metrics_process_metric', 'process_id', 'metric_name', unique=True),
+    )
+    
+    def __init__(self, process_id, metric_name, metric_value, calculated_at=None):
+        self.id = str(uuid.uuid4())
+        self.process_id = process_id
+        self.metric_name = metric_name
+        self.metric_value = metric_value
+        self.calculated_at = calculated_at or datetime.utcnow()
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'process_id': self.process_id,
+            'metric_name': self.metric_name,
+            'metric_value': self.metric_value,
+            'calculated_at': self.calculated_at.isoformat()
+        }
+
+class DecisionQualityState(db.Model):
+    __tablename__ = 'decision_quality_state'
+    
+    id = db.Column(db.String(36), primary_key=True)
+    process_id = db.Column(db.String(36), db.ForeignKey('decision_processes.id'), nullable=False, unique=True)
+    seq = db.Column(db.Integer, nullable=False, default=0)  # Discussion change sequence number folded in so far
+    counters = db.Column(db.Text, nullable=False)  # JSON running totals the metrics are derived from
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __init__(self, process_id, counters=None):
+        self.id = str(uuid.uuid4())
+        self.process_id = process_id
+        self.seq = 0
+        self.counters = json.dumps(counters or {})
+    
+    def get_counters(self):
+        return json.loads(self.counters) if self.counters else {}
+    
+    def set_counters(self, counters):
+        self.counters = json.dumps(counters, separators=(',', ':'))
\ No newline at end of file
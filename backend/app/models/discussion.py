@@ -7,10 +7,13 @@ class Discussion(db.Model):
     __tablename__ = 'discussions'
     
     id = db.Column(db.String(36), primary_key=True)
-    workspace_id = db.Column(db.String(36), db.ForeignKey('workspaces.id'), nullable=False)
+    workspace_id = db.Column(db.String(36), db.ForeignKey('workspaces.id'), nullable=False, index=True)
     title = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text)
     status = db.Column(db.String(50), default='active')
+    last_seq = db.Column(db.Integer, nullable=False, default=0)  # Last change sequence number handed out
+    last_message_at = db.Column(db.DateTime)  # Newest message, kept current by the sequencer
+    archived = db.Column(db.Boolean, nullable=False, default=False)  # Messages live in discussion_archives
     created_by = db.Column(db.String(36), db.ForeignKey('users.id'))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -19,6 +22,10 @@ class Discussion(db.Model):
     workspace = db.relationship('Workspace', back_populates='discussions')
     messages = db.relationship('Message', back_populates='discussion', cascade='all, delete-orphan')
     
+    __table_args__ = (
+        db.Index('ix_discussions_workspace_archived', 'workspace_id', 'archived'),
+    )
+    
     def __init__(self, workspace_id, title, description=None, created_by=None):
         self.id = str(uuid.uuid4())
         self.workspace_id = workspace_id
@@ -34,6 +41,7 @@ class Discussion(db.Model):
             'description': self.description,
             'status': self.status,
             'created_by': self.created_by,
+            'last_message_at': self.last_message_at.isoformat() if self.last_message_at else None,
             'created_at': self.created_at.isoformat(),
             'updated_at': self.updated_at.isoformat()
         }
@@ -42,13 +50,19 @@ class Message(db.Model):
     __tablename__ = 'messages'
     
     id = db.Column(db.String(36), primary_key=True)
-    discussion_id = db.Column(db.String(36), db.ForeignKey('discussions.id'), nullable=False)
-    parent_id = db.Column(db.String(36), db.ForeignKey('messages.id'), nullable=True)
+    discussion_id = db.Column(db.String(36), db.ForeignKey('discussions.id'), nullable=False, index=True)
+    parent_id = db.Column(db.String(36), db.ForeignKey('messages.id'), nullable=True, index=True)
     user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
     content = db.Column(db.Text, nullable=False)
+    seq = db.Column(db.Integer, nullable=True)  # Change sequence number at insert
+    change_seq = db.Column(db.Integer, nullable=True)  # Change sequence number of the last insert or edit
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    __table_args__ = (
+        db.Index('ix_messages_discussion_change_seq', 'discussion_id', 'change_seq'),
+    )
+    
     # Relationships
     discussion = db.relationship('Discussion', back_populates='messages')
     user = db.relationship('User', back_populates='messages')
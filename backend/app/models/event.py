@@ -0,0 +1,22 @@
+import json
+from datetime import datetime
+
+from app import db
+
+class DiscussionEvent(db.Model):
+    __tablename__ = 'discussion_events'
+    
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    discussion_id = db.Column(db.String(36), nullable=False)
+    event_type = db.Column(db.String(50), nullable=False)
+    payload = db.Column(db.Text, nullable=False)  # JSON string
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'discussion_id': self.discussion_id,
+            'event_type': self.event_type,
+            'payload': json.loads(self.payload),
+            'created_at': self.created_at.isoformat()
+        }
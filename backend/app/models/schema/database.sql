@@ -8,6 +8,8 @@ CREATE TABLE users (
     updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
 );
 
+CREATE INDEX idx_users_username_lower ON users(lower(username) text_pattern_ops);
+
 -- Workspaces
 CREATE TABLE workspaces (
     id UUID PRIMARY KEY,
@@ -24,21 +26,30 @@ CREATE TABLE workspace_members (
     user_id UUID REFERENCES users(id),
     role VARCHAR(50) NOT NULL,
     joined_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    last_read_at TIMESTAMP, -- When the member last marked the workspace read
     PRIMARY KEY (workspace_id, user_id)
 );
 
+CREATE INDEX idx_workspace_members_user_id ON workspace_members(user_id);
+
 -- Discussions
 CREATE TABLE discussions (
     id UUID PRIMARY KEY,
     workspace_id UUID REFERENCES workspaces(id),
     title VARCHAR(200) NOT NULL,
     description TEXT,
-    status VARCHAR(50) NOT NULL DEFAULT 'active',
+    status VARCHAR(50) NOT NULL DEFAULT 'active', -- 'active', 'closed' or 'archived'
+    last_seq INTEGER NOT NULL DEFAULT 0, -- Last change sequence number handed out
+    last_message_at TIMESTAMP, -- Newest message in the discussion
+    archived BOOLEAN NOT NULL DEFAULT FALSE, -- Messages live in discussion_archives
     created_by UUID REFERENCES users(id),
     created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
 );
 
+CREATE INDEX idx_discussions_workspace_id ON discussions(workspace_id);
+CREATE INDEX idx_discussions_workspace_archived ON discussions(workspace_id, archived);
+
 -- Messages
 CREATE TABLE messages (
     id UUID PRIMARY KEY,
@@ -46,20 +57,31 @@ CREATE TABLE messages (
     parent_id UUID REFERENCES messages(id) NULL,
     user_id UUID REFERENCES users(id),
     content TEXT NOT NULL,
+    seq INTEGER, -- Change sequence number at insert
+    change_seq INTEGER, -- Change sequence number of the last insert or edit
     created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
 );
 
+CREATE INDEX idx_messages_discussion_change_seq ON messages(discussion_id, change_seq);
+CREATE INDEX idx_messages_discussion_id ON messages(discussion_id);
+CREATE INDEX idx_messages_parent_id ON messages(parent_id);
+CREATE INDEX idx_messages_content_fts ON messages USING GIN (to_tsvector('english', content));
+
 -- Message Analysis
 CREATE TABLE message_analysis (
     id UUID PRIMARY KEY,
     message_id UUID REFERENCES messages(id),
+    discussion_id UUID REFERENCES discussions(id),
     sentiment_score FLOAT,
     perspective_vector JSON, -- Vector representation of the message's perspective
     detected_biases JSON, -- Array of detected biases with confidence scores
+    change_seq INTEGER, -- Change sequence number within the discussion
     analyzed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
 );
 
+CREATE INDEX idx_message_analysis_discussion_change_seq ON message_analysis(discussion_id, change_seq);
+
 -- Perspectives
 CREATE TABLE perspectives (
     id UUID PRIMARY KEY,
@@ -114,12 +136,16 @@ CREATE TABLE decision_documents (
     id UUID PRIMARY KEY,
     process_id UUID REFERENCES decision_processes(id),
     title VARCHAR(200) NOT NULL,
-    content TEXT NOT NULL,
+    content TEXT NOT NULL, -- Full text for snapshots and the latest version, '' otherwise
+    delta JSON, -- Line delta from the previous version
+    is_snapshot BOOLEAN NOT NULL DEFAULT TRUE,
     version INTEGER NOT NULL DEFAULT 1,
     created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
 );
 
+CREATE UNIQUE INDEX idx_decision_documents_process_version ON decision_documents(process_id, version);
+
 -- Bias Interventions
 CREATE TABLE bias_interventions (
     id UUID PRIMARY KEY,
@@ -132,6 +158,8 @@ CREATE TABLE bias_interventions (
     acknowledged_at TIMESTAMP NULL
 );
 
+CREATE INDEX idx_bias_interventions_discussion_created ON bias_interventions(discussion_id, created_at);
+
 -- User Feedback
 CREATE TABLE user_feedback (
     id UUID PRIMARY KEY,
@@ -153,6 +181,17 @@ CREATE TABLE decision_quality_metrics (
     calculated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
 );
 
+CREATE UNIQUE INDEX idx_decision_quality_metrics_process_metric ON decision_quality_metrics(process_id, metric_name);
+
+-- Decision Quality State (running totals the metrics are updated from)
+CREATE TABLE decision_quality_state (
+    id UUID PRIMARY KEY,
+    process_id UUID NOT NULL UNIQUE REFERENCES decision_processes(id),
+    seq INTEGER NOT NULL DEFAULT 0, -- Discussion change sequence number folded in so far
+    counters JSON NOT NULL,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
 -- Visualization Settings
 CREATE TABLE visualization_settings (
     user_id UUID REFERENCES users(id),
@@ -162,3 +201,64 @@ CREATE TABLE visualization_settings (
     updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
     PRIMARY KEY (user_id, visualization_type)
 );
+
+-- Discussion Events (cross-worker relay for real-time updates)
+CREATE TABLE discussion_events (
+    id SERIAL PRIMARY KEY,
+    discussion_id UUID NOT NULL,
+    event_type VARCHAR(50) NOT NULL,
+    payload JSON NOT NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX idx_discussion_events_created_at ON discussion_events(created_at);
+
+-- Workspace Shard Directory (primary database only)
+CREATE TABLE workspace_shards (
+    workspace_id UUID PRIMARY KEY REFERENCES workspaces(id),
+    shard VARCHAR(50) NOT NULL, -- Name from SHARDS; workspaces without a row live on the primary
+    status VARCHAR(20) NOT NULL DEFAULT 'active', -- 'active', or 'readonly' while a move finishes
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX idx_workspace_shards_shard ON workspace_shards(shard);
+
+-- Discussion Archives (messages and analyses of archived discussions)
+CREATE TABLE discussion_archives (
+    id UUID PRIMARY KEY,
+    discussion_id UUID NOT NULL UNIQUE REFERENCES discussions(id),
+    previous_status VARCHAR(50), -- Discussion status restored with the messages
+    codec VARCHAR(20) NOT NULL DEFAULT 'zlib+json',
+    payload BYTEA NOT NULL,
+    message_count INTEGER NOT NULL DEFAULT 0,
+    analysis_count INTEGER NOT NULL DEFAULT 0,
+    raw_bytes INTEGER NOT NULL DEFAULT 0,
+    archived_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Upgrade from earlier releases
+-- Safe to re-run. Create the tables above that the database lacks first;
+-- the application numbers legacy messages for delta sync on startup.
+ALTER TABLE workspace_members ADD COLUMN IF NOT EXISTS last_read_at TIMESTAMP;
+ALTER TABLE discussions ADD COLUMN IF NOT EXISTS last_seq INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE discussions ADD COLUMN IF NOT EXISTS last_message_at TIMESTAMP;
+ALTER TABLE discussions ADD COLUMN IF NOT EXISTS archived BOOLEAN NOT NULL DEFAULT FALSE;
+ALTER TABLE messages ADD COLUMN IF NOT EXISTS seq INTEGER;
+ALTER TABLE messages ADD COLUMN IF NOT EXISTS change_seq INTEGER;
+ALTER TABLE message_analysis ADD COLUMN IF NOT EXISTS discussion_id UUID REFERENCES discussions(id);
+ALTER TABLE message_analysis ADD COLUMN IF NOT EXISTS change_seq INTEGER;
+ALTER TABLE decision_documents ADD COLUMN IF NOT EXISTS delta JSON;
+ALTER TABLE decision_documents ADD COLUMN IF NOT EXISTS is_snapshot BOOLEAN NOT NULL DEFAULT TRUE;
+
+CREATE INDEX IF NOT EXISTS idx_users_username_lower ON users(lower(username) text_pattern_ops);
+CREATE INDEX IF NOT EXISTS idx_workspace_members_user_id ON workspace_members(user_id);
+CREATE INDEX IF NOT EXISTS idx_discussions_workspace_id ON discussions(workspace_id);
+CREATE INDEX IF NOT EXISTS idx_discussions_workspace_archived ON discussions(workspace_id, archived);
+CREATE INDEX IF NOT EXISTS idx_messages_discussion_change_seq ON messages(discussion_id, change_seq);
+CREATE INDEX IF NOT EXISTS idx_messages_discussion_id ON messages(discussion_id);
+CREATE INDEX IF NOT EXISTS idx_messages_parent_id ON messages(parent_id);
+CREATE INDEX IF NOT EXISTS idx_messages_content_fts ON messages USING GIN (to_tsvector('english', content));
+CREATE INDEX IF NOT EXISTS idx_message_analysis_discussion_change_seq ON message_analysis(discussion_id, change_seq);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_decision_documents_process_version ON decision_documents(process_id, version);
+CREATE INDEX IF NOT EXISTS idx_bias_interventions_discussion_created ON bias_interventions(discussion_id, created_at);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_decision_quality_metrics_process_metric ON decision_quality_metrics(process_id, metric_name);
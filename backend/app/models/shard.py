@@ -0,0 +1,24 @@
+from datetime import datetime
+
+from app import db
+
+class WorkspaceShard(db.Model):
+    __tablename__ = 'workspace_shards'
+    
+    workspace_id = db.Column(db.String(36), db.ForeignKey('workspaces.id'), primary_key=True)
+    shard = db.Column(db.String(50), nullable=False, index=True)
+    status = db.Column(db.String(20), nullable=False, default='active')  # 'active', or 'readonly' while a move finishes
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __init__(self, workspace_id, shard, status='active'):
+        self.workspace_id = workspace_id
+        self.shard = shard
+        self.status = status
+    
+    def to_dict(self):
+        return {
+            'workspace_id': self.workspace_id,
+            'shard': self.shard,
+            'status': self.status,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
@@ -1,8 +1,7 @@
 import uuid
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
 
-from app import db
+from app import db, password_hasher
 
 class User(db.Model):
     __tablename__ = 'users'
@@ -14,6 +13,16 @@ class User(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    __table_args__ = (
+        # Case-insensitive prefix search on usernames; PostgreSQL only uses the
+        # index for LIKE 'prefix%' with the pattern operator class
+        db.Index(
+            'ix_users_username_lower',
+            db.func.lower(username).label('username_lower'),
+            postgresql_ops={'username_lower': 'text_pattern_ops'}
+        ),
+    )
+    
     # Relationships
     workspaces = db.relationship('WorkspaceMember', back_populates='user')
     messages = db.relationship('Message', back_populates='user')
@@ -26,10 +35,10 @@ class User(db.Model):
             self.set_password(password)
     
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
     
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return password_hasher.verify(self.password_hash, password)
     
     def to_dict(self):
         return {
@@ -37,9 +37,10 @@ class WorkspaceMember(db.Model):
     __tablename__ = 'workspace_members'
     
     workspace_id = db.Column(db.String(36), db.ForeignKey('workspaces.id'), primary_key=True)
-    user_id = db.Column(db.String(36), db.ForeignKey('users.id'), primary_key=True)
+    user_id = db.Column(db.String(36), db.ForeignKey('users.id'), primary_key=True, index=True)
     role = db.Column(db.String(50), nullable=False)
     joined_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_read_at = db.Column(db.DateTime)  # When the member last marked the workspace read
     
     # Relationships
     workspace = db.relationship('Workspace', back_populates='members')
@@ -55,5 +56,6 @@ class WorkspaceMember(db.Model):
             'workspace_id': self.workspace_id,
             'user_id': self.user_id,
             'role': self.role,
-            'joined_at': self.joined_at.isoformat()
+            'joined_at': self.joined_at.isoformat(),
+            'last_read_at': self.last_read_at.isoformat() if self.last_read_at else None
         }
@@ -0,0 +1,152 @@
+# app/services/analysis/analysis_pipeline.py
+import json
+import uuid
+from datetime import datetime
+from typing import Dict, Any, List, Iterable
+
+from app import db, event_hub
+from app.models.analysis import MessageAnalysis
+from app.models.discussion import Message
+from app.services.events.event_hub import Event
+from app.services.sync.sequencer import allocate_sequence
+from app.services.bias_detection.bias_detector import BiasDetector, SentimentAnalyzer
+from app.services.bias_detection.discussion_bias_detector import DiscussionBiasDetector
+from app.services.clustering.perspective_analyzer import PerspectiveAnalyzer
+
+# Regex patterns keyed by the names used when seeding cognitive biases
+DEFAULT_BIAS_PATTERNS = {
+    "Confirmation Bias": [
+        r"\bas i (?:said|thought|expected)\b", r"\bthis proves\b", r"\bobviously\b", r"\bi knew\b"
+    ],
+    "Anchoring Bias": [
+        r"\bthe first (?:number|estimate|figure|offer)\b", r"\binitial(?:ly)? (?:estimate|number|figure)\b",
+        r"\bstarting point\b"
+    ],
+    "Groupthink": [
+        r"\beveryone agrees\b", r"\bwe all agree\b", r"\bno one disagrees\b", r"\blet'?s not argue\b"
+    ],
+    "Availability Heuristic": [
+        r"\bi remember (?:when|that)\b", r"\bjust last (?:week|month|year)\b", r"\bi heard about\b"
+    ],
+    "Status Quo Bias": [
+        r"\bwe'?ve always\b", r"\bif it ain'?t broke\b", r"\bthe way we do\b", r"\btoo risky\b"
+    ]
+}
+
+class AnalysisPipeline:
+    """
+    Runs sentiment, perspective and bias analysis over messages.
+    """
+
+    def __init__(self, bias_patterns: Dict[str, List[str]] = None, discussion_window: int = 20,
+                 perspective_analyzer=None):
+        """
+        Initialize the pipeline and its analyzers.
+
+        Args:
+            bias_patterns: Optional override of the bias detection patterns
+            discussion_window: Recent messages considered for discussion-level biases
+            perspective_analyzer: Optional perspective backend, the keyword analyzer by default
+        """
+        self.sentiment_analyzer = SentimentAnalyzer()
+        self.perspective_analyzer = perspective_analyzer or PerspectiveAnalyzer()
+        self.bias_detector = BiasDetector(bias_patterns or DEFAULT_BIAS_PATTERNS)
+        self.discussion_bias_detector = DiscussionBiasDetector(window=discussion_window)
+
+    def analyze(self, text: str) -> Dict[str, Any]:
+        """
+        Analyze a single message text.
+
+        Args:
+            text: The text to analyze
+
+        Returns:
+            Dictionary with sentiment score, perspective vector and detected biases
+        """
+        return {
+            "sentiment_score": self.sentiment_analyzer.analyze_sentiment(text),
+            "perspective_vector": self.perspective_analyzer.analyze_perspective(text),
+            "detected_biases": self.bias_detector.analyze_text(text)
+        }
+
+    def analyze_messages(self, message_ids: Iterable[str]) -> List[str]:
+        """
+        Analyze a batch of stored messages and insert their analyses in one statement.
+
+        Messages that already have an analysis are skipped. Messages are fed
+        to the discussion-level detector in order, and what it detects is
+        stored next to the message's own biases as "discussion_biases".
+
+        Args:
+            message_ids: IDs of the messages to analyze
+
+        Returns:
+            IDs of the messages that were analyzed
+        """
+        message_ids = list(message_ids)
+        if not message_ids:
+            return []
+
+        rows = db.session.query(
+            Message.id, Message.discussion_id, Message.seq, Message.user_id, Message.content
+        ).outerjoin(
+            MessageAnalysis, MessageAnalysis.message_id == Message.id
+        ).filter(
+            Message.id.in_(message_ids),
+            MessageAnalysis.id.is_(None)
+        ).order_by(Message.seq).all()
+
+        # Perspectives are scored for the whole batch at once
+        perspectives = self.perspective_analyzer.analyze_perspectives([row.content for row in rows])
+
+        now = datetime.utcnow()
+        mappings = []
+        events = []
+        windows = {}
+        for (message_id, discussion_id, seq, user_id, content), perspective in zip(rows, perspectives):
+            result = {
+                "sentiment_score": self.sentiment_analyzer.analyze_sentiment(content),
+                "perspective_vector": perspective,
+                "detected_biases": self.bias_detector.analyze_text(content)
+            }
+            if discussion_id not in windows:
+                windows[discussion_id] = self.discussion_bias_detector.load(discussion_id)
+            result["detected_biases"]["discussion_biases"] = self.discussion_bias_detector.observe(
+                windows[discussion_id], seq, user_id, content
+            )
+            mappings.append({
+                'id': str(uuid.uuid4()),
+                'message_id': message_id,
+                'discussion_id': discussion_id,
+                'sentiment_score': result["sentiment_score"],
+                'perspective_vector': json.dumps(result["perspective_vector"]),
+                'detected_biases': json.dumps(result["detected_biases"]),
+                'analyzed_at': now
+            })
+            events.append(Event(discussion_id, 'analysis.created', {
+                'id': mappings[-1]['id'],
+                'message_id': message_id,
+                'sentiment_score': result["sentiment_score"],
+                'perspective_vector': result["perspective_vector"],
+                'detected_biases': result["detected_biases"],
+                'analyzed_at': now.isoformat()
+            }))
+
+        # Bulk inserts skip flush events, so reserve change sequence numbers here
+        by_discussion = {}
+        for mapping in mappings:
+            by_discussion.setdefault(mapping['discussion_id'], []).append(mapping)
+        for discussion_id, group in by_discussion.items():
+            seq = allocate_sequence(db.session, discussion_id, len(group))
+            for offset, mapping in enumerate(group):
+                mapping['change_seq'] = seq + offset
+
+        db.session.bulk_insert_mappings(MessageAnalysis, mappings)
+        db.session.commit()
+
+        for discussion_id, window in windows.items():
+            self.discussion_bias_detector.save(discussion_id, window)
+
+        event_hub.publish_many(events)
+
+        return [mapping['message_id'] for mapping in mappings]
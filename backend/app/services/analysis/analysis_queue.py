@@ -0,0 +1,197 @@
+# app/services/analysis/analysis_queue.py
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Dict, Iterable, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Seconds before messages of a workspace being moved are tried again,
+# matching the Retry-After writes to it get meanwhile
+MOVE_RETRY_DELAY = 2.0
+
+class AnalysisQueue:
+    """
+    In-process queue that analyzes messages in batches on a background thread.
+
+    Analyses are written to the shard the workspace's directory entry names
+    when the batch runs. Messages of a workspace that is read-only for a
+    move wait MOVE_RETRY_DELAY seconds and are tried again.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.batch_size = 500
+        self._pending = deque()
+        # (due time, items) of messages put back while their workspace was moving
+        self._deferred = deque()
+        self._condition = threading.Condition()
+        self._worker = None
+        self._pipeline = None
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """
+        Bind the queue to an application.
+
+        Args:
+            app: The Flask application whose context the worker runs in
+        """
+        self.app = app
+        self.batch_size = app.config.get('ANALYSIS_BATCH_SIZE', self.batch_size)
+        app.extensions['analysis_queue'] = self
+
+    def warm_up(self):
+        """
+        Build the analysis pipeline now instead of on the first batch.
+
+        Call this in the gunicorn master before forking so every worker shares
+        the loaded analyzers copy-on-write.
+        """
+        return self.pipeline
+
+    @property
+    def is_warm(self) -> bool:
+        """Whether the analyzers have been built."""
+        return self._pipeline is not None
+
+    @property
+    def pipeline(self):
+        if self._pipeline is None:
+            from app.services.analysis.analysis_pipeline import AnalysisPipeline
+            from app.services.clustering.hashing_perspective_analyzer import create_perspective_analyzer
+            self._pipeline = AnalysisPipeline(
+                discussion_window=self.app.config['DISCUSSION_BIAS_WINDOW'],
+                perspective_analyzer=create_perspective_analyzer(
+                    self.app.config['PERSPECTIVE_BACKEND'],
+                    self.app.config['PERSPECTIVE_MODEL_PATH']
+                )
+            )
+        return self._pipeline
+
+    def enqueue(self, message_ids: Iterable[str], start_worker: bool = True):
+        """
+        Queue messages for analysis and make sure the worker is running.
+
+        Args:
+            message_ids: IDs of committed messages
+            start_worker: Set to False when the caller will drain the queue itself
+        """
+        from app.services.database.sharding import current_shard
+
+        # Where the request found the messages; _route looks their workspaces up there
+        shard = current_shard()
+        with self._condition:
+            self._pending.extend((shard, message_id) for message_id in message_ids)
+            if start_worker and (self._worker is None or not self._worker.is_alive()):
+                self._worker = threading.Thread(target=self._run, name='analysis-queue', daemon=True)
+                self._worker.start()
+            self._condition.notify()
+
+    def pending(self) -> int:
+        """Return the number of messages waiting to be analyzed."""
+        return len(self._pending) + sum(len(items) for _, items in self._deferred)
+
+    def drain(self) -> int:
+        """
+        Analyze everything queued in the calling thread.
+
+        Must be called inside an application context. Messages of a
+        workspace being moved stay queued for a later attempt.
+
+        Returns:
+            Number of messages analyzed
+        """
+        analyzed = 0
+        while True:
+            batch = self._take_batch(block=False)
+            if not batch:
+                return analyzed
+            analyzed += self._analyze(batch)
+
+    def _analyze(self, batch: List[Tuple[str, str]]) -> int:
+        from app import shard_router
+
+        by_shard, deferred = self._route(batch)
+        if deferred:
+            with self._condition:
+                self._deferred.append((time.monotonic() + MOVE_RETRY_DELAY, deferred))
+
+        analyzed = 0
+        for shard, message_ids in by_shard.items():
+            with shard_router.use(shard):
+                analyzed += len(self.pipeline.analyze_messages(message_ids))
+        return analyzed
+
+    def _route(self, batch: List[Tuple[str, str]]) -> Tuple[Dict[str, List[str]], List[Tuple[str, str]]]:
+        """
+        Group queued messages by the shard their workspace is on now.
+
+        A move may have flipped the directory since the messages were queued,
+        and the source copy is deleted once it has, so the shard the request
+        used is only where to find the messages' workspaces.
+
+        Returns:
+            Message IDs per shard, and the queued items of workspaces being moved
+        """
+        from sqlalchemy import select
+
+        from app import db, shard_router
+        from app.models.discussion import Discussion, Message
+        from app.services.database.sharding import WorkspaceMoving
+
+        queued = defaultdict(list)
+        for shard, message_id in batch:
+            queued[shard].append(message_id)
+        if not shard_router.enabled:
+            return queued, []
+
+        by_shard, deferred, shards = defaultdict(list), [], {}
+        for queued_shard, message_ids in queued.items():
+            with shard_router.use(queued_shard):
+                owners = dict(db.session.execute(
+                    select(Message.id, Discussion.workspace_id)
+                    .join(Discussion, Discussion.id == Message.discussion_id)
+                    .where(Message.id.in_(message_ids))
+                ).all())
+            for message_id in message_ids:
+                workspace_id = owners.get(message_id) or shard_router.workspace_for('message_id', message_id)
+                if workspace_id is None:
+                    # Deleted since it was queued
+                    continue
+                if workspace_id not in shards:
+                    try:
+                        shards[workspace_id] = shard_router.write_shard(workspace_id)
+                    except WorkspaceMoving:
+                        shards[workspace_id] = None
+                if shards[workspace_id] is None:
+                    deferred.append((queued_shard, message_id))
+                else:
+                    by_shard[shards[workspace_id]].append(message_id)
+        return by_shard, deferred
+
+    def _take_batch(self, block: bool) -> List[Tuple[str, str]]:
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                while self._deferred and self._deferred[0][0] <= now:
+                    self._pending.extend(self._deferred.popleft()[1])
+                if self._pending or not block:
+                    break
+                self._condition.wait(self._deferred[0][0] - now if self._deferred else None)
+            count = min(self.batch_size, len(self._pending))
+            return [self._pending.popleft() for _ in range(count)]
+
+    def _run(self):
+        while True:
+            batch = self._take_batch(block=True)
+            with self.app.app_context():
+                try:
+                    self._analyze(batch)
+                except Exception:
+                    logger.exception("Failed to analyze a batch of %d messages", len(batch))
+                    from app import db
+                    db.session.rollback()
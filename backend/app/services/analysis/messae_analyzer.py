@@ -1,7 +1,6 @@
 # app/services/clustering/perspective_analyzer.py
 import re
 from typing import Dict, Any, List
-import numpy as np
 
 class PerspectiveAnalyzer:
     """
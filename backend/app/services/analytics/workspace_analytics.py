@@ -0,0 +1,337 @@
+# app/services/analytics/workspace_analytics.py
+import json
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+from sqlalchemy import case, or_, select
+
+# Time bucket name -> pandas period frequency; weeks start on Monday
+BUCKETS = {'day': 'D', 'week': 'W-SUN', 'month': 'M'}
+
+METRICS = ('bias_frequency', 'sentiment', 'perspective_mix')
+
+class WorkspaceFrames:
+    """
+    Columnar copy of one workspace's analyses.
+
+    `analyses` has one row per analysis with its message's author and
+    creation time, the sentiment score and one float32 column per
+    perspective dimension. `biases` has one row per detected bias. Both are
+    replaced, never mutated, so readers can use them without locking.
+    `results` holds the most recently computed series, least recent first.
+    """
+
+    def __init__(self, lock=None):
+        self.analyses = None
+        self.biases = None
+        self.watermarks = {}
+        self.results = OrderedDict()
+        # Shared by every generation of the workspace's frames, held while they are refreshed
+        self.lock = lock or threading.Lock()
+
+class WorkspaceAnalytics:
+    """
+    Vectorized aggregations over a workspace's message analyses.
+
+    The first request for a workspace loads its analyses joined with their
+    messages in chunks into pandas frames, decoding the JSON columns once.
+    Later requests only fetch analyses whose change sequence number is
+    above the per-discussion watermark of the previous load, and reuse
+    computed series until new rows arrive. pandas is imported on first use,
+    so processes that never serve analytics don't pay for it.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.chunk_size = 20000
+        self.max_workspaces = 32
+        self.max_results = 64
+        self._frames = OrderedDict()
+        self._lock = threading.Lock()
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """
+        Bind the analytics engine to an application.
+
+        Args:
+            app: The Flask application
+        """
+        self.app = app
+        self.chunk_size = app.config['ANALYTICS_CHUNK_SIZE']
+        self.max_workspaces = app.config['ANALYTICS_MAX_WORKSPACES']
+        self.max_results = app.config['ANALYTICS_MAX_RESULTS']
+        app.extensions['workspace_analytics'] = self
+
+    def series(self, workspace_id: str, metric: str, bucket: str = 'week',
+               since: Optional[datetime] = None, until: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """
+        Compute a time-bucketed series for a workspace.
+
+        Args:
+            workspace_id: The workspace to aggregate
+            metric: 'bias_frequency' (detections per bias), 'sentiment'
+                (mean score per author) or 'perspective_mix' (mean
+                perspective vector per discussion)
+            bucket: 'day', 'week' or 'month'
+            since: Only include messages created at or after this time
+            until: Only include messages created before this time
+
+        Returns:
+            One entry per bias, author or discussion, each with a list of
+            points ordered by bucket start
+        """
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric '{metric}'")
+        if bucket not in BUCKETS:
+            raise ValueError(f"Unknown bucket '{bucket}'")
+
+        frames = self.refresh(workspace_id)
+        # since and until come from the request, so the cached series are bounded
+        key = (metric, bucket, since, until)
+        with frames.lock:
+            result = frames.results.pop(key, None)
+            if result is not None:
+                frames.results[key] = result
+                return result
+
+        result = getattr(self, f'_{metric}')(frames, bucket, since, until)
+        with frames.lock:
+            frames.results[key] = result
+            while len(frames.results) > self.max_results:
+                frames.results.popitem(last=False)
+        return result
+
+    def refresh(self, workspace_id: str) -> WorkspaceFrames:
+        """
+        Bring a workspace's frames up to date, loading only new analyses.
+
+        Returns:
+            The workspace's current frames
+        """
+        from app import db
+        from app.models.discussion import Discussion
+
+        current = dict(db.session.execute(
+            select(Discussion.id, Discussion.last_seq).where(Discussion.workspace_id == workspace_id)
+        ).all())
+
+        # The worker-wide lock only guards the LRU; loading holds the
+        # workspace's own lock, so a slow load doesn't block other workspaces
+        with self._lock:
+            frames = self._frames.pop(workspace_id, None) or WorkspaceFrames()
+            self._remember(workspace_id, frames)
+
+        if current == frames.watermarks:
+            return frames
+
+        with frames.lock:
+            # Another request may have refreshed the workspace while this one waited
+            with self._lock:
+                frames = self._frames.get(workspace_id) or frames
+            if current == frames.watermarks:
+                return frames
+
+            analyses, biases = self._load(workspace_id, frames.watermarks)
+            updated = WorkspaceFrames(frames.lock)
+            updated.analyses, updated.biases = self._merge(frames, analyses, biases)
+            updated.watermarks = current
+            with self._lock:
+                self._remember(workspace_id, updated)
+            return updated
+
+    def _remember(self, workspace_id: str, frames: WorkspaceFrames):
+        """Store a workspace's frames as most recently used; the caller holds the LRU lock."""
+        self._frames[workspace_id] = frames
+        while len(self._frames) > self.max_workspaces:
+            self._frames.popitem(last=False)
+
+    def _load(self, workspace_id: str, watermarks: Dict[str, int]):
+        """Read analyses changed after the watermarks, chunk by chunk."""
+        import numpy as np
+        import pandas as pd
+        from app import db
+        from app.models.analysis import MessageAnalysis
+        from app.models.discussion import Discussion, Message
+
+        query = select(
+            MessageAnalysis.id,
+            Message.discussion_id,
+            Message.user_id,
+            Message.created_at,
+            MessageAnalysis.sentiment_score,
+            MessageAnalysis.perspective_vector,
+            MessageAnalysis.detected_biases
+        ).join(
+            Message, Message.id == MessageAnalysis.message_id
+        ).join(
+            Discussion, Discussion.id == Message.discussion_id
+        ).where(
+            Discussion.workspace_id == workspace_id
+        )
+        if watermarks:
+            mark = case(watermarks, value=Message.discussion_id, else_=-1)
+            query = query.where(or_(MessageAnalysis.change_seq.is_(None), MessageAnalysis.change_seq > mark))
+
+        analysis_chunks, bias_chunks = [], []
+        result = db.session.execute(query.execution_options(yield_per=self.chunk_size))
+        for rows in result.partitions():
+            ids, discussion_ids, user_ids, created, sentiment, perspectives, detected = zip(*rows)
+
+            chunk = pd.DataFrame({
+                'analysis_id': ids,
+                'discussion_id': discussion_ids,
+                'user_id': user_ids,
+                'created_at': pd.to_datetime(list(created)),
+                'sentiment': np.array(sentiment, dtype=np.float64)
+            })
+
+            # JSON decoding is the only per-row Python work; everything after is columnar
+            dimensions, values = perspective_matrix([decode_json(value) for value in perspectives])
+            for i, dimension in enumerate(dimensions):
+                chunk[f'p_{dimension}'] = values[:, i]
+            analysis_chunks.append(chunk)
+
+            bias_rows = [
+                (row_index, bias.get('name'), bias.get('confidence'))
+                for row_index, value in enumerate(detected)
+                for bias in bias_list(decode_json(value))
+            ]
+            if bias_rows:
+                positions, names, confidences = zip(*bias_rows)
+                positions = np.array(positions)
+                bias_chunks.append(pd.DataFrame({
+                    'analysis_id': chunk['analysis_id'].to_numpy()[positions],
+                    'discussion_id': chunk['discussion_id'].to_numpy()[positions],
+                    'user_id': chunk['user_id'].to_numpy()[positions],
+                    'created_at': chunk['created_at'].to_numpy()[positions],
+                    'bias': names,
+                    'confidence': np.array(confidences, dtype=np.float64)
+                }))
+
+        return (
+            pd.concat(analysis_chunks, ignore_index=True) if analysis_chunks else None,
+            pd.concat(bias_chunks, ignore_index=True) if bias_chunks else None
+        )
+
+    def _merge(self, frames: WorkspaceFrames, analyses, biases):
+        """Replace re-analyzed rows and append new ones."""
+        import pandas as pd
+
+        if analyses is None:
+            return frames.analyses, frames.biases
+        if frames.analyses is None:
+            return analyses, biases
+
+        changed = frames.analyses['analysis_id'].isin(analyses['analysis_id'])
+        merged_analyses = pd.concat([frames.analyses[~changed], analyses], ignore_index=True)
+
+        kept_biases = frames.biases
+        if kept_biases is not None:
+            kept_biases = kept_biases[~kept_biases['analysis_id'].isin(analyses['analysis_id'])]
+        parts = [part for part in (kept_biases, biases) if part is not None]
+        merged_biases = pd.concat(parts, ignore_index=True) if parts else None
+        return merged_analyses, merged_biases
+
+    def _bias_frequency(self, frames, bucket, since, until):
+        frame = _window(frames.biases, bucket, since, until)
+        if frame is None:
+            return []
+        grouped = frame.groupby(['bias', 'bucket'], sort=True)['confidence'].agg(['size', 'mean'])
+        return _to_series(grouped, lambda row: {'count': int(row['size']), 'mean_confidence': float(row['mean'])})
+
+    def _sentiment(self, frames, bucket, since, until):
+        from app import db
+        from app.models.user import User
+
+        frame = _window(frames.analyses, bucket, since, until)
+        if frame is None:
+            return []
+        grouped = frame.groupby(['user_id', 'bucket'], sort=True)['sentiment'].agg(['size', 'mean'])
+        series = _to_series(grouped, lambda row: {'count': int(row['size']), 'mean_sentiment': _float(row['mean'])})
+
+        usernames = dict(db.session.query(User.id, User.username).filter(
+            User.id.in_([entry['key'] for entry in series])
+        ).all())
+        for entry in series:
+            entry['username'] = usernames.get(entry['key'])
+        return series
+
+    def _perspective_mix(self, frames, bucket, since, until):
+        frame = _window(frames.analyses, bucket, since, until)
+        if frame is None:
+            return []
+        columns = [column for column in frame.columns if column.startswith('p_')]
+        grouped = frame.groupby(['discussion_id', 'bucket'], sort=True)[columns].mean()
+        grouped['size'] = frame.groupby(['discussion_id', 'bucket'], sort=True).size()
+        return _to_series(grouped, lambda row: {
+            'count': int(row['size']),
+            'mix': {column[2:]: _float(row[column]) for column in columns}
+        })
+
+def decode_json(value):
+    if not value:
+        return None
+    try:
+        return json.loads(value)
+    except (TypeError, ValueError):
+        return None
+
+def bias_list(value, key: str = 'biases') -> List[Dict[str, Any]]:
+    # Stored as {"biases": [...], "discussion_biases": [...]} by the pipeline; older rows may hold a bare list
+    if isinstance(value, dict):
+        value = value.get(key)
+    elif key != 'biases':
+        return []
+    return [bias for bias in value or [] if isinstance(bias, dict)]
+
+def perspective_matrix(vectors):
+    """Stack perspective vectors into a float32 matrix, NaN where missing."""
+    import numpy as np
+
+    dimensions = next((
+        vector['dimensions'] for vector in vectors
+        if isinstance(vector, dict) and vector.get('dimensions')
+    ), [])
+    matrix = np.full((len(vectors), len(dimensions)), np.nan, dtype=np.float32)
+    for i, vector in enumerate(vectors):
+        values = vector.get('values') if isinstance(vector, dict) else vector
+        if values and len(values) == len(dimensions):
+            matrix[i] = values
+    return dimensions, matrix
+
+def _window(frame, bucket, since, until):
+    """Filter a frame to [since, until) and add its bucket start column."""
+    if frame is None:
+        return None
+    mask = None
+    if since is not None:
+        mask = frame['created_at'] >= since
+    if until is not None:
+        before = frame['created_at'] < until
+        mask = before if mask is None else mask & before
+    if mask is not None:
+        frame = frame[mask]
+    if frame.empty:
+        return None
+    return frame.assign(bucket=frame['created_at'].dt.to_period(BUCKETS[bucket]).dt.start_time)
+
+def _to_series(grouped, point) -> List[Dict[str, Any]]:
+    series = []
+    for key, group in grouped.groupby(level=0, sort=True):
+        series.append({
+            'key': key,
+            'points': [
+                dict(point(row), t=bucket_start.isoformat())
+                for (_, bucket_start), row in group.iterrows()
+            ]
+        })
+    return series
+
+def _float(value):
+    # NaN is not valid JSON
+    return None if value != value else round(float(value), 4)
@@ -0,0 +1,366 @@
+# app/services/archiving/discussion_archiver.py
+import json
+import statistics
+import time
+import zlib
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional
+
+from flask import g, request
+from sqlalchemy import DateTime, func, or_, select, text, update
+
+# Discussion.status of a discussion whose messages live in its archive row
+ARCHIVED = 'archived'
+
+# Tables moved into the archive, parents first
+ARCHIVED_TABLES = ('messages', 'message_analysis')
+
+class DiscussionArchiver:
+    """
+    Moves the messages and analyses of closed or inactive discussions out of
+    the hot tables into one compressed row per discussion.
+
+    An archived discussion keeps its row, with status 'archived' and the
+    indexed `archived` flag set. The first request by a member of its
+    workspace that names it by discussion_id restores its messages before
+    the view runs, so every existing endpoint works unchanged. Views that
+    read messages across a workspace (search, export, analytics) restore
+    the workspace's archived discussions first with @restores_archives().
+    Message-level URLs (/messages/<id>/...) of archived messages return 404
+    until the discussion has been opened once.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.archive_after_days = 90
+        self.compression_level = 6
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """
+        Bind the archiver to an application and register its restore hook.
+
+        Initialize after the shard router, so restores go to the right shard.
+
+        Args:
+            app: The Flask application
+        """
+        self.app = app
+        self.archive_after_days = app.config['ARCHIVE_AFTER_DAYS']
+        self.compression_level = app.config['ARCHIVE_COMPRESSION_LEVEL']
+        app.before_request(self._restore_requested_discussion)
+        app.extensions['archiver'] = self
+
+    def candidates(self, older_than_days: Optional[int] = None, limit: Optional[int] = None) -> List[str]:
+        """
+        Find discussions worth archiving: closed ones, and ones without new
+        messages for `older_than_days`.
+
+        Args:
+            older_than_days: Inactivity threshold, ARCHIVE_AFTER_DAYS by default
+            limit: Maximum number of discussions to return
+
+        Returns:
+            Discussion IDs, least recently active first
+        """
+        from app import db
+        from app.models.discussion import Discussion
+
+        days = self.archive_after_days if older_than_days is None else older_than_days
+        cutoff = datetime.utcnow() - timedelta(days=days)
+        last_active = func.coalesce(Discussion.last_message_at, Discussion.created_at)
+
+        query = db.session.query(Discussion.id).filter(
+            Discussion.archived.is_(False),
+            or_(Discussion.status == 'closed', last_active < cutoff)
+        ).order_by(last_active)
+        if limit is not None:
+            query = query.limit(limit)
+        return [row.id for row in query.all()]
+
+    def archive(self, discussion_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Archive one discussion's messages and analyses in a single transaction.
+
+        Args:
+            discussion_id: The discussion to archive
+
+        Returns:
+            The archive's to_dict(), or None if the discussion has no
+            messages or is already archived
+        """
+        from app import db
+        from app.models.analysis import MessageAnalysis
+        from app.models.archive import DiscussionArchive
+        from app.models.discussion import Discussion, Message
+
+        discussions = Discussion.__table__
+        messages = Message.__table__
+        analyses = MessageAnalysis.__table__
+
+        row = db.session.execute(
+            select(discussions.c.status, discussions.c.archived).where(discussions.c.id == discussion_id)
+        ).first()
+        if row is None or row.archived:
+            return None
+        status = row.status
+
+        # Claim the discussion first: posting a message updates the same row,
+        # so no message can be added between reading and deleting them
+        claimed = db.session.execute(update(discussions).where(
+            discussions.c.id == discussion_id,
+            discussions.c.archived.is_(False),
+            discussions.c.status == status
+        ).values(status=ARCHIVED, archived=True, updated_at=discussions.c.updated_at)).rowcount
+        if not claimed:
+            db.session.rollback()
+            return None
+
+        message_ids = select(messages.c.id).where(messages.c.discussion_id == discussion_id)
+        message_rows = db.session.execute(
+            select(messages).where(messages.c.discussion_id == discussion_id)
+            # Unsequenced legacy rows predate every sequenced reply, so they go first
+            .order_by(messages.c.seq.nullsfirst(), messages.c.created_at, messages.c.id)
+        ).all()
+        if not message_rows:
+            db.session.rollback()
+            return None
+        analysis_rows = db.session.execute(
+            select(analyses).where(analyses.c.message_id.in_(message_ids))
+        ).all()
+
+        raw = json.dumps({
+            'messages': _encode(messages, message_rows),
+            'message_analysis': _encode(analyses, analysis_rows)
+        }, separators=(',', ':')).encode('utf-8')
+
+        archive = DiscussionArchive(
+            discussion_id=discussion_id,
+            payload=zlib.compress(raw, self.compression_level),
+            previous_status=status,
+            message_count=len(message_rows),
+            analysis_count=len(analysis_rows),
+            raw_bytes=len(raw)
+        )
+        db.session.add(archive)
+        db.session.execute(analyses.delete().where(analyses.c.message_id.in_(message_ids)))
+        db.session.execute(messages.delete().where(messages.c.discussion_id == discussion_id))
+        db.session.commit()
+        return archive.to_dict()
+
+    def restore(self, discussion_id: str) -> int:
+        """
+        Move an archived discussion's messages and analyses back into the hot tables.
+
+        Safe to call concurrently; only one caller restores, the rest return 0.
+
+        Args:
+            discussion_id: The discussion to restore
+
+        Returns:
+            Number of messages restored
+        """
+        from app import db
+        from app.models.analysis import MessageAnalysis
+        from app.models.archive import DiscussionArchive
+        from app.models.discussion import Discussion, Message
+        from app.services.sync.sequencer import allocate_sequence
+
+        discussions = Discussion.__table__
+
+        archive = DiscussionArchive.query.filter_by(discussion_id=discussion_id).first()
+        if archive is None:
+            return 0
+
+        claimed = db.session.execute(update(discussions).where(
+            discussions.c.id == discussion_id,
+            discussions.c.archived.is_(True)
+        ).values(
+            status=archive.previous_status or 'active',
+            archived=False,
+            updated_at=discussions.c.updated_at
+        )).rowcount
+        if not claimed:
+            db.session.rollback()
+            return 0
+
+        data = json.loads(zlib.decompress(archive.payload))
+        message_rows = _parents_first(_decode(Message.__table__, data['messages']))
+        analysis_rows = _decode(MessageAnalysis.__table__, data['message_analysis'])
+
+        # Restored rows are new changes: delta sync clients and a concurrent
+        # workspace move must both pick them up
+        seq = allocate_sequence(db.session, discussion_id, len(message_rows) + len(analysis_rows))
+        for offset, row in enumerate(message_rows + analysis_rows):
+            row['change_seq'] = seq + offset
+
+        for table, rows in ((Message.__table__, message_rows), (MessageAnalysis.__table__, analysis_rows)):
+            if rows:
+                db.session.execute(table.insert(), rows)
+
+        restored = archive.message_count
+        db.session.delete(archive)
+        db.session.commit()
+        return restored
+
+    def restore_workspace(self, workspace_id: str) -> int:
+        """
+        Restore every archived discussion of a workspace for a member's read
+        across the whole workspace.
+
+        Does nothing for non-members or while a move has the workspace
+        read-only. Workspaces without archived discussions cost one lookup
+        on the (workspace_id, archived) index.
+
+        Args:
+            workspace_id: The workspace about to be read
+
+        Returns:
+            Number of messages restored
+        """
+        from app import db
+        from app.models.discussion import Discussion
+
+        archived = db.session.execute(select(Discussion.id).where(
+            Discussion.workspace_id == workspace_id,
+            Discussion.archived.is_(True)
+        )).scalars().all()
+        if not archived or not self._may_restore(workspace_id):
+            return 0
+        return sum(self.restore(discussion_id) for discussion_id in archived)
+
+    def table_sizes(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Row counts and on-disk sizes of the hot tables and the archive table.
+
+        Sizes need dbstat on SQLite and are None where it is not compiled in.
+        """
+        from app import db
+        from app.models.archive import DiscussionArchive
+        from app.models.discussion import Message
+
+        bind = {'mapper': Message}
+        dialect = db.session.get_bind(mapper=Message).dialect.name
+
+        sizes = {}
+        for name in ARCHIVED_TABLES + (DiscussionArchive.__tablename__,):
+            rows = db.session.execute(text(f'SELECT COUNT(*) FROM {name}'), bind_arguments=bind).scalar()
+            try:
+                if dialect == 'postgresql':
+                    size = db.session.execute(
+                        text('SELECT pg_total_relation_size(:name)'), {'name': name}, bind_arguments=bind
+                    ).scalar()
+                elif dialect == 'sqlite':
+                    # Table plus its indexes
+                    size = db.session.execute(text(
+                        "SELECT SUM(pgsize) FROM dbstat WHERE name = :name "
+                        "OR name IN (SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :name)"
+                    ), {'name': name}, bind_arguments=bind).scalar()
+                else:
+                    size = None
+            except Exception:
+                db.session.rollback()
+                size = None
+            sizes[name] = {'rows': rows, 'bytes': size}
+        return sizes
+
+    def probe_latency(self, term: str = 'decision', runs: int = 5) -> Dict[str, float]:
+        """
+        Median latency in milliseconds of queries that scan the hot tables:
+        a full-text search over all messages and a per-discussion bias
+        aggregate over all analyses.
+        """
+        from app import db
+        from app.models.analysis import MessageAnalysis
+        from app.services.search.message_search import MessageSearch
+
+        def median_ms(fn):
+            timings = []
+            for _ in range(runs):
+                started = time.perf_counter()
+                fn()
+                timings.append((time.perf_counter() - started) * 1000)
+            return round(statistics.median(timings), 2)
+
+        return {
+            'search_ms': median_ms(lambda: MessageSearch(limit=20).search(term)),
+            'analysis_aggregate_ms': median_ms(lambda: db.session.query(
+                MessageAnalysis.discussion_id,
+                func.count(MessageAnalysis.id),
+                func.avg(MessageAnalysis.sentiment_score)
+            ).group_by(MessageAnalysis.discussion_id).all())
+        }
+
+    def _restore_requested_discussion(self):
+        if not request.view_args or 'discussion_id' not in request.view_args:
+            return None
+
+        from app import db
+        from app.models.discussion import Discussion
+
+        discussion = db.session.get(Discussion, request.view_args['discussion_id'])
+        if discussion is not None and discussion.archived and self._may_restore(discussion.workspace_id):
+            self.restore(discussion.id)
+        # The session only holds weak references; keep the row alive so the
+        # view's own lookup by primary key is served from the identity map
+        g.requested_discussion = discussion
+        return None
+
+    def _may_restore(self, workspace_id: str) -> bool:
+        # Runs before the view's own checks, so only restore for a workspace
+        # member, and never while a move has the workspace read-only
+        from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+        from flask_jwt_extended.exceptions import JWTExtendedException
+        from jwt.exceptions import PyJWTError
+
+        from app import shard_router
+        from app.models.workspace import WorkspaceMember
+
+        try:
+            verify_jwt_in_request(optional=True)
+        except (JWTExtendedException, PyJWTError):
+            return False
+        user_id = get_jwt_identity()
+        if user_id is None:
+            return False
+
+        member = WorkspaceMember.query.filter_by(workspace_id=workspace_id, user_id=user_id).first()
+        if member is None:
+            return False
+
+        entry = shard_router.directory_entry(workspace_id) if shard_router.enabled else None
+        return entry is None or entry.status != 'readonly'
+
+def _parents_first(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # Walk each row's ancestors so every parent is inserted before its replies
+    by_id = {row['id']: row for row in rows}
+    ordered, placed = [], set()
+    for row in rows:
+        chain = []
+        while row is not None and row['id'] not in placed:
+            placed.add(row['id'])
+            chain.append(row)
+            row = by_id.get(row['parent_id'])
+        ordered.extend(reversed(chain))
+    return ordered
+
+def _encode(table, rows) -> Dict[str, Any]:
+    columns = [column.name for column in table.columns]
+    dates = {i for i, column in enumerate(table.columns) if isinstance(column.type, DateTime)}
+    return {
+        'columns': columns,
+        'rows': [
+            [value.isoformat() if i in dates and value is not None else value for i, value in enumerate(row)]
+            for row in rows
+        ]
+    }
+
+def _decode(table, data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    dates = {column.name for column in table.columns if isinstance(column.type, DateTime)}
+    columns = data['columns']
+    return [{
+        name: datetime.fromisoformat(value) if name in dates and value is not None else value
+        for name, value in zip(columns, row)
+    } for row in data['rows']]
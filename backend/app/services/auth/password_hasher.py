@@ -0,0 +1,84 @@
+# app/services/auth/password_hasher.py
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from werkzeug.security import generate_password_hash, check_password_hash
+
+class HashingOverloaded(Exception):
+    """Raised when too many password hashes are already running or queued."""
+
+class PasswordHasher:
+    """
+    Runs password hashing on a bounded thread pool with admission control.
+
+    hashlib's PBKDF2 and scrypt release the GIL, so hashing in the pool runs
+    in parallel while request threads wait. At most `workers + queue_size`
+    hashes are admitted; beyond that callers get HashingOverloaded straight
+    away instead of every request thread piling up behind the CPU.
+    """
+
+    def __init__(self, app=None):
+        self.method = 'scrypt'
+        self.timeout = None
+        self._executor = None
+        self._slots = None
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """
+        Bind the hasher to an application.
+
+        Args:
+            app: The Flask application
+        """
+        self.method = app.config['PASSWORD_HASH_METHOD']
+        self.timeout = app.config['PASSWORD_HASH_TIMEOUT']
+
+        workers = app.config['PASSWORD_HASH_WORKERS'] or os.cpu_count() or 1
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash')
+        self._slots = threading.BoundedSemaphore(workers + app.config['PASSWORD_HASH_QUEUE_SIZE'])
+
+        app.extensions['password_hasher'] = self
+
+    def hash(self, password: str) -> str:
+        """
+        Hash a password with the configured method.
+
+        Args:
+            password: The plain-text password
+
+        Returns:
+            The werkzeug-format password hash
+        """
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, password_hash: str, password: str) -> bool:
+        """
+        Check a password against a stored hash. The hash records its own
+        method, so hashes made under an older configuration keep working.
+
+        Args:
+            password_hash: The stored hash
+            password: The plain-text password to check
+        """
+        return self._run(check_password_hash, password_hash, password)
+
+    def _run(self, fn, *args):
+        if self._executor is None:
+            return fn(*args)
+
+        if not self._slots.acquire(blocking=False):
+            raise HashingOverloaded()
+        try:
+            future = self._executor.submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            raise HashingOverloaded()
@@ -16,6 +16,12 @@ class BiasDetector:
             bias_patterns: Dictionary mapping bias names to lists of detection patterns
         """
         self.bias_patterns = bias_patterns
+        
+        # Compile once up front instead of on every call
+        self.compiled_patterns = {
+            bias_name: [re.compile(pattern.lower()) for pattern in patterns]
+            for bias_name, patterns in bias_patterns.items()
+        }
     
     def detect_biases(self, text: str) -> List[Dict[str, Any]]:
         """
@@ -32,11 +38,11 @@ class BiasDetector:
         # Convert text to lowercase for case-insensitive matching
         text_lower = text.lower()
         
-        for bias_name, patterns in self.bias_patterns.items():
+        for bias_name, patterns in self.compiled_patterns.items():
             # Check for pattern matches
             evidence = []
             for pattern in patterns:
-                matches = re.findall(pattern.lower(), text_lower)
+                matches = pattern.findall(text_lower)
                 evidence.extend(matches)
             
             # Calculate confidence based on number of matches
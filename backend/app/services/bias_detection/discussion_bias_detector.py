@@ -0,0 +1,237 @@
+# app/services/bias_detection/discussion_bias_detector.py
+import re
+from collections import deque
+from typing import Dict, Any, List, Optional
+
+# "+1" starts with a non-word character, so it can't sit inside the \b...\b group
+AGREE_PATTERN = re.compile(
+    r"\b(?:i agree|agreed|exactly|absolutely|good point|sounds good|makes sense|same here|yes)\b"
+    r"|(?<![\w+])\+1(?!\.?\d)"
+)
+DISAGREE_PATTERN = re.compile(
+    r"\b(?:disagree|i doubt|not sure|not convinced|concern(?:ed)?|object(?:ion)?|however|on the other hand|instead|why not)\b"
+)
+NUMBER_PATTERN = re.compile(
+    r"(?<![\w.])\$?(\d{1,3}(?:,\d{3})+|\d+)(\.\d+)?\s*(k|m|bn|thousand|million|billion|%)?(?![\w.]\w)"
+)
+MULTIPLIERS = {'k': 1e3, 'thousand': 1e3, 'm': 1e6, 'million': 1e6, 'bn': 1e9, 'billion': 1e9}
+
+class DiscussionWindow:
+    """
+    Streaming state of one discussion: its last `size` messages, reduced to
+    (sequence number, author, stance, figures, figures near the anchor),
+    plus running totals over them and the discussion's first figure (the
+    anchor).
+
+    Adding a message and dropping the oldest one adjust the totals, so an
+    update does not depend on the window size or the discussion length.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.entries = deque()
+        self.anchor = None
+        self.anchor_seq = None
+        self.agree = 0
+        self.disagree = 0
+        self.figures = 0
+        self.near = 0
+        self.speakers = {}
+        self.squares = 0  # Sum of squared per-speaker message counts
+
+    def push(self, seq: int, user_id: str, stance: int, figures: int, near: int):
+        self._apply((seq, user_id, stance, figures, near), 1)
+        self.entries.append((seq, user_id, stance, figures, near))
+        if len(self.entries) > self.size:
+            self._apply(self.entries.popleft(), -1)
+
+    def concentration(self) -> float:
+        """Normalized Herfindahl-Hirschman index of authorship: 0 even, 1 one speaker."""
+        total = len(self.entries)
+        speakers = len(self.speakers)
+        if total == 0:
+            return 0.0
+        if speakers == 1:
+            return 1.0
+        hhi = self.squares / (total * total)
+        return (hhi - 1 / speakers) / (1 - 1 / speakers)
+
+    def to_state(self) -> Dict[str, Any]:
+        return {
+            'anchor': self.anchor,
+            'anchor_seq': self.anchor_seq,
+            'entries': [list(entry) for entry in self.entries]
+        }
+
+    @classmethod
+    def from_state(cls, size: int, state: Optional[Dict[str, Any]]) -> 'DiscussionWindow':
+        window = cls(size)
+        if state:
+            window.anchor = state.get('anchor')
+            window.anchor_seq = state.get('anchor_seq')
+            for entry in _entries(state)[-size:]:
+                window.push(*entry)
+        return window
+
+    def merge_into(self, state: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Combine this window with another worker's saved state of the same discussion.
+
+        Each may have seen messages the other hasn't; entries are matched by
+        sequence number, and the anchor seen first wins.
+        """
+        ours = self.to_state()
+        if not state:
+            return ours
+        entries = {entry[0]: entry for entry in _entries(state)}
+        entries.update((entry[0], entry) for entry in ours['entries'])
+        anchors = [s for s in (state, ours) if s.get('anchor') is not None]
+        first = min(anchors, key=lambda s: s.get('anchor_seq') or 0) if anchors else {}
+        return {
+            'anchor': first.get('anchor'),
+            'anchor_seq': first.get('anchor_seq'),
+            'entries': [list(entries[seq]) for seq in sorted(entries)][-self.size:]
+        }
+
+    def _apply(self, entry, sign: int):
+        _, user_id, stance, figures, near = entry
+        if stance > 0:
+            self.agree += sign
+        elif stance < 0:
+            self.disagree += sign
+        self.figures += sign * figures
+        self.near += sign * near
+
+        count = self.speakers.get(user_id, 0)
+        self.squares += (count + sign) ** 2 - count ** 2
+        if count + sign:
+            self.speakers[user_id] = count + sign
+        else:
+            del self.speakers[user_id]
+
+class DiscussionBiasDetector:
+    """
+    Detects biases that only show across messages, over a sliding window of
+    each discussion's most recent messages.
+
+    Groupthink: nearly every recent message that takes a stance agrees,
+    weighted up when a few speakers dominate the window. Anchoring: most
+    figures mentioned recently stay close to the first figure mentioned in
+    the discussion.
+
+    Windows are kept in the shared cache between batches, so any worker can
+    continue a discussion; a window that was evicted simply refills. Workers
+    analyzing the same discussion at once merge their windows on save
+    instead of overwriting each other's.
+    """
+
+    def __init__(self, window: int = 20, min_stances: int = 5, agreement_ratio: float = 0.8,
+                 min_figures: int = 3, anchor_share: float = 0.6, anchor_tolerance: float = 0.1):
+        """
+        Initialize the detector.
+
+        Args:
+            window: Number of most recent messages considered
+            min_stances: Agreeing or dissenting messages needed to judge Groupthink
+            agreement_ratio: Share of agreeing stances that signals Groupthink
+            min_figures: Figures needed to judge Anchoring
+            anchor_share: Share of figures near the anchor that signals Anchoring
+            anchor_tolerance: Relative distance from the anchor counted as near
+        """
+        self.window = window
+        self.min_stances = min_stances
+        self.agreement_ratio = agreement_ratio
+        self.min_figures = min_figures
+        self.anchor_share = anchor_share
+        self.anchor_tolerance = anchor_tolerance
+
+    def load(self, discussion_id: str) -> DiscussionWindow:
+        from app import cache
+        return DiscussionWindow.from_state(self.window, cache.get(_namespace(discussion_id), 'window'))
+
+    def save(self, discussion_id: str, window: DiscussionWindow):
+        from app import cache
+        cache.update(_namespace(discussion_id), 'window', window.merge_into, ttl=0)
+
+    def observe(self, window: DiscussionWindow, seq: Optional[int], user_id: str, text: str) -> List[Dict[str, Any]]:
+        """
+        Add a message to a discussion's window and detect discussion-level biases.
+
+        Args:
+            window: The discussion's window, from `load`
+            seq: The message's sequence number in the discussion
+            user_id: The message's author
+            text: The message's content
+
+        Returns:
+            List of detected biases with confidence scores and evidence, in
+            the same form as BiasDetector.detect_biases
+        """
+        text_lower = text.lower()
+        agrees = AGREE_PATTERN.search(text_lower) is not None
+        dissents = DISAGREE_PATTERN.search(text_lower) is not None
+        stance = 0 if agrees == dissents else (1 if agrees else -1)
+
+        figures = near = 0
+        for value in _figures(text_lower):
+            if window.anchor is None:
+                # The first figure sets the anchor and is not judged against itself
+                window.anchor = value
+                window.anchor_seq = seq
+                continue
+            figures += 1
+            if abs(value - window.anchor) <= self.anchor_tolerance * abs(window.anchor):
+                near += 1
+
+        window.push(seq or 0, user_id, stance, figures, near)
+        return self.detect(window)
+
+    def detect(self, window: DiscussionWindow) -> List[Dict[str, Any]]:
+        """Judge a window's current totals."""
+        detected_biases = []
+
+        stances = window.agree + window.disagree
+        if stances >= self.min_stances:
+            ratio = window.agree / stances
+            if ratio >= self.agreement_ratio:
+                concentration = window.concentration()
+                detected_biases.append({
+                    "name": "Groupthink",
+                    "confidence": round(min(ratio * (0.6 + 0.4 * concentration), 0.9), 2),
+                    "evidence": (
+                        f"{window.agree} of {stances} recent stances agree; "
+                        f"speaker concentration {concentration:.2f}"
+                    )
+                })
+
+        if window.figures >= self.min_figures:
+            share = window.near / window.figures
+            if share >= self.anchor_share:
+                detected_biases.append({
+                    "name": "Anchoring Bias",
+                    "confidence": round(min(share * 0.8, 0.9), 2),
+                    "evidence": (
+                        f"{window.near} of {window.figures} recent figures within "
+                        f"{self.anchor_tolerance:.0%} of the first one ({window.anchor:g})"
+                    )
+                })
+
+        return detected_biases
+
+def _figures(text: str) -> List[float]:
+    values = []
+    for digits, decimals, unit in NUMBER_PATTERN.findall(text):
+        value = float(digits.replace(',', '') + decimals)
+        if not unit and not decimals and 1900 <= value <= 2100:
+            # Most likely a year
+            continue
+        values.append(value * MULTIPLIERS.get(unit, 1))
+    return values
+
+def _entries(state: Dict[str, Any]) -> List[List[Any]]:
+    entries = state.get('entries', [])
+    # States saved before entries carried sequence numbers; number them just below any real one
+    return [entry if len(entry) == 5 else [i - len(entries)] + list(entry) for i, entry in enumerate(entries)]
+
+def _namespace(discussion_id: str) -> str:
+    return f'discussion:{discussion_id}:bias_window'
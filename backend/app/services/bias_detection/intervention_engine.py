@@ -0,0 +1,316 @@
+# app/services/bias_detection/intervention_engine.py
+import logging
+import threading
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional
+
+from sqlalchemy import func, select
+
+from app.services.analytics.workspace_analytics import bias_list
+
+logger = logging.getLogger(__name__)
+
+# Bias name -> intervention_type; other biases get the default
+INTERVENTION_TYPES = {
+    'Groupthink': 'devils_advocate',
+    'Confirmation Bias': 'counter_evidence',
+    'Anchoring Bias': 'alternative_anchors',
+    'Availability Heuristic': 'base_rates',
+    'Status Quo Bias': 'cost_of_inaction'
+}
+DEFAULT_INTERVENTION_TYPE = 'reflection'
+
+class BiasTrack:
+    """Rolling confidence of one bias in one discussion."""
+
+    __slots__ = ('confidence', 'streak', 'armed', 'fired_at')
+
+    def __init__(self, confidence: float = 0.0, streak: int = 0, armed: bool = True,
+                 fired_at: Optional[float] = None):
+        self.confidence = confidence
+        self.streak = streak
+        self.armed = armed
+        self.fired_at = fired_at
+
+    def to_state(self) -> List[Any]:
+        return [self.confidence, self.streak, self.armed, self.fired_at]
+
+class InterventionEngine:
+    """
+    Turns detected biases into bias_interventions as analyses arrive.
+
+    For every discussion and bias the engine keeps an exponentially weighted
+    moving average of the bias's confidence over the discussion's analyses
+    (0 for analyses that don't detect it). An intervention fires when the
+    average has stayed at or above INTERVENTION_THRESHOLD for
+    INTERVENTION_DEBOUNCE analyses in a row. The bias then has to fall back
+    below INTERVENTION_RESET_THRESHOLD before it can fire again, and never
+    fires twice within INTERVENTION_COOLDOWN_SECONDS; a discussion gets at
+    most one intervention per INTERVENTION_DISCUSSION_COOLDOWN_SECONDS.
+
+    A discussion's analyses may be published by any worker, so its rolling
+    averages live in the shared cache and are folded in with Cache.update,
+    which keeps concurrent workers from overwriting each other. The event
+    listener only records analyses; a background thread folds them in per
+    discussion and writes the interventions that fire in batches, checking
+    the cooldowns again against the table. Averages that were evicted from
+    the cache start again from zero.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.alpha = 0.3
+        self.threshold = 0.15
+        self.reset_threshold = 0.05
+        self.debounce = 2
+        self.cooldown = 900.0
+        self.discussion_cooldown = 120.0
+        self.flush_interval = 0.5
+        self._observations = []
+        self._pending = []
+        self._condition = threading.Condition()
+        self._worker = None
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app, hub=None):
+        """
+        Bind the engine to an application and subscribe it to analysis events.
+
+        Args:
+            app: The Flask application whose context the writer runs in
+            hub: EventHub whose 'analysis.created' events are evaluated
+        """
+        self.app = app
+        self.alpha = app.config['INTERVENTION_ALPHA']
+        self.threshold = app.config['INTERVENTION_THRESHOLD']
+        self.reset_threshold = app.config['INTERVENTION_RESET_THRESHOLD']
+        self.debounce = app.config['INTERVENTION_DEBOUNCE']
+        self.cooldown = app.config['INTERVENTION_COOLDOWN_SECONDS']
+        self.discussion_cooldown = app.config['INTERVENTION_DISCUSSION_COOLDOWN_SECONDS']
+        self.flush_interval = app.config['INTERVENTION_FLUSH_INTERVAL']
+        if hub is not None:
+            hub.add_listener(self._on_events)
+        app.extensions['intervention_engine'] = self
+
+    def flush(self) -> int:
+        """
+        Fold in recorded analyses and write queued interventions now, on the
+        calling thread.
+
+        Returns:
+            Number of interventions written
+        """
+        with self._condition:
+            observations, self._observations = self._observations, []
+            batch, self._pending = self._pending, []
+
+        by_discussion = {}
+        for discussion_id, detected_biases in observations:
+            by_discussion.setdefault(discussion_id, []).append(detected_biases)
+        now = time.time()
+        for discussion_id, detected_list in by_discussion.items():
+            try:
+                batch.extend(self._fold(discussion_id, detected_list, now))
+            except Exception:
+                logger.exception("Folding %d analyses of discussion %s failed", len(detected_list), discussion_id)
+        return self._write(batch)
+
+    def _fold(self, discussion_id: str, detected_list: List[Any], now: float) -> List[Dict[str, Any]]:
+        """Fold analyses of one discussion, in order, into its shared state in one cache update."""
+        from app import cache
+
+        fired = []
+
+        def apply(state):
+            state = state or {}
+            tracks = {name: BiasTrack(*track) for name, track in state.get('tracks', {}).items()}
+            last_fired = state.get('last_fired')
+
+            for detected_biases in detected_list:
+                detected = {}
+                # Message-level and discussion-level detections of the same bias reinforce each other
+                for bias in bias_list(detected_biases) + bias_list(detected_biases, 'discussion_biases'):
+                    name = bias.get('name')
+                    if name:
+                        detected[name] = max(detected.get(name, 0.0), float(bias.get('confidence') or 0.0))
+
+                for name in detected.keys() - tracks.keys():
+                    tracks[name] = BiasTrack()
+
+                for name, track in tracks.items():
+                    track.confidence += self.alpha * (detected.get(name, 0.0) - track.confidence)
+                    if track.confidence < self.reset_threshold:
+                        track.armed = True
+                    if track.confidence < self.threshold:
+                        track.streak = 0
+                        continue
+
+                    track.streak += 1
+                    if not track.armed or track.streak < self.debounce:
+                        continue
+                    if track.fired_at is not None and now - track.fired_at < self.cooldown:
+                        continue
+                    if last_fired is not None and now - last_fired < self.discussion_cooldown:
+                        continue
+
+                    track.armed = False
+                    track.fired_at = last_fired = now
+                    fired.append({
+                        'discussion_id': discussion_id,
+                        'bias': name,
+                        'confidence': round(track.confidence, 2),
+                        'fired_at': datetime.utcfromtimestamp(now)
+                    })
+
+            return {
+                'tracks': {name: track.to_state() for name, track in tracks.items()},
+                'last_fired': last_fired
+            }
+
+        # No expiry; the cache's LRU bounds how many discussions are tracked
+        if cache.update(_namespace(discussion_id), 'tracks', apply, ttl=0) is None:
+            # The state was not saved, so nothing fired as far as other workers can tell
+            return []
+        return fired
+
+    def _on_events(self, events):
+        observations = [
+            (event.discussion_id, event.data.get('detected_biases'))
+            for event in events if event.event_type == 'analysis.created'
+        ]
+        if not observations:
+            return
+        with self._condition:
+            self._observations.extend(observations)
+            self._start_worker()
+            self._condition.notify()
+
+    def _start_worker(self):
+        # Called with the condition held
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name='bias-interventions', daemon=True)
+            self._worker.start()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._pending and not self._observations:
+                    self._condition.wait()
+            # Collect whatever else arrives meanwhile into the same transaction
+            time.sleep(self.flush_interval)
+            with self.app.app_context():
+                try:
+                    self.flush()
+                except Exception:
+                    logger.exception("Writing bias interventions failed")
+
+    def _write(self, batch: List[Dict[str, Any]]) -> int:
+        from app import cache, db, event_hub, shard_router
+        from app.models.analysis import BiasIntervention, CognitiveBias
+        from app.services.events.event_hub import Event
+
+        if not batch:
+            return 0
+
+        # Same cache entry as GET /biases
+        catalogue = {bias['name']: bias for bias in cache.get_or_set(
+            'biases', 'all',
+            lambda: [bias.to_dict() for bias in CognitiveBias.query.all()],
+            ttl=3600
+        )}
+
+        by_shard = defaultdict(list)
+        for fired in batch:
+            if fired['bias'] not in catalogue:
+                logger.debug("Skipping intervention for %s, which is not in the bias catalogue", fired['bias'])
+                continue
+            # The writer thread has no request to take the shard from
+            workspace_id = shard_router.workspace_for('discussion_id', fired['discussion_id'])
+            if workspace_id is not None:
+                by_shard[shard_router.shard_for_workspace(workspace_id)].append(fired)
+
+        table = BiasIntervention.__table__
+        written = 0
+        for shard, fired_list in by_shard.items():
+            with shard_router.use(shard):
+                try:
+                    rows = self._rows(fired_list, catalogue)
+                    if not rows:
+                        continue
+                    db.session.execute(table.insert(), rows)
+                    db.session.commit()
+                except Exception:
+                    db.session.rollback()
+                    logger.exception("Writing %d bias interventions failed", len(fired_list))
+                    continue
+
+            written += len(rows)
+            event_hub.publish_many([Event(row['discussion_id'], 'intervention.created', {
+                'id': row['id'],
+                'discussion_id': row['discussion_id'],
+                'bias_id': row['bias_id'],
+                'intervention_type': row['intervention_type'],
+                'content': row['content'],
+                'created_at': row['created_at'].isoformat(),
+                'displayed_at': None,
+                'acknowledged_at': None
+            }) for row in rows])
+        return written
+
+    def _rows(self, fired_list: List[Dict[str, Any]], catalogue: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Build insert rows, dropping interventions another worker already made within the cooldowns."""
+        from app import db
+        from app.models.analysis import BiasIntervention
+
+        oldest = min(fired['fired_at'] for fired in fired_list) - timedelta(
+            seconds=max(self.cooldown, self.discussion_cooldown)
+        )
+        recent = db.session.execute(select(
+            BiasIntervention.discussion_id,
+            BiasIntervention.bias_id,
+            func.max(BiasIntervention.created_at)
+        ).where(
+            BiasIntervention.discussion_id.in_({fired['discussion_id'] for fired in fired_list}),
+            BiasIntervention.created_at >= oldest
+        ).group_by(BiasIntervention.discussion_id, BiasIntervention.bias_id)).all()
+
+        last_by_bias = {(discussion_id, bias_id): at for discussion_id, bias_id, at in recent}
+        last_by_discussion = {}
+        for (discussion_id, _), at in last_by_bias.items():
+            last_by_discussion[discussion_id] = max(at, last_by_discussion.get(discussion_id, at))
+
+        rows = []
+        for fired in sorted(fired_list, key=lambda fired: fired['fired_at']):
+            bias = catalogue[fired['bias']]
+            discussion_id, at = fired['discussion_id'], fired['fired_at']
+            last = last_by_bias.get((discussion_id, bias['id']))
+            if last is not None and (at - last).total_seconds() < self.cooldown:
+                continue
+            last = last_by_discussion.get(discussion_id)
+            if last is not None and (at - last).total_seconds() < self.discussion_cooldown:
+                continue
+
+            last_by_bias[(discussion_id, bias['id'])] = last_by_discussion[discussion_id] = at
+            rows.append({
+                'id': str(uuid.uuid4()),
+                'discussion_id': discussion_id,
+                'bias_id': bias['id'],
+                'intervention_type': INTERVENTION_TYPES.get(bias['name'], DEFAULT_INTERVENTION_TYPE),
+                'content': _content(bias, fired['confidence']),
+                'created_at': at
+            })
+        return rows
+
+def _content(bias: Dict[str, Any], confidence: float) -> str:
+    text = f"Recent messages show signs of {bias['name']} (rolling confidence {confidence:.2f})."
+    if bias.get('mitigation_strategies'):
+        text += f" {bias['mitigation_strategies']}"
+    return text
+
+def _namespace(discussion_id: str) -> str:
+    return f'discussion:{discussion_id}:bias_tracks'
@@ -0,0 +1,395 @@
+# app/services/cache/cache.py
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+class CacheStats:
+    """Hit, miss, write and eviction counters for one process."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.sets = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def incr(self, name: str, amount: int = 1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def to_dict(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'sets': self.sets,
+            'evictions': self.evictions,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else None
+        }
+
+class MemoryBackend:
+    """
+    Size-bounded LRU cache local to one process.
+    """
+
+    name = 'memory'
+
+    def __init__(self, max_entries: int, stats: CacheStats):
+        self.max_entries = max_entries
+        self.stats = stats
+        self._entries = OrderedDict()  # (namespace, key) -> (expires_at, value)
+        self._namespaces = {}  # namespace -> set of keys
+        self._lock = threading.Lock()
+
+    def get(self, namespace: str, key: str):
+        with self._lock:
+            entry = self._entries.get((namespace, key))
+            if entry is None:
+                return _MISSING
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.time():
+                self._remove((namespace, key))
+                return _MISSING
+            self._entries.move_to_end((namespace, key))
+            return value
+
+    def set(self, namespace: str, key: str, value: Any, expires_at: Optional[float]):
+        with self._lock:
+            evicted = self._store(namespace, key, value, expires_at)
+        if evicted:
+            self.stats.incr('evictions', evicted)
+
+    def update(self, namespace: str, key: str, fn: Callable[[Any], Any], expires_at: Optional[float]):
+        with self._lock:
+            entry = self._entries.get((namespace, key))
+            current = None
+            if entry is not None and (entry[0] is None or entry[0] > time.time()):
+                current = entry[1]
+            value = fn(current)
+            evicted = self._store(namespace, key, value, expires_at)
+        if evicted:
+            self.stats.incr('evictions', evicted)
+        return value
+
+    def delete(self, namespace: str, key: str):
+        with self._lock:
+            self._remove((namespace, key))
+
+    def invalidate(self, namespace: str):
+        with self._lock:
+            for key in self._namespaces.pop(namespace, ()):
+                self._entries.pop((namespace, key), None)
+
+    def size(self) -> int:
+        return len(self._entries)
+
+    def _store(self, namespace: str, key: str, value: Any, expires_at: Optional[float]) -> int:
+        self._entries[(namespace, key)] = (expires_at, value)
+        self._entries.move_to_end((namespace, key))
+        self._namespaces.setdefault(namespace, set()).add(key)
+
+        evicted = 0
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            evicted += 1
+        return evicted
+
+    def _remove(self, entry_key):
+        if self._entries.pop(entry_key, None) is not None:
+            keys = self._namespaces.get(entry_key[0])
+            if keys is not None:
+                keys.discard(entry_key[1])
+                if not keys:
+                    del self._namespaces[entry_key[0]]
+
+class SQLiteBackend:
+    """
+    Cache shared by every worker on a host through a local SQLite file.
+
+    Entries are evicted least-recently-used first once the table grows past
+    max_entries. Access times are only refreshed when they are older than
+    `touch_interval` seconds, so reads rarely turn into writes.
+    """
+
+    name = 'sqlite'
+
+    def __init__(self, path: str, max_entries: int, stats: CacheStats, touch_interval: float = 30.0):
+        self.path = path
+        self.max_entries = max_entries
+        self.stats = stats
+        self.touch_interval = touch_interval
+        self._local = threading.local()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        conn = self._connection()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                expires_at REAL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_cache_entries_accessed_at ON cache_entries(accessed_at)")
+
+    def _connection(self):
+        # sqlite3 connections can't be shared across threads or forked processes
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, namespace: str, key: str):
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT value, expires_at, accessed_at FROM cache_entries WHERE namespace = ? AND key = ?",
+            (namespace, key)
+        ).fetchone()
+        if row is None:
+            return _MISSING
+
+        value, expires_at, accessed_at = row
+        now = time.time()
+        if expires_at is not None and expires_at <= now:
+            conn.execute("DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (namespace, key))
+            return _MISSING
+        if now - accessed_at > self.touch_interval:
+            conn.execute(
+                "UPDATE cache_entries SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                (now, namespace, key)
+            )
+        return json.loads(value)
+
+    def set(self, namespace: str, key: str, value: Any, expires_at: Optional[float]):
+        conn = self._connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache_entries (namespace, key, value, expires_at, accessed_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (namespace, key, json.dumps(value), expires_at, time.time())
+        )
+        self._evict(conn)
+
+    def update(self, namespace: str, key: str, fn: Callable[[Any], Any], expires_at: Optional[float]):
+        conn = self._connection()
+        # Takes the write lock up front, so concurrent updates from any worker run one after another
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT value, expires_at FROM cache_entries WHERE namespace = ? AND key = ?",
+                (namespace, key)
+            ).fetchone()
+            current = None
+            if row is not None and (row[1] is None or row[1] > time.time()):
+                current = json.loads(row[0])
+            value = fn(current)
+            conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (namespace, key, value, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (namespace, key, json.dumps(value), expires_at, time.time())
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        self._evict(conn)
+        return value
+
+    def delete(self, namespace: str, key: str):
+        self._connection().execute(
+            "DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (namespace, key)
+        )
+
+    def invalidate(self, namespace: str):
+        self._connection().execute("DELETE FROM cache_entries WHERE namespace = ?", (namespace,))
+
+    def size(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0]
+
+    def _evict(self, conn):
+        excess = self.size() - self.max_entries
+        if excess > 0:
+            conn.execute(
+                "DELETE FROM cache_entries WHERE rowid IN "
+                "(SELECT rowid FROM cache_entries ORDER BY accessed_at LIMIT ?)",
+                (excess,)
+            )
+            self.stats.incr('evictions', excess)
+
+class Cache:
+    """
+    Namespaced cache with TTLs and a pluggable backend.
+
+    Values must be JSON-serializable. Invalidating a namespace drops every
+    key in it, so callers group keys by what invalidates them together,
+    e.g. one namespace per workspace.
+    """
+
+    def __init__(self, app=None):
+        self.backend = None
+        self.default_ttl = None
+        self.stats = CacheStats()
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """
+        Bind the cache to an application and choose its backend from config.
+
+        Args:
+            app: The Flask application
+        """
+        backend = app.config['CACHE_BACKEND']
+        max_entries = app.config['CACHE_MAX_ENTRIES']
+        self.default_ttl = app.config['CACHE_DEFAULT_TTL']
+
+        if backend == 'memory':
+            self.backend = MemoryBackend(max_entries, self.stats)
+        elif backend == 'sqlite':
+            self.backend = SQLiteBackend(app.config['CACHE_PATH'], max_entries, self.stats)
+        else:
+            raise ValueError(f"Unknown cache backend: {backend}")
+
+        app.extensions['cache'] = self
+
+    def get(self, namespace: str, key: str, default: Any = None) -> Any:
+        """
+        Look up a key.
+
+        Args:
+            namespace: Group of keys invalidated together
+            key: Key within the namespace
+            default: Returned when the key is missing or expired
+        """
+        try:
+            value = self.backend.get(namespace, key)
+        except Exception:
+            # A broken cache must only cost performance, never correctness
+            logger.exception("Cache read failed for %s/%s", namespace, key)
+            value = _MISSING
+
+        if value is _MISSING:
+            self.stats.incr('misses')
+            return default
+        self.stats.incr('hits')
+        return value
+
+    def set(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None):
+        """
+        Store a value.
+
+        Args:
+            namespace: Group of keys invalidated together
+            key: Key within the namespace
+            value: JSON-serializable value
+            ttl: Seconds until the entry expires; defaults to CACHE_DEFAULT_TTL
+        """
+        ttl = self.default_ttl if ttl is None else ttl
+        expires_at = time.time() + ttl if ttl else None
+        try:
+            self.backend.set(namespace, key, value, expires_at)
+            self.stats.incr('sets')
+        except Exception:
+            logger.exception("Cache write failed for %s/%s", namespace, key)
+
+    def update(self, namespace: str, key: str, fn: Callable[[Any], Any], ttl: Optional[float] = None) -> Any:
+        """
+        Replace a value with `fn(current value)` atomically.
+
+        Concurrent updates of the same key, from any worker sharing the
+        backend, run one after another, so none is lost the way it can be
+        with get followed by set. `fn` gets None for a missing key and may
+        run while other updates wait, so it should be quick.
+
+        Args:
+            namespace: Group of keys invalidated together
+            key: Key within the namespace
+            fn: Called with the current value, returns the new one
+            ttl: Seconds until the entry expires; defaults to CACHE_DEFAULT_TTL
+
+        Returns:
+            The stored value, or None if the backend failed
+        """
+        ttl = self.default_ttl if ttl is None else ttl
+        expires_at = time.time() + ttl if ttl else None
+        try:
+            value = self.backend.update(namespace, key, fn, expires_at)
+            self.stats.incr('sets')
+            return value
+        except Exception:
+            logger.exception("Cache update failed for %s/%s", namespace, key)
+            return None
+
+    def delete(self, namespace: str, key: str):
+        """Remove a single key."""
+        try:
+            self.backend.delete(namespace, key)
+        except Exception:
+            logger.exception("Cache delete failed for %s/%s", namespace, key)
+
+    def invalidate(self, namespace: str):
+        """Remove every key in a namespace."""
+        try:
+            self.backend.invalidate(namespace)
+        except Exception:
+            logger.exception("Cache invalidation failed for %s", namespace)
+
+    def get_or_set(self, namespace: str, key: str, factory: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        """
+        Return a cached value, computing and storing it on a miss.
+
+        Args:
+            namespace: Group of keys invalidated together
+            key: Key within the namespace
+            factory: Called without arguments to compute a missing value
+            ttl: Seconds until the entry expires
+        """
+        value = self.get(namespace, key, _MISSING)
+        if value is _MISSING:
+            value = factory()
+            self.set(namespace, key, value, ttl)
+        return value
+
+    def cached(self, namespace: Callable[..., str], key: Callable[..., str], ttl: Optional[float] = None):
+        """
+        Decorator caching a function's return value.
+
+        Args:
+            namespace: Builds the namespace from the function's arguments
+            key: Builds the key from the function's arguments
+            ttl: Seconds until entries expire
+        """
+        def decorator(fn):
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                return self.get_or_set(
+                    namespace(*args, **kwargs),
+                    key(*args, **kwargs),
+                    lambda: fn(*args, **kwargs),
+                    ttl
+                )
+            return wrapper
+        return decorator
+
+    def stats_dict(self) -> Dict[str, Any]:
+        """Return this process's counters along with the backend's size."""
+        return dict(self.stats.to_dict(), backend=self.backend.name, entries=self.backend.size())
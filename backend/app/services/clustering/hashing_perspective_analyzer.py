@@ -0,0 +1,226 @@
+# app/services/clustering/hashing_perspective_analyzer.py
+import json
+import time
+from typing import TYPE_CHECKING, Dict, Any, Iterable, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    # For annotations only; numpy is loaded along with the model
+    import numpy as np
+
+# Passed to HashingVectorizer at training and inference time; stored in the model file
+DEFAULT_VECTORIZER_PARAMS = {
+    'n_features': 2 ** 18,
+    'ngram_range': [1, 2],
+    'alternate_sign': False,
+    'norm': 'l2',
+    'lowercase': True
+}
+
+PERSPECTIVE_BACKENDS = ('keyword', 'hashing')
+
+# Keyword analyzer's dimensions, in its order. Trained models emit exactly these,
+# so stored vectors, exports, opinion maps and decision metrics stay comparable
+DIMENSION_ORDER = ('factual', 'emotional', 'logical', 'intuitive')
+
+# Logit of a dimension no training example had; its softmax value rounds to 0
+MISSING_DIMENSION_LOGIT = -30.0
+
+class HashingPerspectiveAnalyzer:
+    """
+    Scores perspective dimensions with a linear model over hashed word and
+    bigram features.
+
+    HashingVectorizer needs no vocabulary, so the model file only holds the
+    vectorizer parameters, the dimension names and the weight matrix. A
+    batch of texts becomes one sparse matrix, and its scores one sparse
+    matrix product followed by a softmax, so values sum to 1 like the
+    keyword analyzer's. Train models offline with `train` (or
+    `flask train-perspective-model`).
+    """
+
+    def __init__(self, dimensions: List[str], coef: 'np.ndarray', intercept: 'np.ndarray',
+                 vectorizer_params: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the analyzer from trained weights.
+
+        Args:
+            dimensions: Dimension names, one per row of `coef`; must be DIMENSION_ORDER
+            coef: Weights of shape (dimensions, n_features)
+            intercept: Biases of shape (dimensions,)
+            vectorizer_params: HashingVectorizer parameters the weights were trained with
+        """
+        import numpy as np
+        from sklearn.feature_extraction.text import HashingVectorizer
+
+        if list(dimensions) != list(DIMENSION_ORDER):
+            raise ValueError(
+                f"Perspective model dimensions {list(dimensions)} don't match {list(DIMENSION_ORDER)}; retrain it"
+            )
+
+        params = dict(vectorizer_params or DEFAULT_VECTORIZER_PARAMS)
+        params['ngram_range'] = tuple(params['ngram_range'])
+        self.vectorizer_params = params
+        self.vectorizer = HashingVectorizer(dtype=np.float32, **params)
+        self.dimension_names = list(dimensions)
+        # Transposed once so inference is a (texts x features) @ (features x dimensions) product
+        self.weights = np.ascontiguousarray(np.asarray(coef, dtype=np.float32).T)
+        self.intercept = np.asarray(intercept, dtype=np.float32)
+
+    @classmethod
+    def load(cls, path: str) -> 'HashingPerspectiveAnalyzer':
+        """
+        Load a model saved by `save`.
+
+        Args:
+            path: Path of the .npz model file
+        """
+        import numpy as np
+
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data['meta']))
+            return cls(meta['dimensions'], data['coef'], data['intercept'], meta['vectorizer_params'])
+
+    def save(self, path: str):
+        """Write the model as an uncompressed .npz file, which loads without unpickling."""
+        import numpy as np
+
+        params = dict(self.vectorizer_params, ngram_range=list(self.vectorizer_params['ngram_range']))
+        meta = json.dumps({'dimensions': self.dimension_names, 'vectorizer_params': params})
+        with open(path, 'wb') as f:
+            np.savez(f, meta=np.array(meta), coef=self.weights.T, intercept=self.intercept)
+
+    @classmethod
+    def train(cls, texts: Iterable[str], labels: Iterable[str],
+              vectorizer_params: Optional[Dict[str, Any]] = None, c: float = 10.0) -> 'HashingPerspectiveAnalyzer':
+        """
+        Fit a multinomial logistic regression on hashed features.
+
+        The model always scores every dimension in DIMENSION_ORDER; ones
+        without training examples score 0.
+
+        Args:
+            texts: Training texts
+            labels: Dimension name of each text, one of DIMENSION_ORDER
+            vectorizer_params: HashingVectorizer parameters, DEFAULT_VECTORIZER_PARAMS by default
+            c: Inverse regularization strength
+
+        Returns:
+            The trained analyzer
+
+        Raises:
+            ValueError: If a label is not a known dimension
+        """
+        import numpy as np
+        from sklearn.feature_extraction.text import HashingVectorizer
+        from sklearn.linear_model import LogisticRegression
+
+        labels = [str(label) for label in labels]
+        unknown = sorted(set(labels) - set(DIMENSION_ORDER))
+        if unknown:
+            raise ValueError(f"Unknown perspective labels {unknown}; expected one of {list(DIMENSION_ORDER)}")
+
+        params = dict(vectorizer_params or DEFAULT_VECTORIZER_PARAMS)
+        params['ngram_range'] = tuple(params['ngram_range'])
+        features = HashingVectorizer(dtype=np.float32, **params).transform(list(texts))
+
+        model = LogisticRegression(C=c, max_iter=1000)
+        model.fit(features, labels)
+
+        trained_coef, trained_intercept = model.coef_, model.intercept_
+        if len(model.classes_) == 2:
+            # Binary models keep one row; softmax over [0, z] equals their sigmoid
+            trained_coef = np.vstack([np.zeros_like(trained_coef), trained_coef])
+            trained_intercept = np.concatenate([[0.0], trained_intercept])
+
+        # Lay rows out in DIMENSION_ORDER, padding dimensions the labels never used
+        coef = np.zeros((len(DIMENSION_ORDER), features.shape[1]), dtype=np.float32)
+        intercept = np.full(len(DIMENSION_ORDER), MISSING_DIMENSION_LOGIT, dtype=np.float32)
+        for row, name in enumerate(model.classes_):
+            index = DIMENSION_ORDER.index(str(name))
+            coef[index] = trained_coef[row]
+            intercept[index] = trained_intercept[row]
+        return cls(list(DIMENSION_ORDER), coef, intercept, params)
+
+    def analyze_perspectives(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """
+        Analyze the perspective dimensions of a batch of texts.
+
+        Args:
+            texts: The texts to analyze
+
+        Returns:
+            One dictionary with perspective dimensions and values per text
+        """
+        import numpy as np
+
+        if not texts:
+            return []
+        scores = self.vectorizer.transform(texts) @ self.weights
+        scores += self.intercept
+        scores -= scores.max(axis=1, keepdims=True)
+        np.exp(scores, out=scores)
+        scores /= scores.sum(axis=1, keepdims=True)
+        return [
+            {"dimensions": self.dimension_names, "values": values}
+            for values in scores.astype(np.float64).round(4).tolist()
+        ]
+
+    def analyze_perspective(self, text: str) -> Dict[str, Any]:
+        """
+        Analyze the perspective dimensions in the provided text.
+
+        Args:
+            text: The text to analyze
+
+        Returns:
+            Dictionary with perspective dimensions and values
+        """
+        return self.analyze_perspectives([text])[0]
+
+def create_perspective_analyzer(backend: str, model_path: Optional[str] = None):
+    """
+    Build the perspective analyzer selected by PERSPECTIVE_BACKEND.
+
+    Args:
+        backend: 'keyword' or 'hashing'
+        model_path: Model file for the 'hashing' backend
+    """
+    if backend == 'keyword':
+        from app.services.clustering.perspective_analyzer import PerspectiveAnalyzer
+        return PerspectiveAnalyzer()
+    if backend == 'hashing':
+        if not model_path:
+            raise ValueError("PERSPECTIVE_MODEL_PATH is required for the 'hashing' perspective backend")
+        return HashingPerspectiveAnalyzer.load(model_path)
+    raise ValueError(f"Unknown perspective backend: {backend}")
+
+def weak_labels(texts: Iterable[str], analyzer=None) -> Tuple[List[str], List[str]]:
+    """
+    Label texts with the keyword analyzer's strongest dimension, skipping
+    texts without any keyword, to bootstrap a model without annotated data.
+
+    Returns:
+        The kept texts and their labels
+    """
+    from app.services.clustering.perspective_analyzer import PerspectiveAnalyzer
+
+    analyzer = analyzer or PerspectiveAnalyzer()
+    kept, labels = [], []
+    for text in texts:
+        result = analyzer.analyze_perspective(text)
+        values = result['values']
+        best = max(range(len(values)), key=values.__getitem__)
+        if values[best] > min(values):
+            kept.append(text)
+            labels.append(result['dimensions'][best])
+    return kept, labels
+
+def measure_load(path: str) -> Dict[str, float]:
+    """Time loading a model file and report the size of its weights."""
+    started = time.perf_counter()
+    analyzer = HashingPerspectiveAnalyzer.load(path)
+    return {
+        'load_ms': round((time.perf_counter() - started) * 1000, 1),
+        'weights_mb': round((analyzer.weights.nbytes + analyzer.intercept.nbytes) / 2 ** 20, 2),
+        'dimensions': len(analyzer.dimension_names)
+    }
@@ -1,7 +1,6 @@
 # app/services/clustering/perspective_analyzer.py
 import re
 from typing import Dict, Any, List
-import numpy as np
 
 class PerspectiveAnalyzer:
     """
@@ -79,3 +78,15 @@ class PerspectiveAnalyzer:
             "dimensions": self.dimension_names,
             "values": normalized_scores
         }
+    
+    def analyze_perspectives(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """
+        Analyze the perspective dimensions of a batch of texts.
+        
+        Args:
+            texts: The texts to analyze
+            
+        Returns:
+            One dictionary with perspective dimensions and values per text
+        """
+        return [self.analyze_perspective(text) for text in texts]
@@ -0,0 +1,72 @@
+# app/services/database/routing.py
+from typing import Dict, Any
+
+from flask import g, has_request_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.sql.dml import UpdateBase
+
+from app.services.database.sharding import DEFAULT_SHARD, current_shard, shard_bind_key, touches_sharded_table
+
+REPLICA_BIND = 'replica'
+
+class RoutingSession(Session):
+    """
+    Session that picks an engine per statement.
+
+    Statements on sharded tables go to the shard selected for the current
+    request or task (see ShardRouter). Reads in replica-eligible requests go
+    to the replica bind. Views opt in with the replica_reads decorator.
+    Everything else, every flush, every INSERT/UPDATE/DELETE statement and
+    every read after the session has written anything goes to the primary,
+    so a request always reads its own writes. Without a 'replica' entry in
+    SQLALCHEMY_BINDS all unsharded queries use the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            if self._flushing or isinstance(clause, UpdateBase):
+                self.info['wrote'] = True
+
+            shard = current_shard()
+            if shard not in (None, DEFAULT_SHARD) and touches_sharded_table(mapper, clause):
+                return self._db.engines[shard_bind_key(shard)]
+
+            if self._use_replica(clause):
+                return self._db.engines[REPLICA_BIND]
+
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _use_replica(self, clause) -> bool:
+        return (
+            REPLICA_BIND in self._db.engines
+            and has_request_context()
+            and g.get('replica_reads', False)
+            and not self.info.get('wrote')
+            and not self._flushing
+            and not isinstance(clause, UpdateBase)
+        )
+
+def set_sqlite_pragmas(dbapi_connection, connection_record, pragmas: Dict[str, Any]):
+    cursor = dbapi_connection.cursor()
+    for name, value in pragmas.items():
+        cursor.execute(f'PRAGMA {name}={value}')
+    cursor.close()
+
+def tune_engines(engines, pragmas: Dict[str, Any]):
+    """
+    Apply per-connection pragmas to every SQLite engine, e.g. WAL mode.
+
+    Args:
+        engines: Mapping of bind key to engine
+        pragmas: PRAGMA name to value, applied in order on each new connection
+    """
+    for engine in engines.values():
+        if engine.dialect.name != 'sqlite' or not pragmas:
+            continue
+        if engine.url.database in (None, '', ':memory:'):
+            continue
+        event.listen(
+            engine, 'connect',
+            lambda dbapi_connection, record: set_sqlite_pragmas(dbapi_connection, record, pragmas)
+        )
@@ -0,0 +1,71 @@
+# app/services/database/schema_upgrade.py
+import logging
+from typing import Iterable, List, Optional
+
+from sqlalchemy import inspect, literal, text
+from sqlalchemy.schema import CreateIndex
+
+logger = logging.getLogger(__name__)
+
+def upgrade_schema(engine, tables: Optional[Iterable[str]] = None) -> List[str]:
+    """
+    Bring tables created by an earlier release up to the current models.
+
+    create_all only creates missing tables, so columns and indexes added to
+    existing tables since are added here. New NOT NULL columns are added
+    with their model default, which fills the existing rows; foreign keys
+    of added columns are not enforced on existing tables. Safe to run on
+    every startup.
+
+    Args:
+        engine: The engine holding the tables
+        tables: Names of the tables to upgrade; every table that exists by default
+
+    Returns:
+        The columns added, as 'table.column'
+    """
+    from app import db
+
+    wanted = set(tables) if tables is not None else None
+    added = []
+
+    with engine.begin() as conn:
+        inspector = inspect(conn)
+        existing = set(inspector.get_table_names())
+        for table in db.metadata.sorted_tables:
+            if table.name not in existing or (wanted is not None and table.name not in wanted):
+                continue
+            present = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in present:
+                    continue
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {_column_ddl(column, engine.dialect)}'))
+                added.append(f'{table.name}.{column.name}')
+
+    for table in db.metadata.sorted_tables:
+        if wanted is not None and table.name not in wanted:
+            continue
+        for index in table.indexes:
+            # One transaction per index, so a failed unique index doesn't undo the others
+            try:
+                with engine.begin() as conn:
+                    conn.execute(CreateIndex(index, if_not_exists=True))
+            except Exception:
+                logger.exception(
+                    "Could not create index %s on %s; remove the rows that violate it and restart",
+                    index.name, table.name
+                )
+
+    if added:
+        logger.info("Added columns %s", ', '.join(added))
+    return added
+
+def _column_ddl(column, dialect) -> str:
+    ddl = f'{column.name} {column.type.compile(dialect=dialect)}'
+    default = column.default.arg if column.default is not None and column.default.is_scalar else None
+    if default is not None:
+        rendered = literal(default, column.type).compile(dialect=dialect, compile_kwargs={'literal_binds': True})
+        ddl += f' DEFAULT {rendered}'
+    if not column.nullable and default is not None:
+        ddl += ' NOT NULL'
+    return ddl
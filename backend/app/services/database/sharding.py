@@ -0,0 +1,344 @@
+# app/services/database/sharding.py
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from flask import request
+from sqlalchemy import inspect as sa_inspect, select, text
+from sqlalchemy.schema import CreateTable
+from sqlalchemy.sql.util import find_tables
+
+logger = logging.getLogger(__name__)
+
+# Shard holding workspaces that have no directory entry: the primary database
+DEFAULT_SHARD = 'default'
+
+# Tables whose rows belong to one workspace and live on its shard
+SHARDED_TABLES = frozenset([
+    'discussions',
+    'discussion_archives',
+    'messages',
+    'message_analysis',
+    'decision_processes',
+    'decision_stages',
+    'decision_documents',
+    'decision_quality_metrics',
+    'decision_quality_state',
+    'bias_interventions'
+])
+
+# Global tables copied to every shard so shard-local joins can read them
+REFERENCE_TABLES = frozenset(['users'])
+
+# View arguments that identify a workspace-owned row, and how to find its workspace
+LOCATOR_QUERIES = {
+    'workspace_id': None,
+    'discussion_id': "SELECT workspace_id FROM discussions WHERE id = :id",
+    'message_id': (
+        "SELECT d.workspace_id FROM messages m "
+        "JOIN discussions d ON d.id = m.discussion_id WHERE m.id = :id"
+    ),
+    'process_id': (
+        "SELECT d.workspace_id FROM decision_processes p "
+        "JOIN discussions d ON d.id = p.discussion_id WHERE p.id = :id"
+    ),
+    'stage_id': (
+        "SELECT d.workspace_id FROM decision_stages s "
+        "JOIN decision_processes p ON p.id = s.process_id "
+        "JOIN discussions d ON d.id = p.discussion_id WHERE s.id = :id"
+    ),
+    'document_id': (
+        "SELECT d.workspace_id FROM decision_documents doc "
+        "JOIN decision_processes p ON p.id = doc.process_id "
+        "JOIN discussions d ON d.id = p.discussion_id WHERE doc.id = :id"
+    ),
+    'intervention_id': (
+        "SELECT d.workspace_id FROM bias_interventions i "
+        "JOIN discussions d ON d.id = i.discussion_id WHERE i.id = :id"
+    )
+}
+
+_current_shard = ContextVar('current_shard', default=None)
+
+class WorkspaceMoving(Exception):
+    """Raised when a workspace is read-only because it is being moved to another shard."""
+
+def current_shard() -> Optional[str]:
+    """Return the shard selected for the running request or task, if any."""
+    return _current_shard.get()
+
+def shard_bind_key(shard: str) -> str:
+    return f'shard:{shard}'
+
+def upsert_rows(conn, table, rows):
+    """
+    Insert rows, updating in place those whose ID already exists.
+
+    Unlike delete and re-insert, this leaves rows that reference the
+    updated ones through foreign keys untouched.
+
+    Args:
+        conn: Connection to write through
+        table: Table with an `id` primary key
+        rows: Column name -> value mappings
+    """
+    if not rows:
+        return
+    if conn.dialect.name in ('postgresql', 'sqlite'):
+        if conn.dialect.name == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        statement = insert(table)
+        conn.execute(statement.on_conflict_do_update(
+            index_elements=[table.c.id],
+            set_={column.name: statement.excluded[column.name] for column in table.columns if column.name != 'id'}
+        ), rows)
+        return
+
+    present = set(conn.execute(select(table.c.id).where(table.c.id.in_([row['id'] for row in rows]))).scalars())
+    for row in rows:
+        if row['id'] in present:
+            conn.execute(table.update().where(table.c.id == row['id']).values(**row))
+    missing = [row for row in rows if row['id'] not in present]
+    if missing:
+        conn.execute(table.insert(), missing)
+
+def touches_sharded_table(mapper=None, clause=None) -> bool:
+    """Whether a statement reads or writes a table that lives on a shard."""
+    if mapper is not None and sa_inspect(mapper).local_table.name in SHARDED_TABLES:
+        return True
+    if clause is not None:
+        return any(
+            getattr(table, 'name', None) in SHARDED_TABLES
+            for table in find_tables(clause, include_crud=True)
+        )
+    return False
+
+class ShardRouter:
+    """
+    Routes each workspace's discussions, messages, analyses and decision data
+    to the shard named in the workspace_shards directory.
+
+    Shards are configured in SHARDS as name -> database URL and become the
+    'shard:<name>' binds. Workspaces without a directory entry live on the
+    primary database ('default'). For each API request the router finds the
+    workspace from the URL's workspace_id, discussion_id, message_id,
+    process_id, stage_id, document_id or intervention_id. It then selects that workspace's
+    shard for the rest of the request, so API modules never name a shard
+    themselves.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.shards = {}
+        self._workspace_of = {}
+
+        if app is not None:
+            self.init_app(app)
+
+    @property
+    def enabled(self) -> bool:
+        """Whether any shard besides the primary database is configured."""
+        return bool(self.shards)
+
+    def init_app(self, app):
+        """
+        Bind the router to an application and register its request hooks.
+
+        Add the shard binds to SQLALCHEMY_BINDS before db.init_app runs.
+
+        Args:
+            app: The Flask application
+        """
+        self.app = app
+        self.shards = dict(app.config['SHARDS'])
+
+        binds = dict(app.config.get('SQLALCHEMY_BINDS') or {})
+        for name, url in self.shards.items():
+            binds[shard_bind_key(name)] = url
+        app.config['SQLALCHEMY_BINDS'] = binds
+
+        app.before_request(self._select_request_shard)
+        app.teardown_request(self._reset_request_shard)
+        app.extensions['shard_router'] = self
+
+    def shard_names(self):
+        return [DEFAULT_SHARD] + sorted(self.shards)
+
+    def engine(self, shard: str):
+        from app import db
+        if shard == DEFAULT_SHARD:
+            return db.engines[None]
+        return db.engines[shard_bind_key(shard)]
+
+    @contextmanager
+    def use(self, shard: Optional[str]):
+        """Route sharded tables to `shard` inside the block."""
+        token = _current_shard.set(shard)
+        try:
+            yield shard
+        finally:
+            _current_shard.reset(token)
+
+    def directory_entry(self, workspace_id: str):
+        from app import db
+        from app.models.shard import WorkspaceShard
+        return db.session.get(WorkspaceShard, workspace_id)
+
+    def shard_for_workspace(self, workspace_id: str) -> str:
+        """Return the shard that currently holds a workspace."""
+        if not self.enabled:
+            return DEFAULT_SHARD
+        entry = self.directory_entry(workspace_id)
+        return entry.shard if entry else DEFAULT_SHARD
+
+    def write_shard(self, workspace_id: str) -> str:
+        """
+        Return the shard a background write for a workspace must go to now.
+
+        Queued writes remember the shard of the request that queued them, but
+        a move may have flipped the directory since. The directory is read
+        fresh, and the caller writes straight after asking, well within the
+        grace period the mover waits after freezing the workspace.
+
+        Raises:
+            WorkspaceMoving: If the workspace is read-only for a move
+        """
+        from app import db
+        from app.models.shard import WorkspaceShard
+
+        if not self.enabled:
+            return DEFAULT_SHARD
+        entry = db.session.execute(
+            select(WorkspaceShard.shard, WorkspaceShard.status).where(WorkspaceShard.workspace_id == workspace_id)
+        ).first()
+        if entry is None:
+            return DEFAULT_SHARD
+        if entry.status == 'readonly':
+            raise WorkspaceMoving(workspace_id)
+        return entry.shard
+
+    def workspace_for(self, key: str, value: str) -> Optional[str]:
+        """
+        Find the workspace owning the row named by a view argument.
+
+        A row never changes workspace, so answers are kept for the life of
+        the process. Unknown rows are looked up on every shard in turn.
+
+        Args:
+            key: View argument name, e.g. 'discussion_id'
+            value: The row's ID
+        """
+        if key == 'workspace_id':
+            return value
+
+        cache_key = (key, value)
+        if cache_key in self._workspace_of:
+            return self._workspace_of[cache_key]
+
+        for shard in self.shard_names():
+            with self.engine(shard).connect() as conn:
+                workspace_id = conn.execute(text(LOCATOR_QUERIES[key]), {'id': value}).scalar()
+            if workspace_id is not None:
+                if len(self._workspace_of) > 100000:
+                    self._workspace_of.clear()
+                self._workspace_of[cache_key] = workspace_id
+                return workspace_id
+        return None
+
+    def assign_new_workspace(self, workspace_id: str) -> str:
+        """
+        Place a new workspace on the shard holding the fewest workspaces and
+        record it in the directory. The caller commits.
+        """
+        from app import db
+        from app.models.shard import WorkspaceShard
+
+        if not self.enabled:
+            return DEFAULT_SHARD
+
+        counts = dict(db.session.query(
+            WorkspaceShard.shard, db.func.count()
+        ).group_by(WorkspaceShard.shard).all())
+        shard = min(self.shards, key=lambda name: (counts.get(name, 0), name))
+
+        db.session.add(WorkspaceShard(workspace_id=workspace_id, shard=shard))
+        return shard
+
+    def replicate_user(self, user):
+        """Copy a user's public columns to every shard for shard-local joins."""
+        if not self.enabled:
+            return
+        from app.models.user import User
+        table = User.__table__
+        row = {
+            'id': user.id,
+            'username': user.username,
+            'email': user.email,
+            'password_hash': '!',  # Credentials stay on the primary
+            'created_at': user.created_at,
+            'updated_at': user.updated_at
+        }
+        for shard in self.shards:
+            try:
+                with self.engine(shard).begin() as conn:
+                    upsert_rows(conn, table, [row])
+            except Exception:
+                # Joins fall back to a missing username until sync-shard-users runs
+                logger.exception("Failed to copy user %s to shard %s", user.id, shard)
+
+    def create_shard_schema(self, shard: str):
+        """
+        Create the sharded and reference tables on a shard. Foreign keys are
+        only kept between tables that live on the shard.
+        """
+        from app import db
+        from app.services.database.schema_upgrade import upgrade_schema
+        from app.services.search.message_search import install_search_index
+
+        engine = self.engine(shard)
+        local = SHARDED_TABLES | REFERENCE_TABLES
+        with engine.begin() as conn:
+            for table in db.metadata.sorted_tables:
+                if table.name not in local:
+                    continue
+                conn.execute(CreateTable(
+                    table,
+                    include_foreign_key_constraints=[
+                        fk for fk in table.foreign_key_constraints if fk.referred_table.name in local
+                    ],
+                    if_not_exists=True
+                ))
+        # Adds columns that tables from earlier releases lack, then every index
+        upgrade_schema(engine, local)
+        install_search_index(engine)
+
+    def _select_request_shard(self):
+        if not self.enabled or not request.view_args:
+            return None
+
+        for key in LOCATOR_QUERIES:
+            value = request.view_args.get(key)
+            if value is None:
+                continue
+
+            workspace_id = self.workspace_for(key, value)
+            if workspace_id is None:
+                # Unknown row; let the view answer with its usual 404
+                return None
+
+            entry = self.directory_entry(workspace_id)
+            if entry is not None and entry.status == 'readonly' and request.method not in ('GET', 'HEAD'):
+                from app.utils.api_config import error_response
+                response = error_response("Workspace is being moved, please retry shortly", 503)
+                response.headers['Retry-After'] = '2'
+                return response
+
+            _current_shard.set(entry.shard if entry else DEFAULT_SHARD)
+            return None
+        return None
+
+    def _reset_request_shard(self, exc=None):
+        _current_shard.set(None)
@@ -0,0 +1,213 @@
+# app/services/database/workspace_mover.py
+import logging
+import time
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import case, func, or_, select
+
+from app.services.database.sharding import DEFAULT_SHARD, upsert_rows
+
+logger = logging.getLogger(__name__)
+
+class WorkspaceMover:
+    """
+    Moves one workspace's sharded rows to another shard while it stays online.
+
+    1. Record each discussion's last_seq as a watermark and copy every row
+       in batches; the workspace keeps taking writes meanwhile.
+    2. Mark the workspace read-only in the directory, so writes get a 503
+       with Retry-After, and wait `grace` seconds for in-flight writes.
+    3. Remove rows deleted since from the target, then copy what changed
+       since the watermarks: messages and analyses by change_seq,
+       discussions and decision data in full (they are small). Rows are
+       upserted, never deleted and re-inserted, so foreign keys hold.
+    4. Check row counts, point the directory at the target, reopen writes
+       and delete the rows from the source.
+
+    Writes are only refused during steps 2 and 3. Messages waiting in a
+    worker's group commit batch or analysis queue are routed by the
+    directory when they are written, not when they were queued, so they
+    are held back during steps 2 and 3 and go to the target afterwards.
+    """
+
+    def __init__(self, router, workspace_id: str, target: str, batch_size: int = 1000,
+                 grace: float = 2.0, log: Optional[Callable[[str], None]] = None):
+        """
+        Initialize the mover.
+
+        Args:
+            router: The application's ShardRouter
+            workspace_id: Workspace to move
+            target: Name of the destination shard
+            batch_size: Rows copied per statement
+            grace: Seconds to wait for in-flight writes after freezing
+            log: Progress callback, e.g. click.echo
+        """
+        self.router = router
+        self.workspace_id = workspace_id
+        self.target = target
+        self.batch_size = batch_size
+        self.grace = grace
+        self.log = log or logger.info
+
+    def run(self) -> Dict[str, int]:
+        """
+        Move the workspace.
+
+        Returns:
+            Number of rows moved per table
+        """
+        from app import db
+        from app.models.shard import WorkspaceShard
+
+        if self.target not in self.router.shard_names():
+            raise ValueError(f"Unknown shard '{self.target}'")
+
+        source = self.router.shard_for_workspace(self.workspace_id)
+        if source == self.target:
+            raise ValueError(f"Workspace is already on shard '{self.target}'")
+
+        if self.target != DEFAULT_SHARD:
+            self.router.create_shard_schema(self.target)
+        source_engine = self.router.engine(source)
+        target_engine = self.router.engine(self.target)
+
+        watermarks = self._watermarks(source_engine)
+        self.log(f"Copying workspace {self.workspace_id} from '{source}' to '{self.target}'")
+        for table in self._tables():
+            copied = self._copy(source_engine, target_engine, table)
+            self.log(f"  {table.name}: {copied} rows")
+
+        entry = db.session.get(WorkspaceShard, self.workspace_id)
+        if entry is None:
+            entry = WorkspaceShard(workspace_id=self.workspace_id, shard=source)
+            db.session.add(entry)
+        entry.status = 'readonly'
+        db.session.commit()
+
+        try:
+            time.sleep(self.grace)
+            self.log("Writes paused, copying recent changes")
+            # Children first, so no stale row is removed while another still references it
+            for table in reversed(self._tables()):
+                self._drop_deleted(source_engine, target_engine, table)
+            for table in self._tables():
+                self._copy(source_engine, target_engine, table, watermarks)
+
+            counts = self._verify(source_engine, target_engine)
+
+            entry.shard = self.target
+            entry.status = 'active'
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            entry = db.session.get(WorkspaceShard, self.workspace_id)
+            entry.status = 'active'
+            db.session.commit()
+            raise
+
+        # The directory now points at the target, so the source copy is unreachable
+        with source_engine.begin() as conn:
+            for table in reversed(self._tables()):
+                for ids in self._id_batches(conn, table, descending=True):
+                    conn.execute(table.delete().where(table.c.id.in_(ids)))
+
+        self.log(f"Workspace {self.workspace_id} now lives on '{self.target}'")
+        return counts
+
+    def _tables(self) -> List:
+        from app.models.analysis import BiasIntervention, MessageAnalysis
+        from app.models.archive import DiscussionArchive
+        from app.models.decision import (
+            DecisionDocument, DecisionProcess, DecisionQualityMetric, DecisionQualityState, DecisionStage
+        )
+        from app.models.discussion import Discussion, Message
+
+        # Parents before children, so inserts satisfy foreign keys
+        return [model.__table__ for model in (
+            Discussion, DiscussionArchive, Message, MessageAnalysis, BiasIntervention,
+            DecisionProcess, DecisionStage, DecisionDocument, DecisionQualityMetric, DecisionQualityState
+        )]
+
+    def _owned(self, table):
+        """Return a WHERE clause selecting the workspace's rows of a table."""
+        from app.models.decision import DecisionProcess
+        from app.models.discussion import Discussion, Message
+
+        discussions = select(Discussion.id).where(Discussion.workspace_id == self.workspace_id)
+        if table.name == 'discussions':
+            return table.c.workspace_id == self.workspace_id
+        if table.name in ('discussion_archives', 'messages', 'bias_interventions', 'decision_processes'):
+            return table.c.discussion_id.in_(discussions)
+        if table.name == 'message_analysis':
+            return table.c.message_id.in_(select(Message.id).where(Message.discussion_id.in_(discussions)))
+        processes = select(DecisionProcess.id).where(DecisionProcess.discussion_id.in_(discussions))
+        return table.c.process_id.in_(processes)
+
+    def _watermarks(self, engine) -> Dict[str, int]:
+        from app.models.discussion import Discussion
+        with engine.connect() as conn:
+            return dict(conn.execute(
+                select(Discussion.id, Discussion.last_seq).where(Discussion.workspace_id == self.workspace_id)
+            ).all())
+
+    def _id_batches(self, conn, table, where=None, descending: bool = False):
+        query = select(table.c.id).where(self._owned(table))
+        if where is not None:
+            query = query.where(where)
+        if 'seq' in table.c:
+            # Insert order, so replies follow the messages they answer; reversed
+            # for deletes, so replies go before them
+            query = query.order_by(table.c.seq.desc() if descending else table.c.seq)
+        ids = [row[0] for row in conn.execute(query)]
+        for start in range(0, len(ids), self.batch_size):
+            yield ids[start:start + self.batch_size]
+
+    def _changed_since(self, table, watermarks: Dict[str, int]):
+        """Rows changed after the watermarks, or None to recopy the whole table."""
+        if 'change_seq' not in table.c or not watermarks:
+            return None
+        mark = case(
+            {discussion_id: seq for discussion_id, seq in watermarks.items()},
+            value=table.c.discussion_id,
+            else_=-1
+        )
+        # Rows of discussions created after the first pass have no watermark
+        return or_(table.c.change_seq.is_(None), table.c.change_seq > mark)
+
+    def _copy(self, source_engine, target_engine, table, watermarks: Optional[Dict[str, int]] = None) -> int:
+        where = self._changed_since(table, watermarks) if watermarks is not None else None
+        order = [table.c.seq] if 'seq' in table.c else []
+
+        copied = 0
+        with source_engine.connect() as source:
+            for ids in self._id_batches(source, table, where):
+                rows = [dict(row) for row in source.execute(
+                    select(table).where(table.c.id.in_(ids)).order_by(*order)
+                ).mappings()]
+                # Rows copied earlier pick up later edits in place
+                with target_engine.begin() as target:
+                    upsert_rows(target, table, rows)
+                copied += len(rows)
+        return copied
+
+    def _drop_deleted(self, source_engine, target_engine, table):
+        with source_engine.connect() as source:
+            source_ids = {row[0] for row in source.execute(select(table.c.id).where(self._owned(table)))}
+        with target_engine.begin() as target:
+            for ids in self._id_batches(target, table, descending=True):
+                stale = [row_id for row_id in ids if row_id not in source_ids]
+                if stale:
+                    target.execute(table.delete().where(table.c.id.in_(stale)))
+
+    def _verify(self, source_engine, target_engine) -> Dict[str, int]:
+        counts = {}
+        for table in self._tables():
+            query = select(func.count()).select_from(table).where(self._owned(table))
+            with source_engine.connect() as source, target_engine.connect() as target:
+                expected = source.execute(query).scalar()
+                actual = target.execute(query).scalar()
+            if expected != actual:
+                raise RuntimeError(f"{table.name}: {actual} rows on target, expected {expected}")
+            counts[table.name] = actual
+        return counts
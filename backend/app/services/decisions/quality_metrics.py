@@ -0,0 +1,350 @@
+# app/services/decisions/quality_metrics.py
+import logging
+import math
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, Any, List, Set
+
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.exc import IntegrityError
+
+from app.services.analytics.workspace_analytics import bias_list, decode_json
+
+logger = logging.getLogger(__name__)
+
+# Attempts at an update that loses a race to create a process's state row
+MAX_UPDATE_ATTEMPTS = 3
+
+# Events that can change a discussion's decision metrics
+TRIGGER_EVENTS = frozenset(['message.created', 'analysis.created', 'stage.updated'])
+
+STAGE_DURATION_PREFIX = 'stage_duration_seconds:'
+
+class DecisionQualityMetrics:
+    """
+    Keeps each decision process's quality metrics up to date incrementally.
+
+    Every process has a state row with running totals (participants, message
+    and analysis counts, biased and dissenting analyses, per-dimension sums
+    of perspective values and of their squares) and the discussion change
+    sequence number they cover. An update reads only the messages and
+    analyses stamped after that number, folds them into the totals and
+    rewrites the process's decision_quality_metrics rows from them, so its
+    cost follows the new activity, not the discussion's size. The first
+    update of a process starts from zero and so reads its history once.
+
+    Updates are triggered by message, analysis and stage events. The event
+    listener only marks the discussion dirty; a background thread folds in
+    dirty discussions every DECISION_METRICS_FLUSH_INTERVAL seconds, so a
+    busy discussion costs one update per interval rather than one per event.
+    Reading a process's metrics also updates it first when it has unseen
+    messages, analyses or completed stages.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.flush_interval = 1.0
+        self.chunk_size = 5000
+        self._dirty = set()
+        self._condition = threading.Condition()
+        self._worker = None
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app, hub=None):
+        """
+        Bind the metrics engine to an application and subscribe it to events.
+
+        Args:
+            app: The Flask application whose context the worker runs in
+            hub: EventHub whose published events trigger updates
+        """
+        self.app = app
+        self.flush_interval = app.config['DECISION_METRICS_FLUSH_INTERVAL']
+        self.chunk_size = app.config['DECISION_METRICS_CHUNK_SIZE']
+        if hub is not None:
+            hub.add_listener(self._on_events)
+        app.extensions['decision_metrics'] = self
+
+    def metrics(self, process) -> List:
+        """
+        Return a process's metrics, folding in new messages and analyses and
+        completed stages not seen yet.
+
+        Args:
+            process: The (already authorized) decision process
+
+        Returns:
+            List of DecisionQualityMetric rows
+        """
+        from app import db
+        from app.models.decision import DecisionQualityMetric, DecisionQualityState, DecisionStage
+        from app.models.discussion import Discussion
+
+        state = db.session.execute(
+            select(DecisionQualityState.seq, DecisionQualityState.updated_at)
+            .where(DecisionQualityState.process_id == process.id)
+        ).first()
+        last_seq = db.session.execute(
+            select(Discussion.last_seq).where(Discussion.id == process.discussion_id)
+        ).scalar()
+        # Stage changes don't move the discussion's sequence, so compare completion times
+        stage_completed = db.session.execute(
+            select(func.max(DecisionStage.completed_at)).where(DecisionStage.process_id == process.id)
+        ).scalar()
+        if (
+            state is None
+            or (last_seq or 0) > state.seq
+            or (stage_completed is not None and stage_completed > state.updated_at)
+        ):
+            self.update(process)
+
+        return DecisionQualityMetric.query.filter_by(process_id=process.id).order_by(
+            DecisionQualityMetric.metric_name
+        ).all()
+
+    def update(self, process) -> Dict[str, float]:
+        """
+        Fold a process's new messages and analyses into its totals and
+        rewrite its metric rows, in one transaction.
+
+        Args:
+            process: The decision process to update
+
+        Returns:
+            The process's metrics by name
+        """
+        from app import db
+
+        for attempt in range(MAX_UPDATE_ATTEMPTS):
+            try:
+                return self._update(process)
+            except IntegrityError:
+                # Another update created the state row first; claim theirs on the next attempt
+                db.session.rollback()
+                if attempt == MAX_UPDATE_ATTEMPTS - 1:
+                    raise
+
+    def _update(self, process) -> Dict[str, float]:
+        from app import db
+        from app.models.decision import DecisionQualityMetric, DecisionQualityState
+        from app.models.discussion import Discussion
+
+        states = DecisionQualityState.__table__
+
+        # Claim the state row first, so concurrent updates of the same
+        # process take turns instead of folding the same rows in twice
+        claimed = db.session.execute(update(states).where(
+            states.c.process_id == process.id
+        ).values(updated_at=datetime.utcnow())).rowcount
+        state = DecisionQualityState.query.filter_by(process_id=process.id).first() if claimed else None
+        if state is None:
+            # Processes get their state row on creation; this covers older ones.
+            # A concurrent insert fails here on the unique process_id, before any work
+            state = DecisionQualityState(process.id)
+            db.session.add(state)
+            db.session.flush()
+
+        # Every row stamped up to last_seq is committed, and none after it is folded in
+        last_seq = db.session.execute(
+            select(Discussion.last_seq).where(Discussion.id == process.discussion_id)
+        ).scalar() or 0
+
+        counters = state.get_counters()
+        if last_seq > state.seq or state.seq == 0:
+            self._fold_messages(process.discussion_id, state.seq, last_seq, counters)
+            self._fold_analyses(process.discussion_id, state.seq, last_seq, counters)
+            state.seq = last_seq
+        state.set_counters(counters)
+        state.updated_at = datetime.utcnow()
+
+        values = self._derive(process, counters)
+        now = datetime.utcnow()
+        metrics = DecisionQualityMetric.__table__
+        db.session.execute(metrics.delete().where(metrics.c.process_id == process.id))
+        db.session.execute(metrics.insert(), [{
+            'id': str(uuid.uuid4()),
+            'process_id': process.id,
+            'metric_name': name,
+            'metric_value': value,
+            'calculated_at': now
+        } for name, value in values.items()])
+        db.session.commit()
+        return values
+
+    def flush(self) -> int:
+        """
+        Update every dirty discussion's process now, on the calling thread.
+
+        Returns:
+            Number of discussions updated
+        """
+        with self._condition:
+            dirty, self._dirty = self._dirty, set()
+        return self._update_discussions(dirty)
+
+    def _on_events(self, events):
+        dirty = {event.discussion_id for event in events if event.event_type in TRIGGER_EVENTS}
+        if not dirty:
+            return
+        with self._condition:
+            self._dirty |= dirty
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name='decision-metrics', daemon=True)
+                self._worker.start()
+            self._condition.notify()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._dirty:
+                    self._condition.wait()
+            # Let a burst of events settle into one update per discussion
+            time.sleep(self.flush_interval)
+            with self.app.app_context():
+                try:
+                    self.flush()
+                except Exception:
+                    logger.exception("Decision metrics flush failed")
+
+    def _update_discussions(self, discussion_ids: Set[str]) -> int:
+        from app import db, shard_router
+        from app.models.decision import DecisionProcess
+
+        updated = 0
+        for discussion_id in discussion_ids:
+            # Events carry no shard, and the worker thread has no request
+            workspace_id = shard_router.workspace_for('discussion_id', discussion_id)
+            if workspace_id is None:
+                continue
+            with shard_router.use(shard_router.shard_for_workspace(workspace_id)):
+                try:
+                    process = DecisionProcess.query.filter_by(discussion_id=discussion_id).first()
+                    if process is None:
+                        continue
+                    self.update(process)
+                    updated += 1
+                except Exception:
+                    db.session.rollback()
+                    logger.exception("Updating decision metrics of discussion %s failed", discussion_id)
+                    # Try again on the next flush
+                    with self._condition:
+                        self._dirty.add(discussion_id)
+        return updated
+
+    def _fold_messages(self, discussion_id: str, after: int, upto: int, counters: Dict[str, Any]):
+        from app import db
+        from app.models.discussion import Message
+
+        participants = set(counters.get('participants', []))
+        count = counters.get('messages', 0)
+
+        query = select(Message.user_id).where(Message.discussion_id == discussion_id)
+        query = query.where(_stamped(Message.seq, after, upto))
+        result = db.session.execute(query.execution_options(yield_per=self.chunk_size))
+        for rows in result.partitions():
+            count += len(rows)
+            participants.update(row.user_id for row in rows)
+
+        counters['messages'] = count
+        counters['participants'] = sorted(participants)
+
+    def _fold_analyses(self, discussion_id: str, after: int, upto: int, counters: Dict[str, Any]):
+        from app import db
+        from app.models.analysis import MessageAnalysis
+        from app.models.discussion import Message
+
+        query = select(
+            MessageAnalysis.sentiment_score,
+            MessageAnalysis.perspective_vector,
+            MessageAnalysis.detected_biases
+        ).join(
+            Message, Message.id == MessageAnalysis.message_id
+        ).where(
+            Message.discussion_id == discussion_id,
+            _stamped(MessageAnalysis.change_seq, after, upto)
+        )
+
+        dimensions = counters.get('dimensions', [])
+        sums = counters.get('sums', [])
+        squares = counters.get('squares', [])
+        result = db.session.execute(query.execution_options(yield_per=self.chunk_size))
+        for rows in result.partitions():
+            for sentiment, perspective, detected in rows:
+                counters['analyses'] = counters.get('analyses', 0) + 1
+                if bias_list(decode_json(detected)):
+                    counters['biased'] = counters.get('biased', 0) + 1
+                if sentiment is not None and sentiment < 0:
+                    counters['dissenting'] = counters.get('dissenting', 0) + 1
+
+                vector = decode_json(perspective)
+                if not isinstance(vector, dict) or not vector.get('dimensions'):
+                    continue
+                values = vector.get('values') or []
+                if vector['dimensions'] != dimensions:
+                    if len(values) != len(vector['dimensions']):
+                        continue
+                    # The analyzer changed shape; measure diversity over the new dimensions only
+                    dimensions = vector['dimensions']
+                    sums = [0.0] * len(dimensions)
+                    squares = [0.0] * len(dimensions)
+                    counters['vectors'] = 0
+                if len(values) != len(dimensions):
+                    continue
+                for i, value in enumerate(values):
+                    sums[i] += value
+                    squares[i] += value * value
+                counters['vectors'] = counters.get('vectors', 0) + 1
+
+        counters['dimensions'] = dimensions
+        counters['sums'] = sums
+        counters['squares'] = squares
+
+    def _derive(self, process, counters: Dict[str, Any]) -> Dict[str, float]:
+        from app import db
+        from app.models.decision import DecisionStage
+        from app.models.discussion import Discussion
+        from app.models.workspace import WorkspaceMember
+
+        workspace_id = db.session.execute(
+            select(Discussion.workspace_id).where(Discussion.id == process.discussion_id)
+        ).scalar()
+        members = WorkspaceMember.query.filter_by(workspace_id=workspace_id).count()
+
+        participants = len(counters.get('participants', []))
+        analyses = counters.get('analyses', 0)
+        vectors = counters.get('vectors', 0)
+
+        values = {
+            'message_count': float(counters.get('messages', 0)),
+            'participant_count': float(participants),
+            'participation_breadth': _ratio(participants, members),
+            'analysis_count': float(analyses),
+            'bias_prevalence': _ratio(counters.get('biased', 0), analyses),
+            'dissent_ratio': _ratio(counters.get('dissenting', 0), analyses),
+            # Root of the total variance: how far perspectives typically sit from their centroid
+            'perspective_diversity': math.sqrt(max(sum(
+                square / vectors - (total / vectors) ** 2
+                for total, square in zip(counters.get('sums', []), counters.get('squares', []))
+            ), 0.0)) if vectors else 0.0
+        }
+
+        # A process has a handful of stages, so these are read whole
+        stages = DecisionStage.query.filter_by(process_id=process.id).all()
+        for stage in stages:
+            if stage.started_at and stage.completed_at:
+                values[STAGE_DURATION_PREFIX + stage.name] = (stage.completed_at - stage.started_at).total_seconds()
+        return values
+
+def _stamped(column, after: int, upto: int):
+    window = (column > after) & (column <= upto)
+    if after == 0:
+        # Rows written before change sequence numbers existed
+        return or_(window, column.is_(None))
+    return window
+
+def _ratio(part, whole) -> float:
+    return part / whole if whole else 0.0
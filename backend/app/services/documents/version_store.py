@@ -0,0 +1,230 @@
+# app/services/documents/version_store.py
+import difflib
+import json
+from typing import Any, List, Optional
+
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.models.decision import DecisionDocument
+
+# Attempts at saving a version when concurrent edits take the same number
+MAX_VERSION_ATTEMPTS = 3
+
+def compute_delta(old: str, new: str) -> List[Any]:
+    """
+    Compute a compact line-based delta that turns `old` into `new`.
+
+    Args:
+        old: Previous content
+        new: Updated content
+
+    Returns:
+        List of operations: ['=', n] keeps n lines, ['-', n] drops n lines and
+        ['+', [lines]] inserts lines
+    """
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+
+    delta = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            delta.append(['=', i2 - i1])
+            continue
+        if i2 > i1:
+            delta.append(['-', i2 - i1])
+        if j2 > j1:
+            delta.append(['+', new_lines[j1:j2]])
+    return delta
+
+def apply_delta(old: str, delta: List[Any]) -> str:
+    """
+    Rebuild content by applying a delta from compute_delta.
+
+    Args:
+        old: Content the delta was computed against
+        delta: List of operations
+
+    Returns:
+        The updated content
+    """
+    old_lines = old.splitlines(keepends=True)
+    position = 0
+    result = []
+
+    for op, arg in delta:
+        if op == '=':
+            result.extend(old_lines[position:position + arg])
+            position += arg
+        elif op == '-':
+            position += arg
+        elif op == '+':
+            result.extend(arg)
+
+    return ''.join(result)
+
+class DocumentVersionStore:
+    """
+    Stores decision document versions as periodic full snapshots plus
+    line-based deltas against the previous version.
+
+    The latest version always keeps its full content, so reading it never
+    needs a rebuild. Older versions are rebuilt from the nearest snapshot at
+    or below them, applying at most `snapshot_interval - 1` deltas.
+    """
+
+    def __init__(self, snapshot_interval: int = 10):
+        """
+        Initialize the store.
+
+        Args:
+            snapshot_interval: Every n-th version is stored in full
+        """
+        self.snapshot_interval = max(snapshot_interval, 1)
+
+    def latest(self, process_id: str) -> Optional[DecisionDocument]:
+        """Return the latest version of a process's document."""
+        return DecisionDocument.query.filter_by(process_id=process_id).order_by(
+            DecisionDocument.version.desc()
+        ).first()
+
+    def create_version(self, process_id: str, title: str, content: str) -> DecisionDocument:
+        """
+        Add a new version on top of the latest one.
+
+        The previous latest version is compacted to its delta unless it is a
+        snapshot. The caller commits.
+
+        Args:
+            process_id: The decision process the document belongs to
+            title: Title of the new version
+            content: Full content of the new version
+
+        Returns:
+            The new document version
+        """
+        previous = self.latest(process_id)
+        version = previous.version + 1 if previous else 1
+
+        document = DecisionDocument(
+            process_id=process_id,
+            title=title,
+            content=content,
+            version=version
+        )
+        document.is_snapshot = previous is None or (version - 1) % self.snapshot_interval == 0
+
+        if not document.is_snapshot:
+            document.delta = json.dumps(compute_delta(previous.content, content))
+
+        if previous is not None and not previous.is_snapshot and previous.delta is not None:
+            # Drop the cached full text; leave updated_at alone since the version itself didn't change
+            db.session.execute(
+                update(DecisionDocument)
+                .where(DecisionDocument.id == previous.id)
+                .values(content='', updated_at=DecisionDocument.updated_at)
+                .execution_options(synchronize_session='fetch')
+            )
+
+        db.session.add(document)
+        return document
+
+    def commit_version(self, process_id: str, title: str, content: str) -> DecisionDocument:
+        """
+        Add a new version and commit it.
+
+        Version numbers are unique per process, so when a concurrent edit
+        commits the same number first, the version is rebuilt on top of
+        that edit and saved again.
+
+        Args:
+            process_id: The decision process the document belongs to
+            title: Title of the new version
+            content: Full content of the new version
+
+        Returns:
+            The committed document version
+        """
+        for attempt in range(MAX_VERSION_ATTEMPTS):
+            document = self.create_version(process_id, title, content)
+            try:
+                db.session.commit()
+                return document
+            except IntegrityError:
+                db.session.rollback()
+                if attempt == MAX_VERSION_ATTEMPTS - 1:
+                    raise
+
+    def content_at(self, process_id: str, version: int) -> Optional[DecisionDocument]:
+        """
+        Load a version with its full content rebuilt.
+
+        Args:
+            process_id: The decision process the document belongs to
+            version: The version number
+
+        Returns:
+            The document version with `content` filled in, or None
+        """
+        base_version = db.session.query(db.func.max(DecisionDocument.version)).filter(
+            DecisionDocument.process_id == process_id,
+            DecisionDocument.version <= version,
+            db.or_(DecisionDocument.is_snapshot.is_(True), DecisionDocument.delta.is_(None))
+        ).scalar()
+
+        if base_version is None:
+            return None
+
+        rows = DecisionDocument.query.filter(
+            DecisionDocument.process_id == process_id,
+            DecisionDocument.version >= base_version,
+            DecisionDocument.version <= version
+        ).order_by(DecisionDocument.version).all()
+
+        if not rows or rows[-1].version != version:
+            return None
+
+        # Snapshots and the latest version hold their full text; an empty
+        # non-snapshot may be a compacted delta, and rebuilding is always correct
+        target = rows[-1]
+        if target.is_snapshot or target.content:
+            return target
+
+        content = rows[0].content
+        for row in rows[1:]:
+            content = apply_delta(content, json.loads(row.delta))
+
+        # Rebuilt content is for this response only and must never be flushed back
+        db.session.expunge(target)
+        target.content = content
+        return target
+
+    def diff(self, process_id: str, from_version: int, to_version: int) -> Optional[str]:
+        """
+        Produce a unified diff between two versions.
+
+        Args:
+            process_id: The decision process the document belongs to
+            from_version: The older version
+            to_version: The newer version
+
+        Returns:
+            Unified diff text, or None if either version does not exist
+        """
+        old = self.content_at(process_id, from_version)
+        if old is None:
+            return None
+        old_content = old.content
+
+        new = self.content_at(process_id, to_version)
+        if new is None:
+            return None
+
+        return ''.join(difflib.unified_diff(
+            old_content.splitlines(keepends=True),
+            new.content.splitlines(keepends=True),
+            fromfile=f'version {from_version}',
+            tofile=f'version {to_version}'
+        ))
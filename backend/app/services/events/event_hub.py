@@ -0,0 +1,321 @@
+# app/services/events/event_hub.py
+import json
+import logging
+import queue
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Any, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+STREAM_TICKET_SALT = 'discussion-events'
+
+class Event:
+    """A single event published to a discussion's subscribers."""
+
+    __slots__ = ('discussion_id', 'event_type', 'data')
+
+    def __init__(self, discussion_id: str, event_type: str, data: Dict[str, Any]):
+        self.discussion_id = discussion_id
+        self.event_type = event_type
+        self.data = data
+
+    def to_sse(self) -> str:
+        """Encode the event in Server-Sent Events wire format."""
+        return f"event: {self.event_type}\ndata: {json.dumps(self.data)}\n\n"
+
+class Subscription:
+    """
+    A subscriber's bounded inbox. Subscribers that fall too far behind are
+    closed instead of letting their backlog grow without limit.
+    """
+
+    def __init__(self, hub: 'EventHub', discussion_id: str, max_queued: int):
+        self.hub = hub
+        self.discussion_id = discussion_id
+        self.closed = False
+        self._queue = queue.Queue(maxsize=max_queued)
+
+    def deliver(self, event: Event):
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            logger.warning("Dropping slow subscriber on discussion %s", self.discussion_id)
+            self.close()
+
+    def events(self, heartbeat: float) -> Iterator[Optional[Event]]:
+        """
+        Yield events as they arrive, or None every `heartbeat` seconds of silence.
+
+        Args:
+            heartbeat: Seconds to wait before yielding a keep-alive
+        """
+        while not self.closed:
+            try:
+                yield self._queue.get(timeout=heartbeat)
+            except queue.Empty:
+                yield None
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.hub.unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+class MemoryBackend:
+    """Delivers events straight to subscribers in this process."""
+
+    def __init__(self, hub: 'EventHub'):
+        self.hub = hub
+
+    def publish(self, events):
+        for event in events:
+            self.hub.fan_out(event)
+
+class DatabaseBackend:
+    """
+    Relays events between worker processes through the discussion_events table.
+
+    Publishing inserts a row; one relay thread per process polls for rows it
+    has not seen yet and fans them out locally, standing in for LISTEN/NOTIFY.
+
+    IDs are handed out before commit, so a row with a lower ID can become
+    visible after higher ones. The relay keeps re-scanning from the lowest
+    ID it can't yet account for, and only gives up on a gap (a rolled-back
+    or very slow insert) after `gap_timeout` seconds.
+    """
+
+    def __init__(self, hub: 'EventHub', app):
+        self.hub = hub
+        self.app = app
+        self.poll_interval = app.config['EVENT_POLL_INTERVAL']
+        self.retention = timedelta(seconds=app.config['EVENT_RETENTION_SECONDS'])
+        self.gap_timeout = app.config['EVENT_GAP_TIMEOUT']
+        self._floor = None  # Every ID up to here has been relayed or given up on
+        self._seen = {}  # Relayed IDs above the floor -> when they were relayed
+        self._relay = None
+        self._lock = threading.Lock()
+
+    def publish(self, events):
+        from app import db
+        from app.models.event import DiscussionEvent
+
+        now = datetime.utcnow()
+        with db.engine.begin() as conn:
+            conn.execute(DiscussionEvent.__table__.insert(), [{
+                'discussion_id': event.discussion_id,
+                'event_type': event.event_type,
+                'payload': json.dumps(event.data),
+                'created_at': now
+            } for event in events])
+
+    def start(self):
+        with self._lock:
+            if self._relay is None or not self._relay.is_alive():
+                self._relay = threading.Thread(target=self._run, name='event-relay', daemon=True)
+                self._relay.start()
+
+    def _run(self):
+        from app import db
+        from app.models.event import DiscussionEvent
+
+        table = DiscussionEvent.__table__
+        last_pruned = 0.0
+
+        with self.app.app_context():
+            while True:
+                try:
+                    with db.engine.connect() as conn:
+                        if self._floor is None:
+                            # Only relay events published after this process started listening
+                            self._floor = conn.execute(
+                                db.select(db.func.coalesce(db.func.max(table.c.id), 0))
+                            ).scalar()
+
+                        rows = conn.execute(
+                            table.select().where(table.c.id > self._floor).order_by(table.c.id)
+                        ).all()
+
+                    for row in rows:
+                        if row.id in self._seen:
+                            continue
+                        self._seen[row.id] = time.monotonic()
+                        self.hub.fan_out(Event(row.discussion_id, row.event_type, json.loads(row.payload)))
+                    self._advance_floor()
+
+                    if time.monotonic() - last_pruned > self.retention.total_seconds():
+                        with db.engine.begin() as conn:
+                            conn.execute(table.delete().where(
+                                table.c.created_at < datetime.utcnow() - self.retention
+                            ))
+                        last_pruned = time.monotonic()
+                except Exception:
+                    logger.exception("Event relay poll failed")
+
+                time.sleep(self.poll_interval)
+
+    def _advance_floor(self):
+        now = time.monotonic()
+        for event_id in sorted(self._seen):
+            # Stop at the first gap that may still be filled by a late commit
+            if event_id != self._floor + 1 and now - self._seen[event_id] < self.gap_timeout:
+                break
+            self._floor = event_id
+            del self._seen[event_id]
+
+class EventHub:
+    """
+    Per-discussion publish/subscribe hub for real-time updates.
+
+    Each subscriber costs one bounded queue and a blocked reader, so idle
+    connections are cheap; run gunicorn with a gevent worker class to hold
+    thousands of them per process.
+    """
+
+    def __init__(self, app=None):
+        self.backend = None
+        self.max_queued = 100
+        self._subscribers = {}
+        self._listeners = []
+        self._lock = threading.Lock()
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """
+        Bind the hub to an application and choose its backend from config.
+
+        Args:
+            app: The Flask application
+        """
+        self.max_queued = app.config['EVENT_SUBSCRIBER_QUEUE_SIZE']
+
+        backend = app.config['EVENT_HUB_BACKEND']
+        if backend == 'memory':
+            self.backend = MemoryBackend(self)
+        elif backend == 'database':
+            self.backend = DatabaseBackend(self, app)
+        else:
+            raise ValueError(f"Unknown event hub backend: {backend}")
+
+        app.extensions['event_hub'] = self
+
+    def publish(self, discussion_id: str, event_type: str, data: Dict[str, Any]):
+        """
+        Publish an event to everyone subscribed to a discussion.
+
+        Call this after the change has been committed.
+
+        Args:
+            discussion_id: The discussion the event belongs to
+            event_type: Event name, e.g. 'message.created'
+            data: JSON-serializable payload
+        """
+        self.publish_many([Event(discussion_id, event_type, data)])
+
+    def publish_many(self, events):
+        """
+        Publish several events at once, e.g. for a batch of analyses.
+
+        Args:
+            events: List of Event objects
+        """
+        if not events:
+            return
+        try:
+            self.backend.publish(events)
+        except Exception:
+            # Real-time delivery is best effort and must not fail the write path
+            logger.exception("Failed to publish %d events", len(events))
+
+        for listener in self._listeners:
+            try:
+                listener(events)
+            except Exception:
+                logger.exception("Event listener %r failed", listener)
+
+    def add_listener(self, listener):
+        """
+        Call `listener(events)` with every batch published in this process.
+
+        Listeners see each event once, in the process that published it,
+        whichever backend relays it to subscribers. They run on the
+        publisher's thread, so they should only record the events and do
+        their work elsewhere.
+
+        Args:
+            listener: Callable taking a list of Event objects
+        """
+        self._listeners.append(listener)
+
+    def subscribe(self, discussion_id: str) -> Subscription:
+        """
+        Subscribe to new events in a discussion.
+
+        Args:
+            discussion_id: The discussion to follow
+
+        Returns:
+            A Subscription, to be closed when the client disconnects
+        """
+        if isinstance(self.backend, DatabaseBackend):
+            self.backend.start()
+
+        subscription = Subscription(self, discussion_id, self.max_queued)
+        with self._lock:
+            self._subscribers.setdefault(discussion_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.discussion_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.discussion_id]
+
+    def subscriber_count(self, discussion_id: Optional[str] = None) -> int:
+        """Return the number of open subscriptions, optionally for one discussion."""
+        with self._lock:
+            if discussion_id is not None:
+                return len(self._subscribers.get(discussion_id, ()))
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def fan_out(self, event: Event):
+        """Deliver an event to this process's subscribers of its discussion."""
+        with self._lock:
+            subscribers = list(self._subscribers.get(event.discussion_id, ()))
+        for subscription in subscribers:
+            subscription.deliver(event)
+
+def issue_stream_ticket(secret_key: str, user_id: str, discussion_id: str) -> str:
+    """
+    Sign a ticket letting a user open one discussion's event stream.
+
+    EventSource can't send an Authorization header, so browsers pass this
+    ticket in the query string instead of their access token. It names a
+    single discussion and expires after EVENT_TICKET_TTL seconds, so one
+    that leaks into an access log is of little use.
+    """
+    from itsdangerous import URLSafeTimedSerializer
+    serializer = URLSafeTimedSerializer(secret_key, salt=STREAM_TICKET_SALT)
+    return serializer.dumps({'user_id': user_id, 'discussion_id': discussion_id})
+
+def read_stream_ticket(secret_key: str, ticket: str, discussion_id: str, max_age: int) -> Optional[str]:
+    """Return the user a stream ticket was issued to, or None if it is invalid, expired or for another discussion."""
+    from itsdangerous import BadSignature, URLSafeTimedSerializer
+    serializer = URLSafeTimedSerializer(secret_key, salt=STREAM_TICKET_SALT)
+    try:
+        claims = serializer.loads(ticket, max_age=max_age)
+    except BadSignature:
+        return None
+    if not isinstance(claims, dict) or claims.get('discussion_id') != discussion_id:
+        return None
+    return claims.get('user_id')
@@ -0,0 +1,153 @@
+# app/services/exporting/discussion_exporter.py
+import csv
+import io
+import json
+from typing import Dict, Any, Iterator, List, Optional
+
+from sqlalchemy import select
+
+from app import db
+from app.models.analysis import MessageAnalysis
+from app.models.discussion import Discussion, Message
+from app.models.user import User
+from app.services.clustering.perspective_analyzer import PerspectiveAnalyzer
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv'
+}
+
+class DiscussionExporter:
+    """
+    Streams messages joined with their authors and analyses, one chunk of
+    rows at a time, so memory stays flat however large the export is.
+    """
+
+    def __init__(self, discussion_id: Optional[str] = None, workspace_id: Optional[str] = None,
+                 chunk_size: int = 1000):
+        """
+        Initialize the exporter for a discussion or a whole workspace.
+
+        Args:
+            discussion_id: Export only this discussion
+            workspace_id: Export every discussion in this workspace
+            chunk_size: Number of rows fetched from the database at a time
+        """
+        self.discussion_id = discussion_id
+        self.workspace_id = workspace_id
+        self.chunk_size = chunk_size
+        self.dimensions = PerspectiveAnalyzer().dimension_names
+
+    def records(self) -> Iterator[Dict[str, Any]]:
+        """
+        Yield one flat record per message with its analysis decoded.
+
+        Returns:
+            Iterator of dictionaries
+        """
+        query = select(
+            Message.id,
+            Message.discussion_id,
+            Message.parent_id,
+            Message.user_id,
+            User.username,
+            Message.content,
+            Message.created_at,
+            Message.updated_at,
+            MessageAnalysis.sentiment_score,
+            MessageAnalysis.perspective_vector,
+            MessageAnalysis.detected_biases,
+            MessageAnalysis.analyzed_at
+        ).outerjoin(
+            User, User.id == Message.user_id
+        ).outerjoin(
+            MessageAnalysis, MessageAnalysis.message_id == Message.id
+        )
+
+        if self.discussion_id is not None:
+            query = query.where(Message.discussion_id == self.discussion_id)
+        if self.workspace_id is not None:
+            query = query.join(Discussion, Discussion.id == Message.discussion_id).where(
+                Discussion.workspace_id == self.workspace_id
+            )
+
+        query = query.order_by(Message.discussion_id, Message.created_at, Message.id)
+        result = db.session.execute(query.execution_options(yield_per=self.chunk_size))
+
+        for row in result:
+            analysis = None
+            if row.analyzed_at is not None:
+                perspective = json.loads(row.perspective_vector) if row.perspective_vector else None
+                biases = json.loads(row.detected_biases) if row.detected_biases else None
+                analysis = {
+                    'sentiment_score': row.sentiment_score,
+                    'perspective': dict(zip(perspective['dimensions'], perspective['values'])) if perspective else None,
+                    'biases': biases.get('biases', []) if biases else [],
+                    'analyzed_at': row.analyzed_at.isoformat()
+                }
+
+            yield {
+                'id': row.id,
+                'discussion_id': row.discussion_id,
+                'parent_id': row.parent_id,
+                'user_id': row.user_id,
+                'username': row.username,
+                'content': row.content,
+                'created_at': row.created_at.isoformat(),
+                'updated_at': row.updated_at.isoformat(),
+                'analysis': analysis
+            }
+
+    def ndjson(self) -> Iterator[str]:
+        """Yield the export as newline-delimited JSON."""
+        for record in self.records():
+            yield json.dumps(record) + '\n'
+
+    def csv(self) -> Iterator[str]:
+        """
+        Yield the export as CSV, with one numeric column per perspective dimension.
+        """
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(self.columns())
+
+        for record in self.records():
+            writer.writerow(self._csv_row(record))
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+        yield buffer.getvalue()
+
+    def stream(self, export_format: str) -> Iterator[str]:
+        """
+        Yield the export in the requested format.
+
+        Args:
+            export_format: One of EXPORT_FORMATS
+        """
+        if export_format == 'csv':
+            return self.csv()
+        return self.ndjson()
+
+    def columns(self) -> List[str]:
+        return [
+            'id', 'discussion_id', 'parent_id', 'user_id', 'username', 'content',
+            'created_at', 'updated_at', 'sentiment_score'
+        ] + ['perspective_' + dimension for dimension in self.dimensions] + [
+            'detected_biases', 'analyzed_at'
+        ]
+
+    def _csv_row(self, record: Dict[str, Any]) -> List[Any]:
+        analysis = record['analysis'] or {}
+        perspective = analysis.get('perspective') or {}
+        biases = analysis.get('biases') or []
+
+        return [
+            record['id'], record['discussion_id'], record['parent_id'], record['user_id'],
+            record['username'], record['content'], record['created_at'], record['updated_at'],
+            analysis.get('sentiment_score')
+        ] + [perspective.get(dimension) for dimension in self.dimensions] + [
+            ';'.join('%s=%s' % (bias['name'], bias['confidence']) for bias in biases),
+            analysis.get('analyzed_at')
+        ]
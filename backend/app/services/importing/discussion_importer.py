@@ -0,0 +1,172 @@
+# app/services/importing/discussion_importer.py
+import json
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, Any, Iterable, Optional, Union
+
+from app import db
+from app.models.discussion import Discussion, Message
+from app.models.user import User
+from app.models.workspace import WorkspaceMember
+from app.services.sync.sequencer import allocate_sequence
+
+MAX_REPORTED_ERRORS = 20
+
+class DiscussionImporter:
+    """
+    Streams NDJSON chat history into a discussion with batched inserts.
+
+    Each line is a JSON object with `content`, the `user_id` or `username` of a
+    member of the discussion's workspace, and optionally `id`, `parent_id` and
+    `created_at` from the source system. Source IDs are mapped to new message
+    IDs so reply threads are preserved; a parent must appear before its replies.
+    """
+
+    def __init__(self, discussion_id: str, batch_size: int = 1000, analysis_queue=None):
+        """
+        Initialize the importer.
+
+        Args:
+            discussion_id: The discussion to import into
+            batch_size: Number of messages inserted per transaction
+            analysis_queue: Optional queue that imported message IDs are handed to
+        """
+        self.discussion_id = discussion_id
+        self.batch_size = batch_size
+        self.analysis_queue = analysis_queue
+        self._id_map = {}
+        self._user_ids = {}
+        self._usernames = {}
+        self._members = {}
+        self._workspace_id = None
+
+    def import_lines(self, lines: Iterable[Union[str, bytes]]) -> Dict[str, Any]:
+        """
+        Import messages from an iterable of NDJSON lines.
+
+        Args:
+            lines: NDJSON lines, for example a file object or request stream
+
+        Returns:
+            Dictionary with import counts, errors and throughput
+        """
+        started = time.perf_counter()
+        stats = {
+            "imported": 0,
+            "skipped": 0,
+            "orphaned": 0,
+            "batches": 0,
+            "errors": []
+        }
+        batch = []
+
+        for line_number, line in enumerate(lines, start=1):
+            if isinstance(line, bytes):
+                line = line.decode('utf-8')
+            line = line.strip()
+            if not line:
+                continue
+
+            try:
+                mapping = self._to_mapping(json.loads(line), stats)
+            except (ValueError, TypeError) as e:
+                stats["skipped"] += 1
+                if len(stats["errors"]) < MAX_REPORTED_ERRORS:
+                    stats["errors"].append({"line": line_number, "error": str(e)})
+                continue
+
+            batch.append(mapping)
+            if len(batch) >= self.batch_size:
+                self._flush(batch, stats)
+                batch = []
+
+        if batch:
+            self._flush(batch, stats)
+
+        elapsed = time.perf_counter() - started
+        stats["elapsed_seconds"] = round(elapsed, 3)
+        stats["messages_per_second"] = round(stats["imported"] / elapsed, 1) if elapsed > 0 else None
+
+        return stats
+
+    def _to_mapping(self, record: Dict[str, Any], stats: Dict[str, Any]) -> Dict[str, Any]:
+        if not isinstance(record, dict):
+            raise ValueError("Each line must be a JSON object")
+
+        content = record.get('content')
+        if not content or not isinstance(content, str):
+            raise ValueError("Message content is required")
+
+        user_id = self._resolve_user(record.get('user_id'), record.get('username'))
+        if user_id is None:
+            raise ValueError("Unknown user")
+        if not self._is_member(user_id):
+            raise ValueError("User is not a member of the discussion's workspace")
+
+        created_at = datetime.utcnow()
+        if record.get('created_at'):
+            created_at = datetime.fromisoformat(str(record['created_at']).replace('Z', '+00:00'))
+            if created_at.tzinfo is not None:
+                created_at = created_at.replace(tzinfo=None) - created_at.utcoffset()
+
+        parent_id = None
+        source_parent_id = record.get('parent_id')
+        if source_parent_id is not None:
+            parent_id = self._id_map.get(str(source_parent_id))
+            if parent_id is None:
+                stats["orphaned"] += 1
+
+        # Only map the source ID once the record is valid, so replies never point at a skipped line
+        message_id = str(uuid.uuid4())
+        source_id = record.get('id')
+        if source_id is not None:
+            self._id_map[str(source_id)] = message_id
+
+        return {
+            'id': message_id,
+            'discussion_id': self.discussion_id,
+            'parent_id': parent_id,
+            'user_id': user_id,
+            'content': content,
+            'created_at': created_at,
+            'updated_at': created_at
+        }
+
+    def _resolve_user(self, user_id: Optional[str], username: Optional[str]) -> Optional[str]:
+        if user_id is not None:
+            if user_id not in self._user_ids:
+                self._user_ids[user_id] = db.session.query(User.id).filter_by(id=user_id).scalar()
+            return self._user_ids[user_id]
+
+        if username is not None:
+            if username not in self._usernames:
+                self._usernames[username] = db.session.query(User.id).filter_by(username=username).scalar()
+            return self._usernames[username]
+
+        return None
+
+    def _is_member(self, user_id: str) -> bool:
+        if user_id not in self._members:
+            if self._workspace_id is None:
+                self._workspace_id = db.session.query(Discussion.workspace_id).filter_by(id=self.discussion_id).scalar()
+            self._members[user_id] = db.session.query(
+                WorkspaceMember.query.filter_by(workspace_id=self._workspace_id, user_id=user_id).exists()
+            ).scalar()
+        return self._members[user_id]
+
+    def _flush(self, batch, stats: Dict[str, Any]):
+        # Bulk inserts skip flush events, so reserve change sequence numbers here
+        message_at = max(mapping['created_at'] for mapping in batch)
+        seq = allocate_sequence(db.session, self.discussion_id, len(batch), message_at)
+        for offset, mapping in enumerate(batch):
+            mapping['seq'] = mapping['change_seq'] = seq + offset
+
+        db.session.bulk_insert_mappings(Message, batch)
+        db.session.commit()
+
+        stats["imported"] += len(batch)
+        stats["batches"] += 1
+
+        if self.analysis_queue is not None:
+            self.analysis_queue.enqueue(mapping['id'] for mapping in batch)
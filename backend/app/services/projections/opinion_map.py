@@ -0,0 +1,300 @@
+# app/services/projections/opinion_map.py
+import struct
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Tuple
+
+from sqlalchemy import or_, select
+
+from app.services.analytics.workspace_analytics import decode_json, perspective_matrix
+
+if TYPE_CHECKING:
+    # numpy is imported where it is used, so importing this module stays cheap
+    import numpy as np
+
+class DiscussionProjection:
+    """
+    One worker's copy of a discussion's perspective vectors and their 2D
+    coordinates under the current basis.
+    """
+
+    def __init__(self):
+        # Held while the projection is refreshed, so only its own discussion waits
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        import numpy as np
+
+        self.seq = 0
+        self.ids = []
+        self.user_ids = []
+        self.index = {}
+        self.dimensions = []
+        self.vectors = np.empty((0, 0), dtype=np.float32)
+        self.coords = np.empty((0, 2), dtype=np.float32)
+        self.basis = None
+        # Variance of points added since the basis was fitted, and the part of it the basis misses
+        self.new_count = 0
+        self.new_total = 0.0
+        self.new_residual = 0.0
+
+class OpinionMap:
+    """
+    2D PCA projection of each discussion's perspective vectors.
+
+    The fitted basis (mean and two principal axes) is stored in the shared
+    cache, so every worker draws the same map. Each worker keeps the
+    discussion's vectors and coordinates in memory and, when new analyses
+    arrive, only decodes and projects those. The basis is refitted when the
+    new points are poorly explained by it (their unexplained variance ratio
+    exceeds the ratio at fit time by OPINION_MAP_DRIFT_THRESHOLD) or the
+    discussion has grown OPINION_MAP_REFIT_GROWTH times since the fit.
+    Refitted axes keep the orientation of the previous ones, so the map does
+    not flip.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.drift_threshold = 0.1
+        self.refit_growth = 2.0
+        self.min_points = 3
+        self.drift_min_points = 10
+        self.max_discussions = 256
+        self._projections = OrderedDict()
+        self._lock = threading.Lock()
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """
+        Bind the opinion map to an application.
+
+        Args:
+            app: The Flask application
+        """
+        self.app = app
+        self.drift_threshold = app.config['OPINION_MAP_DRIFT_THRESHOLD']
+        self.refit_growth = app.config['OPINION_MAP_REFIT_GROWTH']
+        self.min_points = app.config['OPINION_MAP_MIN_POINTS']
+        self.drift_min_points = app.config['OPINION_MAP_DRIFT_MIN_POINTS']
+        self.max_discussions = app.config['OPINION_MAP_MAX_DISCUSSIONS']
+        app.extensions['opinion_map'] = self
+
+    def project(self, discussion) -> Dict[str, Any]:
+        """
+        Bring a discussion's projection up to date.
+
+        Costs no database query when nothing changed since the last call,
+        because the discussion's last_seq is already loaded.
+
+        Args:
+            discussion: The (already authorized) discussion
+
+        Returns:
+            Dictionary with message IDs, their authors, a float32 array of
+            coordinates of shape (messages, 2), the basis version (0 before
+            there are enough points to fit) and the variance each axis explains
+        """
+        # The worker-wide lock only guards the LRU; the refresh below holds the
+        # discussion's own lock, so slow maps don't block other discussions
+        with self._lock:
+            projection = self._projections.pop(discussion.id, None) or DiscussionProjection()
+            self._projections[discussion.id] = projection
+            while len(self._projections) > self.max_discussions:
+                self._projections.popitem(last=False)
+
+        with projection.lock:
+            if discussion.last_seq != projection.seq:
+                self._load(discussion, projection)
+
+            basis = self._shared_basis(discussion.id)
+            if basis is None or basis['dimensions'] != projection.dimensions or self._drifted(projection, basis):
+                basis = self._fit(discussion.id, projection, basis)
+
+            if basis is not None and (projection.basis is None or projection.basis['version'] != basis['version']):
+                self._adopt(projection, basis)
+
+            # Copies, so a concurrent refresh can't change them while they are serialized
+            return {
+                'ids': list(projection.ids),
+                'user_ids': list(projection.user_ids),
+                'coords': projection.coords.copy(),
+                'version': projection.basis['version'] if projection.basis else 0,
+                'explained_variance': projection.basis['explained_variance'] if projection.basis else None
+            }
+
+    def participants(self, points: Dict[str, Any]) -> Tuple[List[str], 'np.ndarray']:
+        """
+        Coordinates of each participant: the mean of their messages' coordinates.
+
+        Args:
+            points: Result of `project`
+
+        Returns:
+            User IDs and a float32 array of shape (participants, 2)
+        """
+        import numpy as np
+
+        if not points['ids']:
+            return [], np.empty((0, 2), dtype=np.float32)
+        user_ids, inverse = np.unique(np.array(points['user_ids']), return_inverse=True)
+        sums = np.zeros((len(user_ids), 2), dtype=np.float64)
+        np.add.at(sums, inverse, points['coords'])
+        counts = np.bincount(inverse, minlength=len(user_ids))[:, None]
+        return user_ids.tolist(), (sums / counts).astype(np.float32)
+
+    def _load(self, discussion, projection: DiscussionProjection):
+        import numpy as np
+
+        from app import db
+        from app.models.analysis import MessageAnalysis
+        from app.models.discussion import Message
+
+        seq = discussion.last_seq
+        changed = MessageAnalysis.change_seq > projection.seq
+        if projection.seq == 0:
+            # Analyses written before change sequence numbers existed
+            changed = or_(changed, MessageAnalysis.change_seq.is_(None))
+        rows = db.session.execute(select(
+            MessageAnalysis.message_id,
+            Message.user_id,
+            MessageAnalysis.perspective_vector
+        ).join(
+            Message, Message.id == MessageAnalysis.message_id
+        ).where(
+            Message.discussion_id == discussion.id,
+            changed
+        ).order_by(MessageAnalysis.change_seq)).all()
+        projection.seq = seq
+        if not rows:
+            return
+
+        dimensions, vectors = perspective_matrix([decode_json(row.perspective_vector) for row in rows])
+        if dimensions != projection.dimensions and projection.ids:
+            # The analyzer changed shape; start over with the new dimensions
+            projection.reset()
+            self._load(discussion, projection)
+            return
+        projection.dimensions = dimensions
+        if projection.vectors.size == 0:
+            projection.vectors = np.empty((0, len(dimensions)), dtype=np.float32)
+
+        vectors = np.nan_to_num(vectors)
+        coords = self._transform(projection.basis, vectors)
+        appended = []
+        for row, vector, coord in zip(rows, vectors, coords):
+            position = projection.index.get(row.message_id)
+            if position is not None:
+                # Re-analyzed message
+                projection.vectors[position] = vector
+                projection.coords[position] = coord
+                continue
+            projection.index[row.message_id] = len(projection.ids) + len(appended)
+            appended.append((row.message_id, row.user_id, vector, coord))
+
+        if appended:
+            message_ids, user_ids, new_vectors, new_coords = zip(*appended)
+            projection.ids.extend(message_ids)
+            projection.user_ids.extend(user_ids)
+            projection.vectors = np.vstack([projection.vectors, np.array(new_vectors, dtype=np.float32)])
+            projection.coords = np.vstack([projection.coords, np.array(new_coords, dtype=np.float32)])
+            self._track_drift(projection, np.array(new_vectors, dtype=np.float32))
+
+    def _track_drift(self, projection: DiscussionProjection, vectors: 'np.ndarray'):
+        import numpy as np
+
+        basis = projection.basis
+        if basis is None:
+            return
+        centered = vectors - basis['mean']
+        reconstructed = centered @ basis['components'].T @ basis['components']
+        projection.new_count += len(vectors)
+        projection.new_total += float(np.square(centered).sum())
+        projection.new_residual += float(np.square(centered - reconstructed).sum())
+
+    def _drifted(self, projection: DiscussionProjection, basis: Dict[str, Any]) -> bool:
+        if len(projection.ids) >= max(basis['fit_count'], 1) * self.refit_growth:
+            return True
+        # A handful of points says little about drift
+        if projection.new_count < self.drift_min_points or projection.new_total == 0:
+            return False
+        new_ratio = projection.new_residual / projection.new_total
+        return new_ratio - basis['residual_ratio'] > self.drift_threshold
+
+    def _fit(self, discussion_id: str, projection: DiscussionProjection,
+             previous: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        import numpy as np
+
+        from app import cache
+
+        if len(projection.ids) < self.min_points:
+            return previous
+        vectors = projection.vectors.astype(np.float64)
+        mean = vectors.mean(axis=0)
+        centered = vectors - mean
+        _, singular_values, axes = np.linalg.svd(centered, full_matrices=False)
+        components = np.zeros((2, vectors.shape[1]))
+        components[:min(2, len(axes))] = axes[:2]
+
+        # Keep the previous orientation so refits don't mirror the map
+        reference = previous or projection.basis
+        if reference is not None and np.shape(reference['components']) == components.shape:
+            signs = np.sign(np.sum(components * np.asarray(reference['components']), axis=1))
+            components *= np.where(signs == 0, 1, signs)[:, None]
+
+        variance = np.square(singular_values)
+        total = float(variance.sum())
+        basis = {
+            'version': int(time.time() * 1000),
+            'dimensions': projection.dimensions,
+            'mean': mean.tolist(),
+            'components': components.tolist(),
+            'fit_count': len(projection.ids),
+            'residual_ratio': float(variance[2:].sum()) / total if total else 0.0,
+            'explained_variance': (variance[:2] / total).tolist() if total else [0.0, 0.0]
+        }
+        # No expiry; a lost basis is simply refitted
+        cache.set(_namespace(discussion_id), 'basis', basis, ttl=0)
+        return basis
+
+    def _shared_basis(self, discussion_id: str) -> Optional[Dict[str, Any]]:
+        from app import cache
+        return cache.get(_namespace(discussion_id), 'basis')
+
+    def _adopt(self, projection: DiscussionProjection, basis: Dict[str, Any]):
+        import numpy as np
+
+        projection.basis = dict(
+            basis,
+            mean=np.asarray(basis['mean'], dtype=np.float32),
+            components=np.asarray(basis['components'], dtype=np.float32)
+        )
+        projection.coords = self._transform(projection.basis, projection.vectors)
+        projection.new_count = 0
+        projection.new_total = projection.new_residual = 0.0
+
+    def _transform(self, basis: Optional[Dict[str, Any]], vectors: 'np.ndarray') -> 'np.ndarray':
+        import numpy as np
+
+        if basis is None or vectors.size == 0:
+            return np.zeros((len(vectors), 2), dtype=np.float32)
+        return ((vectors - basis['mean']) @ basis['components'].T).astype(np.float32)
+
+def encode_points(ids: List[str], coords: 'np.ndarray', version: int) -> bytes:
+    """
+    Pack points for the binary opinion map response.
+
+    Layout, little-endian: uint32 point count, uint64 basis version, then
+    count x 2 float32 coordinates (x, y), then the point IDs as UTF-8
+    joined by newlines, in the same order.
+    """
+    import numpy as np
+
+    header = struct.pack('<IQ', len(ids), version)
+    return header + np.ascontiguousarray(coords, dtype='<f4').tobytes() + '\n'.join(ids).encode('utf-8')
+
+def _namespace(discussion_id: str) -> str:
+    return f'discussion:{discussion_id}:opinion_map'
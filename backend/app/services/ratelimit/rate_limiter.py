@@ -0,0 +1,241 @@
+# app/services/ratelimit/rate_limiter.py
+import math
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional, Tuple
+
+# Buckets idle long enough to have refilled completely are pruned every this many takes
+PRUNE_EVERY = 1000
+
+# In-flight limit when neither config nor the server says how many requests a worker serves at once
+DEFAULT_MAX_IN_FLIGHT = 32
+
+class MemoryBucketStore:
+    """Token buckets held in this process."""
+
+    def __init__(self):
+        self._buckets = {}  # key -> (tokens, updated_at)
+        self._lock = threading.Lock()
+        self._calls = 0
+
+    def take(self, key: str, capacity: float, rate: float, now: float) -> float:
+        """
+        Take one token from a bucket.
+
+        Args:
+            key: Bucket identifier
+            capacity: Maximum number of tokens
+            rate: Tokens added per second
+            now: Current time in seconds
+
+        Returns:
+            0 if a token was taken, otherwise seconds until one is available
+        """
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated_at) * rate)
+
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                wait = 0.0
+            else:
+                self._buckets[key] = (tokens, now)
+                wait = (1 - tokens) / rate
+
+            self._calls += 1
+            if self._calls % PRUNE_EVERY == 0:
+                idle = capacity / rate
+                self._buckets = {
+                    k: v for k, v in self._buckets.items() if now - v[1] < idle
+                }
+            return wait
+
+class SQLiteBucketStore:
+    """
+    Token buckets shared by every worker on a host through a local SQLite file.
+
+    Each take is one short IMMEDIATE transaction, so concurrent workers see
+    a consistent token count without a separate lock server.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._calls = 0
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._connection().execute("""
+            CREATE TABLE IF NOT EXISTS rate_limit_buckets (
+                key TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+
+    def _connection(self):
+        # sqlite3 connections can't be shared across threads or forked processes
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def take(self, key: str, capacity: float, rate: float, now: float) -> float:
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute(
+                "SELECT tokens, updated_at FROM rate_limit_buckets WHERE key = ?", (key,)
+            ).fetchone()
+            tokens, updated_at = row if row else (capacity, now)
+            tokens = min(capacity, tokens + max(now - updated_at, 0) * rate)
+
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+            else:
+                wait = (1 - tokens) / rate
+
+            conn.execute(
+                "INSERT OR REPLACE INTO rate_limit_buckets (key, tokens, updated_at) VALUES (?, ?, ?)",
+                (key, tokens, now)
+            )
+
+            self._calls += 1
+            if self._calls % PRUNE_EVERY == 0:
+                conn.execute(
+                    "DELETE FROM rate_limit_buckets WHERE updated_at < ?", (now - capacity / rate,)
+                )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return wait
+
+class LoadMonitor:
+    """
+    Tracks in-flight guarded requests and an exponentially weighted moving
+    average of their latency in this worker.
+    """
+
+    def __init__(self, alpha: float = 0.2):
+        self.alpha = alpha
+        self.in_flight = 0
+        self.latency_ewma = 0.0
+        self._lock = threading.Lock()
+
+    def started(self):
+        with self._lock:
+            self.in_flight += 1
+
+    def finished(self, elapsed: float):
+        with self._lock:
+            self.in_flight -= 1
+            self.latency_ewma += self.alpha * (elapsed - self.latency_ewma)
+
+class RateLimiter:
+    """
+    Per-user token-bucket rate limiting by endpoint class, plus load shedding.
+
+    Endpoint classes and their limits come from RATE_LIMITS, a mapping of
+    class name to (requests, per_seconds). A user may burst up to `requests`
+    and then gets one more every `per_seconds / requests` seconds.
+    """
+
+    def __init__(self, app=None):
+        self.store = None
+        self.limits = {}
+        self.monitor = LoadMonitor()
+        self.max_in_flight = DEFAULT_MAX_IN_FLIGHT
+        self.configured_max_in_flight = None
+        self.max_latency = None
+        self.max_queue_depth = None
+        self.queue_depth = lambda: 0
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app, queue_depth=None):
+        """
+        Bind the limiter to an application.
+
+        Args:
+            app: The Flask application
+            queue_depth: Optional callable returning the background work backlog
+        """
+        self.limits = {
+            name: (float(requests), float(requests) / per_seconds)
+            for name, (requests, per_seconds) in app.config['RATE_LIMITS'].items()
+        }
+        self.configured_max_in_flight = app.config['LOAD_SHED_MAX_IN_FLIGHT']
+        self.max_in_flight = self.configured_max_in_flight or DEFAULT_MAX_IN_FLIGHT
+        self.max_latency = app.config['LOAD_SHED_LATENCY_MS'] / 1000.0
+        self.max_queue_depth = app.config['LOAD_SHED_QUEUE_DEPTH']
+        if queue_depth is not None:
+            self.queue_depth = queue_depth
+
+        backend = app.config['RATE_LIMIT_BACKEND']
+        if backend == 'memory':
+            self.store = MemoryBucketStore()
+        elif backend == 'sqlite':
+            self.store = SQLiteBucketStore(app.config['RATE_LIMIT_PATH'])
+        else:
+            raise ValueError(f"Unknown rate limit backend: {backend}")
+
+        app.extensions['rate_limiter'] = self
+
+    def set_worker_concurrency(self, concurrency: int):
+        """
+        Tell the limiter how many requests this worker serves at once, e.g.
+        gunicorn's threads per worker, unless LOAD_SHED_MAX_IN_FLIGHT is set.
+
+        A request is checked while it already holds one of those slots, so
+        it can see at most `concurrency - 1` others in flight; shedding
+        starts there, which keeps the last slot free for unguarded requests.
+
+        Args:
+            concurrency: Requests the worker can handle concurrently
+        """
+        if self.configured_max_in_flight is None and concurrency:
+            self.max_in_flight = max(int(concurrency) - 1, 1)
+
+    def check(self, user_id: str, endpoint_class: str) -> Optional[Tuple[int, int, str]]:
+        """
+        Decide whether a request may proceed.
+
+        Args:
+            user_id: The authenticated user
+            endpoint_class: Name of the limit in RATE_LIMITS
+
+        Returns:
+            None to admit the request, otherwise (status code, Retry-After
+            seconds, message)
+        """
+        overloaded = self._overload_retry_after()
+        if overloaded is not None:
+            return 503, overloaded, "Server is overloaded, please retry later"
+
+        capacity, rate = self.limits[endpoint_class]
+        wait = self.store.take(f'{endpoint_class}:{user_id}', capacity, rate, time.time())
+        if wait > 0:
+            return 429, max(1, math.ceil(wait)), "Rate limit exceeded"
+        return None
+
+    def _overload_retry_after(self) -> Optional[int]:
+        monitor = self.monitor
+        retry_after = max(1, math.ceil(monitor.latency_ewma))
+
+        if monitor.in_flight >= self.max_in_flight:
+            return retry_after
+        if self.queue_depth() >= self.max_queue_depth:
+            return retry_after
+        # Latency alone only sheds while the worker is still busy, otherwise the
+        # average could never recover once every request is being rejected
+        if monitor.latency_ewma > self.max_latency and monitor.in_flight * 2 >= self.max_in_flight:
+            return retry_after
+        return None
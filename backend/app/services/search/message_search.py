@@ -0,0 +1,243 @@
+# app/services/search/message_search.py
+import re
+from typing import Dict, Any, List, Optional
+
+from sqlalchemy import text, inspect
+
+from app import db
+from app.models.discussion import Message
+
+HIGHLIGHT_START = '<mark>'
+HIGHLIGHT_END = '</mark>'
+
+# messages has a string primary key and its implicit rowid may change on
+# VACUUM, so FTS5 rows are keyed by an INTEGER PRIMARY KEY of our own
+SQLITE_INDEX_DDL = [
+    """
+    CREATE TABLE message_search_keys (
+        id INTEGER PRIMARY KEY,
+        message_id VARCHAR(36) NOT NULL UNIQUE
+    )
+    """,
+    "INSERT INTO message_search_keys (message_id) SELECT id FROM messages",
+    """
+    CREATE VIEW message_search_content AS
+    SELECT k.id AS search_key, m.content AS content
+    FROM message_search_keys k
+    JOIN messages m ON m.id = k.message_id
+    """,
+    """
+    CREATE VIRTUAL TABLE messages_fts USING fts5(
+        content,
+        content='message_search_content',
+        content_rowid='search_key',
+        tokenize='porter unicode61'
+    )
+    """,
+    "INSERT INTO messages_fts(messages_fts) VALUES ('rebuild')",
+]
+
+SQLITE_TRIGGER_DDL = [
+    """
+    CREATE TRIGGER IF NOT EXISTS messages_fts_insert AFTER INSERT ON messages BEGIN
+        INSERT INTO message_search_keys (message_id) VALUES (new.id);
+        INSERT INTO messages_fts(rowid, content)
+        SELECT id, new.content FROM message_search_keys WHERE message_id = new.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS messages_fts_delete AFTER DELETE ON messages BEGIN
+        INSERT INTO messages_fts(messages_fts, rowid, content)
+        SELECT 'delete', id, old.content FROM message_search_keys WHERE message_id = old.id;
+        DELETE FROM message_search_keys WHERE message_id = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS messages_fts_update AFTER UPDATE OF content ON messages BEGIN
+        INSERT INTO messages_fts(messages_fts, rowid, content)
+        SELECT 'delete', id, old.content FROM message_search_keys WHERE message_id = old.id;
+        INSERT INTO messages_fts(rowid, content)
+        SELECT id, new.content FROM message_search_keys WHERE message_id = new.id;
+    END
+    """,
+]
+
+# Replaces the first layout, which keyed the index by messages.rowid
+SQLITE_LEGACY_DROP_DDL = [
+    "DROP TRIGGER IF EXISTS messages_fts_insert",
+    "DROP TRIGGER IF EXISTS messages_fts_delete",
+    "DROP TRIGGER IF EXISTS messages_fts_update",
+    "DROP TABLE messages_fts",
+]
+
+POSTGRES_INDEX_DDL = [
+    """
+    CREATE INDEX IF NOT EXISTS idx_messages_content_fts
+    ON messages USING GIN (to_tsvector('english', content))
+    """,
+]
+
+def install_search_index(engine):
+    """
+    Create the full-text index over messages.content for the engine's dialect.
+
+    SQLite gets an external-content FTS5 table kept in sync by triggers, and
+    PostgreSQL gets a GIN expression index, which it maintains on every
+    insert and update. Other databases get no index; MessageSearch falls
+    back to LIKE there. Safe to run on every startup.
+
+    Args:
+        engine: The SQLAlchemy engine holding the messages table
+    """
+    with engine.begin() as conn:
+        if engine.dialect.name == 'sqlite':
+            inspector = inspect(conn)
+            exists = inspector.has_table('messages_fts')
+            if exists and not inspector.has_table('message_search_keys'):
+                for statement in SQLITE_LEGACY_DROP_DDL:
+                    conn.execute(text(statement))
+                exists = False
+            if not exists:
+                for statement in SQLITE_INDEX_DDL:
+                    conn.execute(text(statement))
+            for statement in SQLITE_TRIGGER_DDL:
+                conn.execute(text(statement))
+        elif engine.dialect.name == 'postgresql':
+            for statement in POSTGRES_INDEX_DDL:
+                conn.execute(text(statement))
+
+class MessageSearch:
+    """
+    Ranked, highlighted full-text search over message content.
+    """
+
+    def __init__(self, limit: int = 20, offset: int = 0):
+        """
+        Initialize the search with paging options.
+
+        Args:
+            limit: Maximum number of results
+            offset: Number of results to skip
+        """
+        self.limit = limit
+        self.offset = offset
+
+    def search(self, query: str, discussion_id: Optional[str] = None,
+               workspace_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Search messages in a discussion or a workspace.
+
+        Args:
+            query: Free text entered by the user
+            discussion_id: Restrict results to this discussion
+            workspace_id: Restrict results to discussions in this workspace
+
+        Returns:
+            List of matching messages, best match first, with highlighted snippets
+        """
+        terms = re.findall(r'\w+', query.lower())
+        if not terms:
+            return []
+
+        params = {'limit': self.limit, 'offset': self.offset}
+        scope = []
+        if discussion_id is not None:
+            scope.append('m.discussion_id = :discussion_id')
+            params['discussion_id'] = discussion_id
+        if workspace_id is not None:
+            scope.append('d.workspace_id = :workspace_id')
+            params['workspace_id'] = workspace_id
+        scope_sql = ''.join(' AND ' + clause for clause in scope)
+
+        # Raw SQL carries no table metadata, so name the mapper to reach the right shard
+        bind_arguments = {'mapper': Message}
+        dialect = db.session.get_bind(mapper=Message).dialect.name
+        if dialect == 'sqlite':
+            statement = self._sqlite_statement(scope_sql)
+            # Quote every term so user input is never parsed as FTS5 syntax
+            params['query'] = ' '.join('"%s"' % term for term in terms)
+        elif dialect == 'postgresql':
+            statement = self._postgres_statement(scope_sql)
+            params['query'] = ' '.join(terms)
+        else:
+            # No full-text index here; match every term as a substring, newest first
+            statement = self._like_statement(scope_sql, len(terms))
+            for i, term in enumerate(terms):
+                params[f'term{i}'] = '%' + term.replace('!', '!!').replace('_', '!_') + '%'
+
+        rows = db.session.execute(text(statement), params, bind_arguments=bind_arguments).mappings().all()
+
+        return [{
+            'id': row['id'],
+            'discussion_id': row['discussion_id'],
+            'parent_id': row['parent_id'],
+            'user_id': row['user_id'],
+            'username': row['username'],
+            'snippet': row['snippet'] if 'snippet' in row else _snippet(row['content'], terms),
+            'rank': row['rank'],
+            'created_at': _isoformat(row['created_at'])
+        } for row in rows]
+
+    def _sqlite_statement(self, scope_sql: str) -> str:
+        return f"""
+            SELECT m.id, m.discussion_id, m.parent_id, m.user_id, u.username, m.created_at,
+                   snippet(messages_fts, 0, '{HIGHLIGHT_START}', '{HIGHLIGHT_END}', '...', 32) AS snippet,
+                   -bm25(messages_fts) AS rank
+            FROM messages_fts
+            JOIN message_search_keys k ON k.id = messages_fts.rowid
+            JOIN messages m ON m.id = k.message_id
+            JOIN discussions d ON d.id = m.discussion_id
+            LEFT JOIN users u ON u.id = m.user_id
+            WHERE messages_fts MATCH :query{scope_sql}
+            ORDER BY bm25(messages_fts)
+            LIMIT :limit OFFSET :offset
+        """
+
+    def _postgres_statement(self, scope_sql: str) -> str:
+        # Rank and page first so ts_headline only runs on the returned rows
+        return f"""
+            SELECT hits.id, hits.discussion_id, hits.parent_id, hits.user_id, u.username, hits.created_at,
+                   ts_headline('english', hits.content, hits.tsq,
+                               'StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_END}, MaxFragments=2') AS snippet,
+                   hits.rank
+            FROM (
+                SELECT m.id, m.discussion_id, m.parent_id, m.user_id, m.content, m.created_at, q.tsq,
+                       ts_rank(to_tsvector('english', m.content), q.tsq) AS rank
+                FROM messages m
+                JOIN discussions d ON d.id = m.discussion_id
+                CROSS JOIN plainto_tsquery('english', :query) AS q(tsq)
+                WHERE to_tsvector('english', m.content) @@ q.tsq{scope_sql}
+                ORDER BY rank DESC
+                LIMIT :limit OFFSET :offset
+            ) AS hits
+            LEFT JOIN users u ON u.id = hits.user_id
+            ORDER BY hits.rank DESC
+        """
+
+    def _like_statement(self, scope_sql: str, term_count: int) -> str:
+        matches = ' AND '.join(f"LOWER(m.content) LIKE :term{i} ESCAPE '!'" for i in range(term_count))
+        return f"""
+            SELECT m.id, m.discussion_id, m.parent_id, m.user_id, u.username, m.created_at, m.content,
+                   NULL AS rank
+            FROM messages m
+            JOIN discussions d ON d.id = m.discussion_id
+            LEFT JOIN users u ON u.id = m.user_id
+            WHERE {matches}{scope_sql}
+            ORDER BY m.created_at DESC
+            LIMIT :limit OFFSET :offset
+        """
+
+def _snippet(content: str, terms: List[str], width: int = 160) -> str:
+    # Cut a window around the first match and highlight every term in it
+    pattern = re.compile('|'.join(re.escape(term) for term in terms), re.IGNORECASE)
+    match = pattern.search(content)
+    start = max((match.start() if match else 0) - width // 4, 0)
+    window = content[start:start + width]
+    highlighted = pattern.sub(lambda m: f'{HIGHLIGHT_START}{m.group(0)}{HIGHLIGHT_END}', window)
+    return ('...' if start > 0 else '') + highlighted + ('...' if start + width < len(content) else '')
+
+def _isoformat(value):
+    # Raw SQL on SQLite hands back timestamps as 'YYYY-MM-DD HH:MM:SS' strings
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value.replace(' ', 'T', 1) if value else value
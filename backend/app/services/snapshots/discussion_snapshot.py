@@ -0,0 +1,67 @@
+# app/services/snapshots/discussion_snapshot.py
+from typing import Dict, Any
+
+from sqlalchemy.orm import joinedload
+
+from app.models.decision import DecisionProcess
+from app.models.discussion import Discussion, Message
+from app.services.documents.version_store import DocumentVersionStore
+
+class DiscussionSnapshot:
+    """
+    Everything needed to open a discussion, loaded with a fixed number of
+    queries: the latest page of messages with authors and analyses, the
+    decision process with its stages, and the latest decision document.
+    """
+
+    def __init__(self, discussion: Discussion, version_store: DocumentVersionStore, limit: int = 50):
+        """
+        Initialize the snapshot for an already authorized discussion.
+
+        Args:
+            discussion: The discussion being opened
+            version_store: Store used to read the latest decision document
+            limit: Number of most recent messages to include
+        """
+        self.discussion = discussion
+        self.version_store = version_store
+        self.limit = limit
+
+    def build(self) -> Dict[str, Any]:
+        """
+        Load the snapshot.
+
+        Returns:
+            Dictionary with the discussion, its latest messages in
+            chronological order, their analyses, the decision process, its
+            stages and the latest document
+        """
+        # Newest first so the LIMIT picks the latest page; one extra row tells us if there is more
+        messages = Message.query.options(
+            joinedload(Message.user),
+            joinedload(Message.analysis)
+        ).filter(
+            Message.discussion_id == self.discussion.id
+        ).order_by(
+            Message.created_at.desc(), Message.id.desc()
+        ).limit(self.limit + 1).all()
+
+        has_more = len(messages) > self.limit
+        messages = list(reversed(messages[:self.limit]))
+
+        process = DecisionProcess.query.options(
+            joinedload(DecisionProcess.stages)
+        ).filter_by(discussion_id=self.discussion.id).first()
+
+        stages = sorted(process.stages, key=lambda stage: stage.order_index) if process else []
+        document = self.version_store.latest(process.id) if process else None
+
+        return {
+            "discussion": self.discussion.to_dict(),
+            "messages": [message.to_dict() for message in messages],
+            "has_more": has_more,
+            "analyses": [message.analysis.to_dict() for message in messages if message.analysis],
+            "process": process.to_dict() if process else None,
+            "stages": [stage.to_dict() for stage in stages],
+            "document": document.to_dict() if document else None
+        }
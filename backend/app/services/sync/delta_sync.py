@@ -0,0 +1,76 @@
+# app/services/sync/delta_sync.py
+from typing import Dict, Any
+
+from sqlalchemy.orm import joinedload
+
+from app.models.analysis import MessageAnalysis
+from app.models.discussion import Discussion, Message
+
+class DeltaSync:
+    """
+    Returns what changed in a discussion after a client's cursor.
+
+    The cursor is the discussion's change sequence number, so the cost of a
+    sync is proportional to the size of the delta, not of the discussion.
+    Every message and analysis carries a change_seq (rows older than
+    sequencing are numbered by backfill_sequences), so paging by it alone
+    always moves forward.
+    """
+
+    def __init__(self, discussion: Discussion, limit: int = 500):
+        """
+        Initialize the sync for a discussion.
+
+        Args:
+            discussion: The discussion being synced
+            limit: Maximum number of messages and of analyses per response
+        """
+        self.discussion = discussion
+        self.limit = limit
+
+    def changes_since(self, cursor: int) -> Dict[str, Any]:
+        """
+        Collect messages and analyses changed after the cursor.
+
+        Args:
+            cursor: The cursor returned by the previous sync, or 0 for everything
+
+        Returns:
+            Dictionary with changed messages, changed analyses, the next cursor
+            and whether more changes are waiting
+        """
+        # Read the counter first; anything committed later is picked up next time
+        latest = self.discussion.last_seq or 0
+
+        messages = Message.query.options(joinedload(Message.user)).filter(
+            Message.discussion_id == self.discussion.id,
+            Message.change_seq > cursor,
+            Message.change_seq <= latest
+        ).order_by(Message.change_seq).limit(self.limit + 1).all()
+
+        analyses = MessageAnalysis.query.filter(
+            MessageAnalysis.discussion_id == self.discussion.id,
+            MessageAnalysis.change_seq > cursor,
+            MessageAnalysis.change_seq <= latest
+        ).order_by(MessageAnalysis.change_seq).limit(self.limit + 1).all()
+
+        # When either side is truncated, only advance the cursor as far as both sides are complete
+        next_cursor = latest
+        has_more = False
+        for rows in (messages, analyses):
+            if len(rows) > self.limit:
+                has_more = True
+                next_cursor = min(next_cursor, rows[self.limit - 1].change_seq)
+
+        if has_more:
+            messages = [m for m in messages if m.change_seq <= next_cursor]
+            analyses = [a for a in analyses if a.change_seq <= next_cursor]
+
+        return {
+            "discussion_id": self.discussion.id,
+            "cursor": next_cursor,
+            "has_more": has_more,
+            "messages": [dict(m.to_dict(), change_seq=m.change_seq) for m in messages],
+            "analyses": [dict(a.to_dict(), change_seq=a.change_seq) for a in analyses]
+        }
+
@@ -0,0 +1,181 @@
+# app/services/sync/sequencer.py
+from collections import defaultdict
+from datetime import datetime
+
+from sqlalchemy import bindparam, case, event, func, select, update
+
+from app.models.analysis import MessageAnalysis
+from app.models.discussion import Discussion, Message
+
+def allocate_sequence(connection, discussion_id: str, count: int = 1, message_at: datetime = None) -> int:
+    """
+    Reserve a block of change sequence numbers in a discussion.
+
+    The counter row stays locked until the surrounding transaction ends, so
+    sequence numbers become visible to readers in the order they were handed out.
+
+    Args:
+        connection: Connection or session taking part in the current transaction
+        discussion_id: The discussion the changes belong to
+        count: How many numbers to reserve
+        message_at: Creation time of the newest message in the block, if any,
+            to advance the discussion's last_message_at
+
+    Returns:
+        The first number of the reserved block, or None if the discussion
+        row has not been written yet
+    """
+    table = Discussion.__table__
+    values = {
+        'last_seq': table.c.last_seq + count,
+        # Keep updated_at untouched; a new message is not an edit of the discussion
+        'updated_at': table.c.updated_at
+    }
+    if message_at is not None:
+        values['last_message_at'] = case(
+            (table.c.last_message_at.is_(None), message_at),
+            (table.c.last_message_at < message_at, message_at),
+            else_=table.c.last_message_at
+        )
+
+    connection.execute(update(table).where(table.c.id == discussion_id).values(**values))
+    last_seq = connection.execute(
+        select(table.c.last_seq).where(table.c.id == discussion_id)
+    ).scalar()
+
+    if last_seq is None:
+        return None
+    return last_seq - count + 1
+
+def stamp_changes(session, flush_context, instances):
+    """
+    Assign change sequence numbers to new or edited messages and new analyses
+    before they are flushed.
+    """
+    changes = defaultdict(list)
+
+    for obj in session.new:
+        if isinstance(obj, Message):
+            changes[obj.discussion_id].append((obj, True))
+        elif isinstance(obj, MessageAnalysis):
+            if obj.discussion_id is None:
+                message = session.get(Message, obj.message_id)
+                obj.discussion_id = message.discussion_id if message else None
+            if obj.discussion_id is not None:
+                changes[obj.discussion_id].append((obj, False))
+
+    for obj in session.dirty:
+        if isinstance(obj, (Message, MessageAnalysis)) and session.is_modified(obj, include_collections=False):
+            changes[obj.discussion_id].append((obj, False))
+
+    connection = session.connection(bind_arguments={'mapper': Discussion})
+    for discussion_id, objects in changes.items():
+        message_at = max(
+            (obj.created_at or datetime.utcnow() for obj, is_insert in objects
+             if is_insert and isinstance(obj, Message)),
+            default=None
+        )
+        seq = allocate_sequence(connection, discussion_id, len(objects), message_at)
+        if seq is None:
+            seq = _allocate_pending(session, discussion_id, len(objects), message_at)
+        if seq is None:
+            continue
+        for obj, is_insert in objects:
+            if is_insert:
+                obj.seq = seq
+            obj.change_seq = seq
+            seq += 1
+
+def _allocate_pending(session, discussion_id: str, count: int, message_at: datetime = None) -> int:
+    # The discussion is being inserted in this same flush, so advance its counter in memory
+    discussion = next(
+        (obj for obj in session.new if isinstance(obj, Discussion) and obj.id == discussion_id),
+        None
+    )
+    if discussion is None:
+        return None
+
+    first = (discussion.last_seq or 0) + 1
+    discussion.last_seq = first + count - 1
+    if message_at is not None and (discussion.last_message_at is None or discussion.last_message_at < message_at):
+        discussion.last_message_at = message_at
+    return first
+
+def backfill_sequences(engine) -> int:
+    """
+    Number messages and analyses written before change sequencing existed.
+
+    Each discussion's unnumbered rows get a fresh block from its counter, in
+    creation order, so delta sync can page every row by change_seq alone.
+    Safe to run on every startup.
+
+    Args:
+        engine: The engine holding the messages and message_analysis tables
+
+    Returns:
+        The number of rows stamped
+    """
+    messages = Message.__table__
+    analyses = MessageAnalysis.__table__
+    stamped = 0
+
+    with engine.begin() as conn:
+        conn.execute(update(analyses).where(analyses.c.discussion_id.is_(None)).values(
+            discussion_id=select(messages.c.discussion_id)
+            .where(messages.c.id == analyses.c.message_id)
+            .scalar_subquery()
+        ))
+
+        discussion_ids = set(conn.execute(
+            select(messages.c.discussion_id).where(messages.c.change_seq.is_(None)).distinct()
+        ).scalars()) | set(conn.execute(
+            select(analyses.c.discussion_id).where(
+                analyses.c.change_seq.is_(None), analyses.c.discussion_id.isnot(None)
+            ).distinct()
+        ).scalars())
+
+        for discussion_id in sorted(discussion_ids):
+            message_ids = conn.execute(
+                select(messages.c.id).where(
+                    messages.c.discussion_id == discussion_id, messages.c.change_seq.is_(None)
+                ).order_by(messages.c.created_at, messages.c.id)
+            ).scalars().all()
+            analysis_ids = conn.execute(
+                select(analyses.c.id).where(
+                    analyses.c.discussion_id == discussion_id, analyses.c.change_seq.is_(None)
+                ).order_by(analyses.c.analyzed_at, analyses.c.id)
+            ).scalars().all()
+
+            seq = allocate_sequence(conn, discussion_id, len(message_ids) + len(analysis_ids))
+            if seq is None:
+                continue
+
+            if message_ids:
+                conn.execute(
+                    update(messages).where(messages.c.id == bindparam('row_id')).values(
+                        seq=func.coalesce(messages.c.seq, bindparam('number')),
+                        change_seq=bindparam('number')
+                    ),
+                    [{'row_id': row_id, 'number': seq + offset} for offset, row_id in enumerate(message_ids)]
+                )
+                seq += len(message_ids)
+            if analysis_ids:
+                conn.execute(
+                    update(analyses).where(analyses.c.id == bindparam('row_id')).values(
+                        change_seq=bindparam('number')
+                    ),
+                    [{'row_id': row_id, 'number': seq + offset} for offset, row_id in enumerate(analysis_ids)]
+                )
+            stamped += len(message_ids) + len(analysis_ids)
+
+    return stamped
+
+def register_sequencer(session):
+    """
+    Stamp change sequence numbers on every flush of the given session.
+
+    Args:
+        session: The scoped session to listen on
+    """
+    if not event.contains(session, 'before_flush', stamp_changes):
+        event.listen(session, 'before_flush', stamp_changes)
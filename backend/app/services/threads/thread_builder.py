@@ -0,0 +1,168 @@
+# app/services/threads/thread_builder.py
+from typing import Dict, Any, List, Optional
+
+from sqlalchemy import func, literal, select
+from sqlalchemy.orm import aliased
+
+from app import db
+from app.models.discussion import Message
+from app.models.user import User
+
+# Parent IDs per level query, well below SQLite's bound parameter limit
+PARENT_BATCH_SIZE = 500
+
+class ThreadBuilder:
+    """
+    Loads reply trees one level per query, paging each message's replies in
+    SQL, and assembles them into nested dictionaries in linear time.
+    """
+
+    def __init__(self, max_depth: int = 10, limit: int = 50):
+        """
+        Initialize the thread builder.
+
+        Args:
+            max_depth: Deepest reply level to load, relative to the anchor
+            limit: Maximum number of replies returned under each message
+        """
+        self.max_depth = max_depth
+        self.limit = limit
+
+    def discussion_thread(self, discussion_id: str, offset: int = 0) -> Dict[str, Any]:
+        """
+        Load a page of top-level messages in a discussion with their replies.
+
+        Args:
+            discussion_id: The discussion to load
+            offset: Number of top-level messages to skip
+
+        Returns:
+            Dictionary with the nested top-level messages
+        """
+        page = select(Message.id).where(
+            Message.discussion_id == discussion_id,
+            Message.parent_id.is_(None)
+        ).order_by(Message.created_at, Message.id).offset(offset).limit(self.limit)
+
+        rows = self._load(page)
+        roots = self._assemble(rows)
+
+        return {
+            "discussion_id": discussion_id,
+            "offset": offset,
+            "limit": self.limit,
+            "max_depth": self.max_depth,
+            "messages": roots
+        }
+
+    def message_thread(self, message_id: str, offset: int = 0) -> Optional[Dict[str, Any]]:
+        """
+        Load the subtree of replies under a single message.
+
+        Args:
+            message_id: The message at the root of the subtree
+            offset: Number of direct replies to skip, for paging through them
+
+        Returns:
+            The nested message, or None if it does not exist
+        """
+        anchor = select(Message.id).where(Message.id == message_id)
+        rows = self._load(anchor, child_offset=offset)
+        roots = self._assemble(rows, child_offset=offset)
+
+        return roots[0] if roots else None
+
+    def _load(self, anchor, child_offset: int = 0) -> List:
+        """
+        Fetch the anchor messages and, level by level, the page of replies
+        returned under each of them.
+
+        Replies are numbered per parent with ROW_NUMBER() and only the page
+        is fetched, so replies cut by the limit and their subtrees are never
+        read. Every row carries its total reply count.
+        """
+        rows = self._fetch(anchor, 0)
+        level = rows
+
+        for depth in range(1, self.max_depth + 1):
+            parent_ids = [row.id for row in level if row.reply_count]
+            if not parent_ids:
+                break
+
+            first = child_offset if depth == 1 else 0
+            level = []
+            for start in range(0, len(parent_ids), PARENT_BATCH_SIZE):
+                ranked = select(
+                    Message.id,
+                    func.row_number().over(
+                        partition_by=Message.parent_id,
+                        order_by=(Message.created_at, Message.id)
+                    ).label('position')
+                ).where(Message.parent_id.in_(parent_ids[start:start + PARENT_BATCH_SIZE])).subquery()
+                page = select(ranked.c.id).where(
+                    ranked.c.position > first,
+                    ranked.c.position <= first + self.limit
+                )
+                level.extend(self._fetch(page, depth))
+            rows.extend(level)
+
+        return rows
+
+    def _fetch(self, ids, depth: int) -> List:
+        replies = aliased(Message)
+        reply_count = select(func.count(replies.id)).where(
+            replies.parent_id == Message.id
+        ).scalar_subquery()
+
+        query = select(
+            Message.id,
+            Message.discussion_id,
+            Message.parent_id,
+            Message.user_id,
+            User.username,
+            Message.content,
+            Message.created_at,
+            Message.updated_at,
+            literal(depth).label('depth'),
+            reply_count.label('reply_count')
+        ).where(Message.id.in_(ids)).outerjoin(
+            User, User.id == Message.user_id
+        ).order_by(Message.created_at, Message.id)
+
+        return db.session.execute(query).all()
+
+    def _assemble(self, rows, child_offset: int = 0) -> List[Dict[str, Any]]:
+        """
+        Nest rows ordered by depth under their parents.
+
+        Messages with replies past the page, or below max_depth, report
+        has_more_replies so clients can page through them with the subtree
+        endpoint.
+        """
+        nodes = {}
+        roots = []
+
+        for row in rows:
+            shown = child_offset + self.limit if row.depth == 0 else self.limit
+            node = {
+                'id': row.id,
+                'discussion_id': row.discussion_id,
+                'parent_id': row.parent_id,
+                'user_id': row.user_id,
+                'username': row.username,
+                'content': row.content,
+                'created_at': row.created_at.isoformat(),
+                'updated_at': row.updated_at.isoformat(),
+                'depth': row.depth,
+                'reply_count': row.reply_count,
+                'has_more_replies': row.reply_count > shown or (row.depth >= self.max_depth and row.reply_count > 0),
+                'replies': []
+            }
+            nodes[row.id] = node
+
+            if row.depth == 0:
+                roots.append(node)
+            else:
+                nodes[row.parent_id]['replies'].append(node)
+
+        return roots
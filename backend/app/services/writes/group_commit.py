@@ -0,0 +1,204 @@
+# app/services/writes/group_commit.py
+import logging
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import Future
+from typing import Dict, Any, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+class GroupCommitWriter:
+    """
+    Coalesces message inserts from concurrent requests into shared transactions.
+
+    Requests hand their row to `submit` and block on the returned future. A
+    single writer thread waits up to `window` seconds after the first row
+    arrives for others to join, then inserts the whole batch, reserves change
+    sequence numbers per discussion and commits once. Every caller is
+    acknowledged only after that commit, so one fsync covers the batch.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.window = 0.005
+        self.max_batch = 200
+        self._pending = []
+        self._condition = threading.Condition()
+        self._worker = None
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """
+        Bind the writer to an application.
+
+        Args:
+            app: The Flask application whose context the writer runs in
+        """
+        self.app = app
+        self.window = app.config['GROUP_COMMIT_WINDOW_MS'] / 1000.0
+        self.max_batch = app.config['GROUP_COMMIT_MAX_BATCH']
+        app.extensions['group_commit'] = self
+
+    def submit(self, mapping: Dict[str, Any]) -> Future:
+        """
+        Queue a message row for the next group commit.
+
+        Args:
+            mapping: Column values for a new message, including its id and created_at
+
+        Returns:
+            Future resolving to the message's to_dict() form once committed
+        """
+        from app.services.database.sharding import current_shard
+
+        future = Future()
+        # The writer thread has no request context; this shard is only used
+        # when the directory can't place the discussion at commit time
+        mapping['_shard'] = current_shard()
+        with self._condition:
+            self._pending.append((mapping, future))
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name='group-commit', daemon=True)
+                self._worker.start()
+            self._condition.notify()
+        return future
+
+    def _take_batch(self) -> List[Tuple[Dict[str, Any], Future]]:
+        with self._condition:
+            while not self._pending:
+                self._condition.wait()
+
+            # Give concurrent requests a short window to join the batch
+            deadline = time.monotonic() + self.window
+            while len(self._pending) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+
+            batch = self._pending[:self.max_batch]
+            del self._pending[:self.max_batch]
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            with self.app.app_context():
+                try:
+                    self._commit(batch)
+                except Exception:
+                    logger.exception("Group commit of %d messages failed", len(batch))
+                    for _, future in batch:
+                        if not future.done():
+                            future.set_exception(RuntimeError("Message could not be saved"))
+
+    def _commit(self, batch: List[Tuple[Dict[str, Any], Future]]):
+        from app.services.database.sharding import WorkspaceMoving
+
+        # Route by the directory as it is now, not as it was when the request
+        # came in, so a row never lands on a shard a workspace has just left
+        by_shard = defaultdict(list)
+        shards = {}
+        for item in batch:
+            discussion_id = item[0]['discussion_id']
+            if discussion_id not in shards:
+                try:
+                    shards[discussion_id] = self._write_shard(item[0])
+                except WorkspaceMoving as e:
+                    shards[discussion_id] = e
+            if isinstance(shards[discussion_id], WorkspaceMoving):
+                item[1].set_exception(shards[discussion_id])
+                continue
+            by_shard[shards[discussion_id]].append(item)
+
+        # One transaction per shard; batches rarely span more than one
+        for shard, items in by_shard.items():
+            try:
+                rows = self._insert(shard, items)
+            except Exception:
+                if len(items) == 1:
+                    logger.exception("Group commit of one message failed")
+                    items[0][1].set_exception(RuntimeError("Message could not be saved"))
+                    continue
+                # Retry one by one so a single bad row only fails its own request
+                logger.warning("Group commit of %d messages failed, retrying individually", len(items))
+                committed, rows = [], []
+                for item in items:
+                    try:
+                        rows.extend(self._insert(shard, [item]))
+                        committed.append(item)
+                    except Exception as e:
+                        item[1].set_exception(e)
+                items = committed
+
+            if items:
+                self._acknowledge(items, rows)
+
+    def _write_shard(self, mapping: Dict[str, Any]) -> str:
+        from app import shard_router
+        from app.services.database.sharding import DEFAULT_SHARD
+
+        if not shard_router.enabled:
+            return DEFAULT_SHARD
+        workspace_id = shard_router.workspace_for('discussion_id', mapping['discussion_id'])
+        if workspace_id is None:
+            return mapping.get('_shard') or DEFAULT_SHARD
+        return shard_router.write_shard(workspace_id)
+
+    def _insert(self, shard: str, items: List[Tuple[Dict[str, Any], Future]]) -> List[Dict[str, Any]]:
+        from app import shard_router
+        from app.models.discussion import Message
+        from app.services.sync.sequencer import allocate_sequence
+
+        # Copy the rows so a retry starts from the caller's untouched mapping
+        rows = [{key: value for key, value in mapping.items() if key != '_shard'} for mapping, _ in items]
+        by_discussion = defaultdict(list)
+        for row in rows:
+            by_discussion[row['discussion_id']].append(row)
+
+        with shard_router.engine(shard).begin() as conn:
+            for discussion_id, discussion_rows in by_discussion.items():
+                message_at = max(row['created_at'] for row in discussion_rows)
+                seq = allocate_sequence(conn, discussion_id, len(discussion_rows), message_at)
+                for offset, row in enumerate(discussion_rows):
+                    row['seq'] = row['change_seq'] = seq + offset if seq is not None else None
+
+            conn.execute(Message.__table__.insert(), rows)
+
+        return rows
+
+    def _acknowledge(self, items: List[Tuple[Dict[str, Any], Future]], rows: List[Dict[str, Any]]):
+        from app import db, event_hub
+        from app.models.user import User
+        from app.services.events.event_hub import Event
+
+        # The rows are committed; a failed lookup only costs the usernames
+        try:
+            with db.engine.connect() as conn:
+                usernames = dict(conn.execute(
+                    db.select(User.id, User.username).where(User.id.in_({row['user_id'] for row in rows}))
+                ).all())
+        except Exception:
+            logger.exception("Failed to look up authors of %d committed messages", len(rows))
+            usernames = {}
+
+        results = [{
+            'id': row['id'],
+            'discussion_id': row['discussion_id'],
+            'parent_id': row['parent_id'],
+            'user_id': row['user_id'],
+            'username': usernames.get(row['user_id']),
+            'content': row['content'],
+            'created_at': row['created_at'].isoformat(),
+            'updated_at': row['updated_at'].isoformat()
+        } for row in rows]
+
+        for (_, future), result in zip(items, results):
+            future.set_result(result)
+
+        event_hub.publish_many([
+            Event(result['discussion_id'], 'message.created', result) for result in results
+        ])
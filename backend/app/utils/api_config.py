@@ -1,4 +1,5 @@
-from flask import jsonify
+import time
+from flask import current_app, g, jsonify
 from functools import wraps
 from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
 
@@ -18,3 +19,70 @@ def auth_required():
                 return error_response("Authentication required", 401)
         return decorator
     return wrapper
+
+def rate_limited(endpoint_class):
+    """
+    Apply the per-user limit for an endpoint class and shed load when the
+    worker is saturated. Place below @jwt_required() so the identity is known
+    before any database work happens.
+    """
+    def wrapper(fn):
+        @wraps(fn)
+        def decorator(*args, **kwargs):
+            if not current_app.config['RATE_LIMIT_ENABLED']:
+                return fn(*args, **kwargs)
+            
+            from app import rate_limiter
+            rejection = rate_limiter.check(get_jwt_identity(), endpoint_class)
+            if rejection is not None:
+                status_code, retry_after, message = rejection
+                response = error_response(message, status_code)
+                response.headers['Retry-After'] = str(retry_after)
+                return response
+            
+            rate_limiter.monitor.started()
+            started = time.perf_counter()
+            finish = lambda: rate_limiter.monitor.finished(time.perf_counter() - started)
+            try:
+                response = current_app.make_response(fn(*args, **kwargs))
+            except Exception:
+                finish()
+                raise
+            
+            # A streamed body (e.g. an export) is still being produced after
+            # the view returns, so count the request until it has been sent
+            if response.is_streamed:
+                response.call_on_close(finish)
+            else:
+                finish()
+            return response
+        return decorator
+    return wrapper
+
+def restores_archives():
+    """
+    Restore the workspace's archived discussions before this view reads
+    messages across the workspace. Place below @rate_limited so throttled
+    requests never restore anything.
+    """
+    def wrapper(fn):
+        @wraps(fn)
+        def decorator(*args, **kwargs):
+            from app import archiver
+            archiver.restore_workspace(kwargs['workspace_id'])
+            return fn(*args, **kwargs)
+        return decorator
+    return wrapper
+
+def replica_reads():
+    """
+    Let this view's queries use the read replica until it writes anything.
+    Only for endpoints that tolerate replication lag.
+    """
+    def wrapper(fn):
+        @wraps(fn)
+        def decorator(*args, **kwargs):
+            g.replica_reads = True
+            return fn(*args, **kwargs)
+        return decorator
+    return wrapper
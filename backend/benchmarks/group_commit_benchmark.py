@@ -0,0 +1,102 @@
+"""
+Message write throughput at several concurrency levels.
+
+Creates a throwaway user, workspace and discussion, then posts messages from
+1, 8, 32 and 128 concurrent clients and reports messages per second and
+latency percentiles for each level.
+
+Usage (from the backend directory, against a running server):
+    RATE_LIMIT_ENABLED=false GROUP_COMMIT_ENABLED=false python main.py
+    python benchmarks/group_commit_benchmark.py http://127.0.0.1:5000
+
+    RATE_LIMIT_ENABLED=false GROUP_COMMIT_ENABLED=true python main.py
+    python benchmarks/group_commit_benchmark.py http://127.0.0.1:5000
+
+Rate limiting must be off, otherwise the per-user write limit is what gets measured.
+"""
+import argparse
+import json
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+
+from load_test import percentile
+
+def request_json(url, payload=None, token=None):
+    headers = {'Content-Type': 'application/json'}
+    if token:
+        headers['Authorization'] = f'Bearer {token}'
+    data = json.dumps(payload).encode('utf-8') if payload is not None else None
+    request = urllib.request.Request(url, data=data, headers=headers, method='POST' if data else 'GET')
+    try:
+        with urllib.request.urlopen(request, timeout=60) as response:
+            return response.status, json.loads(response.read() or b'null')
+    except urllib.error.HTTPError as e:
+        return e.code, None
+
+def set_up(base_url):
+    username = f'bench-{uuid.uuid4().hex[:12]}'
+    credentials = {'username': username, 'password': 'benchmark-password'}
+    request_json(f'{base_url}/api/users/register', dict(credentials, email=f'{username}@example.com'))
+    _, body = request_json(f'{base_url}/api/users/login', credentials)
+    token = body['token']
+
+    _, workspace = request_json(f'{base_url}/api/workspaces', {'name': 'Write benchmark'}, token)
+    _, discussion = request_json(
+        f"{base_url}/api/workspaces/{workspace['id']}/discussions", {'title': 'Write benchmark'}, token
+    )
+    return token, f"{base_url}/api/discussions/{discussion['id']}/messages"
+
+def worker(url, token, count, results, lock):
+    for i in range(count):
+        started = time.perf_counter()
+        try:
+            status, _ = request_json(url, {'content': f'benchmark message {i}'}, token)
+        except (urllib.error.URLError, OSError):
+            status = None
+        elapsed = time.perf_counter() - started
+        with lock:
+            results.append((status, elapsed))
+
+def run_level(url, token, total, concurrency):
+    per_worker = max(total // concurrency, 1)
+    results, lock = [], threading.Lock()
+    threads = [
+        threading.Thread(target=worker, args=(url, token, per_worker, results, lock))
+        for _ in range(concurrency)
+    ]
+
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    ok = sorted(latency for status, latency in results if status == 201)
+    failed = len(results) - len(ok)
+    line = f"concurrency={concurrency:<4} messages={len(ok):<5} failed={failed:<4} throughput={len(ok) / elapsed:8.1f} msg/s"
+    if ok:
+        line += (
+            f"  mean {statistics.mean(ok) * 1000:.1f}  "
+            f"p50 {percentile(ok, 0.50) * 1000:.1f}  "
+            f"p99 {percentile(ok, 0.99) * 1000:.1f} ms"
+        )
+    print(line)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('base_url', help='Server root, e.g. http://127.0.0.1:5000')
+    parser.add_argument('--messages', type=int, default=512, help='Messages posted per concurrency level')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32, 128], help='Concurrency levels')
+    args = parser.parse_args()
+
+    token, url = set_up(args.base_url.rstrip('/'))
+    for concurrency in args.concurrency:
+        run_level(url, token, args.messages, concurrency)
+
+if __name__ == '__main__':
+    main()
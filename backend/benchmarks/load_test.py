@@ -0,0 +1,78 @@
+"""
+Minimal closed-loop HTTP load generator for comparing serving setups.
+
+Usage (from the backend directory):
+    python benchmarks/load_test.py http://127.0.0.1:5000/api/health/ready
+    python benchmarks/load_test.py URL --requests 2000 --concurrency 32 \\
+        --header "Authorization: Bearer <token>"
+
+Run it once against the dev server (`python main.py` or `flask run`) and once
+against gunicorn (`gunicorn -c gunicorn.conf.py wsgi:app`) with the same
+arguments to compare throughput and tail latency.
+"""
+import argparse
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+
+def worker(url, headers, count, latencies, errors, lock):
+    for _ in range(count):
+        request = urllib.request.Request(url, headers=headers)
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                response.read()
+            ok = True
+        except (urllib.error.URLError, OSError):
+            ok = False
+        elapsed = time.perf_counter() - started
+        with lock:
+            if ok:
+                latencies.append(elapsed)
+            else:
+                errors.append(elapsed)
+
+def percentile(sorted_values, fraction):
+    index = min(int(len(sorted_values) * fraction), len(sorted_values) - 1)
+    return sorted_values[index]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('url')
+    parser.add_argument('--requests', type=int, default=1000, help='Total number of requests')
+    parser.add_argument('--concurrency', type=int, default=16, help='Number of concurrent clients')
+    parser.add_argument('--header', action='append', default=[], help='Extra header, e.g. "Authorization: Bearer x"')
+    args = parser.parse_args()
+
+    headers = dict(h.split(':', 1) for h in args.header)
+    headers = {k.strip(): v.strip() for k, v in headers.items()}
+
+    per_worker = args.requests // args.concurrency
+    latencies, errors, lock = [], [], threading.Lock()
+    threads = [
+        threading.Thread(target=worker, args=(args.url, headers, per_worker, latencies, errors, lock))
+        for _ in range(args.concurrency)
+    ]
+
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    print(f"requests={len(latencies) + len(errors)} concurrency={args.concurrency} errors={len(errors)}")
+    print(f"throughput: {len(latencies) / elapsed:.1f} req/s")
+    if latencies:
+        print(
+            f"latency ms: mean {statistics.mean(latencies) * 1000:.1f}  "
+            f"p50 {percentile(latencies, 0.50) * 1000:.1f}  "
+            f"p95 {percentile(latencies, 0.95) * 1000:.1f}  "
+            f"p99 {percentile(latencies, 0.99) * 1000:.1f}"
+        )
+
+if __name__ == '__main__':
+    main()
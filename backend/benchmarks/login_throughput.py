@@ -0,0 +1,96 @@
+"""
+Login throughput under concurrency.
+
+Registers a throwaway user, then hammers POST /api/users/login from many
+concurrent clients and reports successful logins per second, latency
+percentiles and how many attempts were shed with 503.
+
+Usage (from the backend directory, against a running server):
+    python benchmarks/login_throughput.py http://127.0.0.1:5000
+    python benchmarks/login_throughput.py URL --requests 500 --concurrency 64
+
+Compare runs with different PASSWORD_HASH_METHOD, PASSWORD_HASH_WORKERS and
+PASSWORD_HASH_QUEUE_SIZE settings, or against a server started from the
+previous commit, using the same arguments.
+"""
+import argparse
+import json
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+
+from load_test import percentile
+
+def post_json(url, payload):
+    request = urllib.request.Request(
+        url,
+        data=json.dumps(payload).encode('utf-8'),
+        headers={'Content-Type': 'application/json'},
+        method='POST'
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=60) as response:
+            response.read()
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+def worker(url, credentials, count, results, lock):
+    for _ in range(count):
+        started = time.perf_counter()
+        try:
+            status = post_json(url, credentials)
+        except (urllib.error.URLError, OSError):
+            status = None
+        elapsed = time.perf_counter() - started
+        with lock:
+            results.append((status, elapsed))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('base_url', help='Server root, e.g. http://127.0.0.1:5000')
+    parser.add_argument('--requests', type=int, default=200, help='Total number of login attempts')
+    parser.add_argument('--concurrency', type=int, default=32, help='Number of concurrent clients')
+    args = parser.parse_args()
+
+    base_url = args.base_url.rstrip('/')
+    username = f'bench-{uuid.uuid4().hex[:12]}'
+    credentials = {'username': username, 'password': 'benchmark-password'}
+
+    status = post_json(f'{base_url}/api/users/register', dict(credentials, email=f'{username}@example.com'))
+    if status != 201:
+        raise SystemExit(f"Registering the benchmark user failed with HTTP {status}")
+
+    per_worker = args.requests // args.concurrency
+    results, lock = [], threading.Lock()
+    threads = [
+        threading.Thread(target=worker, args=(f'{base_url}/api/users/login', credentials, per_worker, results, lock))
+        for _ in range(args.concurrency)
+    ]
+
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    ok = sorted(latency for status, latency in results if status == 200)
+    shed = sum(1 for status, _ in results if status == 503)
+    failed = len(results) - len(ok) - shed
+
+    print(f"attempts={len(results)} concurrency={args.concurrency} ok={len(ok)} shed={shed} failed={failed}")
+    print(f"throughput: {len(ok) / elapsed:.1f} logins/s")
+    if ok:
+        print(
+            f"latency ms: mean {statistics.mean(ok) * 1000:.1f}  "
+            f"p50 {percentile(ok, 0.50) * 1000:.1f}  "
+            f"p95 {percentile(ok, 0.95) * 1000:.1f}  "
+            f"p99 {percentile(ok, 0.99) * 1000:.1f}"
+        )
+
+if __name__ == '__main__':
+    main()
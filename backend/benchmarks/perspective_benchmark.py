@@ -0,0 +1,109 @@
+"""
+Compare the keyword and hashing perspective backends.
+
+Reports messages per second at each batch size for both backends, and the
+cold load time and added resident memory of the hashing model (including
+the scikit-learn import), measured in a fresh interpreter that has already
+imported the app, the way a gunicorn worker would load it. Without
+--model, a model is first trained on synthetic messages labelled by the
+keyword analyzer.
+
+Usage (from the backend directory):
+    python benchmarks/perspective_benchmark.py --batch-sizes 1000,10000
+    python benchmarks/perspective_benchmark.py --model instance/perspective_model.npz
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+sys.path.insert(0, BACKEND_DIR)
+
+from app.services.clustering.hashing_perspective_analyzer import HashingPerspectiveAnalyzer, weak_labels
+from app.services.clustering.perspective_analyzer import PerspectiveAnalyzer
+
+WORDS = (
+    "the data shows evidence from research and a study we feel worried excited and concerned about it "
+    "the logic is therefore a conclusion from the premise my gut instinct and hunch say I believe "
+    "budget team should plan cost risk option because I think maybe next quarter we could ship"
+).split()
+
+# Current RSS from /proc, since ru_maxrss carries over the benchmark's own peak through fork.
+# The app package is imported first, as a worker would have it already.
+LOAD_SNIPPET = """
+import json, time
+import app
+def rss_kb():
+    with open('/proc/self/status') as f:
+        return next(int(line.split()[1]) for line in f if line.startswith('VmRSS:'))
+before = rss_kb()
+started = time.perf_counter()
+from app.services.clustering.hashing_perspective_analyzer import HashingPerspectiveAnalyzer
+analyzer = HashingPerspectiveAnalyzer.load({path!r})
+analyzer.analyze_perspectives(['warm up'])
+print(json.dumps({{
+    'load_ms': (time.perf_counter() - started) * 1000,
+    'added_rss_mb': (rss_kb() - before) / 1024
+}}))
+"""
+
+def synthetic_messages(count, seed=1):
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 60))) for _ in range(count)]
+
+def throughput(analyze, texts, batch_size, rounds=3):
+    best = None
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for start in range(0, len(texts), batch_size):
+            analyze(texts[start:start + batch_size])
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return len(texts) / best
+
+def cold_load(path):
+    output = subprocess.run(
+        [sys.executable, '-c', LOAD_SNIPPET.format(path=path)],
+        cwd=BACKEND_DIR,
+        check=True,
+        capture_output=True,
+        text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', default=None, help='Model file to benchmark instead of training one')
+    parser.add_argument('--messages', type=int, default=20000, help='Synthetic messages to score')
+    parser.add_argument('--batch-sizes', default='1,100,1000,10000', help='Comma-separated batch sizes')
+    args = parser.parse_args()
+
+    texts = synthetic_messages(args.messages)
+    path = args.model
+    if path is None:
+        path = os.path.join(tempfile.mkdtemp(), 'perspective_model.npz')
+        HashingPerspectiveAnalyzer.train(*weak_labels(synthetic_messages(20000, seed=2))).save(path)
+
+    keyword = PerspectiveAnalyzer()
+    hashing = HashingPerspectiveAnalyzer.load(path)
+
+    results = {'model_file_mb': round(os.path.getsize(path) / 2 ** 20, 2), 'batches': []}
+    for batch_size in (int(size) for size in args.batch_sizes.split(',')):
+        results['batches'].append({
+            'batch_size': batch_size,
+            'keyword_per_second': round(throughput(keyword.analyze_perspectives, texts, batch_size)),
+            'hashing_per_second': round(throughput(hashing.analyze_perspectives, texts, batch_size))
+        })
+
+    loads = [cold_load(path) for _ in range(3)]
+    results['cold_load_ms'] = round(min(load['load_ms'] for load in loads), 1)
+    results['added_rss_mb'] = round(min(load['added_rss_mb'] for load in loads), 1)
+    print(json.dumps(results, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+Measure application cold-start time and per-worker memory.
+
+Each run starts a fresh interpreter, the way a gunicorn worker without
+--preload would, imports the app, calls create_app() and reports wall time,
+peak RSS and which heavy libraries ended up imported.
+
+Usage (from the backend directory):
+    python benchmarks/startup_benchmark.py --config testing --runs 5
+    python benchmarks/startup_benchmark.py --config testing --warm-up
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+
+HEAVY_MODULES = ['numpy', 'pandas', 'sklearn', 'spacy', 'nltk']
+
+WORKER_SNIPPET = """
+import json, resource, sys, time
+started = time.perf_counter()
+from app import create_app, analysis_queue
+app = create_app({config!r})
+created = time.perf_counter()
+if {warm_up!r}:
+    analysis_queue.warm_up()
+finished = time.perf_counter()
+print(json.dumps({{
+    'create_app_ms': (created - started) * 1000,
+    'warm_up_ms': (finished - created) * 1000,
+    'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    'heavy_modules': [name for name in {heavy!r} if name in sys.modules]
+}}))
+"""
+
+def run_once(config_name, warm_up):
+    snippet = WORKER_SNIPPET.format(config=config_name, warm_up=warm_up, heavy=HEAVY_MODULES)
+    output = subprocess.run(
+        [sys.executable, '-c', snippet],
+        cwd=BACKEND_DIR,
+        check=True,
+        capture_output=True,
+        text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--config', default='testing', help='Config name passed to create_app')
+    parser.add_argument('--runs', type=int, default=5, help='Number of fresh interpreters to start')
+    parser.add_argument('--warm-up', action='store_true', help='Also build the analyzers, as a preloading master would')
+    args = parser.parse_args()
+
+    results = [run_once(args.config, args.warm_up) for _ in range(args.runs)]
+
+    def summary(key):
+        values = [r[key] for r in results]
+        return f"median {statistics.median(values):8.1f}   min {min(values):8.1f}   max {max(values):8.1f}"
+
+    print(f"config={args.config} runs={args.runs} warm_up={args.warm_up}")
+    print(f"create_app (ms): {summary('create_app_ms')}")
+    print(f"warm-up    (ms): {summary('warm_up_ms')}")
+    print(f"max RSS    (MB): {summary('max_rss_mb')}")
+    print(f"heavy modules imported: {', '.join(results[-1]['heavy_modules']) or 'none'}")
+
+if __name__ == '__main__':
+    main()
@@ -12,8 +12,95 @@ class Config:
     TESTING = False
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL', 'sqlite:///app.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_pre_ping': True,
+        'pool_recycle': 1800
+    }
+    # Read-only endpoints use this bind when REPLICA_DATABASE_URL is set
+    SQLALCHEMY_BINDS = {'replica': os.environ['REPLICA_DATABASE_URL']} if os.environ.get('REPLICA_DATABASE_URL') else {}
+    # Workspace shards as name -> URL, e.g. SHARD_DATABASE_URLS="a=sqlite:///shard_a.db,b=sqlite:///shard_b.db"
+    SHARDS = dict(
+        entry.split('=', 1) for entry in os.environ.get('SHARD_DATABASE_URLS', '').split(',') if entry
+    )
+    # Applied to every new SQLite connection
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 5000
+    }
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY', '8b23b192d3d02ac199293c98d1d7f9a456110fa5daa87bd233f9e003edbbf8635945e3b8160aefbeb507e61d3d364141bb627eadc3eac448e954989aba6c108c8ff5cf3ee8566b6eae070f40239df46245b6437c86311b51242e681ef851399700e33e7fbb26027243d472e682d9196a5d52984572c79dfed75e7b88ced92c5c89e9138bbb7928f4d68bd94fb0dc1dfca0ec07efd2d4c9f392200d7d7f3b810c9999aa7f36471e33018ac7b433f164674547c5a5b1c87936fceb9e7bffaf33006c9b821c470c31ff371698386fec3db4577378dfdc85e28096adbcf7ac1db57f176916b208fed451b5e106a0cf03aea61c07abcbd952792f44641e3c9b348945')
     JWT_ACCESS_TOKEN_EXPIRES = 60 * 60 * 24  # 1 day
+    ANALYSIS_BATCH_SIZE = 500
+    DISCUSSION_BIAS_WINDOW = 20  # Recent messages considered for discussion-level biases like Groupthink
+    # 'keyword', or 'hashing' for the linear model trained with `flask train-perspective-model`
+    PERSPECTIVE_BACKEND = os.environ.get('PERSPECTIVE_BACKEND', 'keyword')
+    PERSPECTIVE_MODEL_PATH = os.environ.get('PERSPECTIVE_MODEL_PATH', os.path.join(APP_DIR, 'instance', 'perspective_model.npz'))
+    IMPORT_BATCH_SIZE = 1000
+    EXPORT_CHUNK_SIZE = 1000
+    EVENT_HUB_BACKEND = os.environ.get('EVENT_HUB_BACKEND', 'memory')  # 'memory' or 'database'
+    EVENT_POLL_INTERVAL = 0.5
+    EVENT_GAP_TIMEOUT = 5  # Seconds the database relay waits for an event ID committed out of order
+    EVENT_TICKET_TTL = 60  # Seconds an event stream ticket can be used to connect
+    EVENT_RETENTION_SECONDS = 300
+    EVENT_HEARTBEAT_INTERVAL = 15
+    EVENT_SUBSCRIBER_QUEUE_SIZE = 100
+    DOCUMENT_SNAPSHOT_INTERVAL = 10
+    AUTO_CREATE_TABLES = True
+    PRELOAD_ANALYZERS = False
+    CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'memory')  # 'memory' or 'sqlite'
+    CACHE_PATH = os.environ.get('CACHE_PATH', os.path.join(APP_DIR, 'instance', 'cache.sqlite'))
+    CACHE_MAX_ENTRIES = 10000
+    CACHE_DEFAULT_TTL = 300
+    RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+    RATE_LIMIT_BACKEND = os.environ.get('RATE_LIMIT_BACKEND', 'memory')  # 'memory' or 'sqlite'
+    RATE_LIMIT_PATH = os.environ.get('RATE_LIMIT_PATH', os.path.join(APP_DIR, 'instance', 'ratelimit.sqlite'))
+    # Endpoint class -> (requests, per seconds), per user
+    RATE_LIMITS = {
+        'analyze': (10, 60),
+        'write': (60, 60),
+        'search': (30, 60),
+        'export': (5, 60),
+        'analytics': (30, 60)
+    }
+    # Shed guarded requests with 503 past any of these, per worker.
+    # The in-flight limit defaults to the worker's concurrency (gunicorn threads or connections)
+    LOAD_SHED_MAX_IN_FLIGHT = int(os.environ['LOAD_SHED_MAX_IN_FLIGHT']) if os.environ.get('LOAD_SHED_MAX_IN_FLIGHT') else None
+    LOAD_SHED_LATENCY_MS = 2000
+    LOAD_SHED_QUEUE_DEPTH = 50000
+    # Any werkzeug method string, e.g. 'scrypt' or 'pbkdf2:sha256:600000'
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt')
+    PASSWORD_HASH_WORKERS = None  # defaults to the CPU count
+    PASSWORD_HASH_QUEUE_SIZE = 32
+    PASSWORD_HASH_TIMEOUT = 10
+    # Coalesce concurrent message inserts into one transaction per window
+    GROUP_COMMIT_ENABLED = os.environ.get('GROUP_COMMIT_ENABLED', 'false').lower() == 'true'
+    GROUP_COMMIT_WINDOW_MS = 5
+    GROUP_COMMIT_MAX_BATCH = 200
+    GROUP_COMMIT_TIMEOUT = 10
+    # Discussions without new messages for this long are archived by `flask archive-discussions`
+    ARCHIVE_AFTER_DAYS = 90
+    ARCHIVE_COMPRESSION_LEVEL = 6  # zlib level for archived messages
+    # Workspace analytics frames are kept in memory per worker
+    ANALYTICS_CHUNK_SIZE = 20000  # Analyses read per round trip when loading
+    ANALYTICS_MAX_WORKSPACES = 32
+    ANALYTICS_MAX_RESULTS = 64  # Computed series kept per workspace; since/until make the keys unbounded
+    # Opinion map: refit the 2D projection when new points leave this much more variance unexplained
+    OPINION_MAP_DRIFT_THRESHOLD = 0.1
+    OPINION_MAP_REFIT_GROWTH = 2.0  # ...or when the discussion has grown this many times since the fit
+    OPINION_MAP_MIN_POINTS = 3  # Points needed to fit at all
+    OPINION_MAP_DRIFT_MIN_POINTS = 10  # New points needed before drift is judged
+    OPINION_MAP_MAX_DISCUSSIONS = 256  # Projections kept in memory per worker
+    # Decision quality metrics: fold in new activity of busy discussions at most this often, in seconds
+    DECISION_METRICS_FLUSH_INTERVAL = 1.0
+    DECISION_METRICS_CHUNK_SIZE = 5000  # Rows read per round trip when folding in history
+    # Bias interventions fire when a bias's rolling confidence (EWMA over analyses) stays above the threshold
+    INTERVENTION_ALPHA = 0.3  # Weight of the newest analysis in the rolling confidence
+    INTERVENTION_THRESHOLD = 0.15
+    INTERVENTION_RESET_THRESHOLD = 0.05  # Must drop below this before the bias can fire again
+    INTERVENTION_DEBOUNCE = 2  # Consecutive analyses at or above the threshold
+    INTERVENTION_COOLDOWN_SECONDS = 900  # Per discussion and bias
+    INTERVENTION_DISCUSSION_COOLDOWN_SECONDS = 120  # Per discussion, across biases
+    INTERVENTION_FLUSH_INTERVAL = 0.5  # Fired interventions are written in batches this often
 
 class DevelopmentConfig(Config):
     """Development configuration."""
@@ -26,10 +113,28 @@ class TestingConfig(Config):
     DEBUG = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///testing.db'
     JWT_ACCESS_TOKEN_EXPIRES = 5
+    RATE_LIMIT_ENABLED = False
+    # Cheap hashes keep test setup fast
+    PASSWORD_HASH_METHOD = 'pbkdf2:sha256:1000'
 
 class ProductionConfig(Config):
     """Production configuration."""
+    # Tables are created once with `flask init-db`, not by every worker on boot
+    AUTO_CREATE_TABLES = os.environ.get('AUTO_CREATE_TABLES', 'false').lower() == 'true'
+    PRELOAD_ANALYZERS = True
+    # Share cached reads between gunicorn workers on the same host
+    CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'sqlite')
+    RATE_LIMIT_BACKEND = os.environ.get('RATE_LIMIT_BACKEND', 'sqlite')
+    # gunicorn runs several workers, and an event stream must see events published by any of them
+    EVENT_HUB_BACKEND = os.environ.get('EVENT_HUB_BACKEND', 'database')
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL')
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_pre_ping': True,
+        'pool_recycle': 1800,
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 10)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 20)),
+        'pool_timeout': 10
+    }
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY')
     SECRET_KEY = os.environ.get('SECRET_KEY')
 
@@ -0,0 +1,68 @@
+# gunicorn.conf.py
+import gc
+import multiprocessing
+import os
+
+def _available_cores():
+    # Respect CPU affinity / container limits where the platform exposes them
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return multiprocessing.cpu_count()
+
+cores = _available_cores()
+
+bind = os.environ.get('GUNICORN_BIND', f"0.0.0.0:{os.environ.get('PORT', '5000')}")
+
+# gthread runs each request on one of the worker's `threads` threads, and an
+# open event stream (/discussions/<id>/events) holds its thread for as long as
+# the client stays connected: with the default 4 threads, 4 open streams stop a
+# worker from serving anything else. Deployments with live clients should set
+# GUNICORN_WORKER_CLASS=gevent (pip install gevent), which holds thousands of
+# idle streams per worker.
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+
+if worker_class == 'sync':
+    workers = cores * 2 + 1
+    threads = 1
+elif worker_class in ('gevent', 'eventlet'):
+    workers = cores
+    threads = 1
+    worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 1000))
+else:
+    workers = cores + 1
+    threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+workers = int(os.environ.get('WEB_CONCURRENCY', workers))
+
+# Load the app and analyzers once in the master and fork workers from it
+preload_app = True
+
+# Recycle workers periodically so slow leaks and fragmentation can't accumulate
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 200))
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
+graceful_timeout = 30
+keepalive = 5
+
+accesslog = '-'
+errorlog = '-'
+
+def pre_fork(server, worker):
+    # Move everything loaded so far out of the collector's reach so its
+    # bookkeeping doesn't touch (and un-share) those pages in the children
+    gc.freeze()
+
+def post_fork(server, worker):
+    # Connections opened by the master must not be shared between processes
+    from app import db, rate_limiter
+    with server.app.wsgi().app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+    
+    # Shed load relative to what this worker can actually run at once
+    if server.cfg.worker_class_str in ('gevent', 'eventlet'):
+        rate_limiter.set_worker_concurrency(server.cfg.worker_connections)
+    else:
+        rate_limiter.set_worker_concurrency(server.cfg.threads)
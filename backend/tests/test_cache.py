@@ -0,0 +1,24 @@
+import threading
+
+from app.services.cache.cache import CacheStats, MemoryBackend, SQLiteBackend
+
+def increment_concurrently(backend, threads=8, per_thread=50):
+    def work():
+        for _ in range(per_thread):
+            backend.update('counters', 'hits', lambda value: (value or 0) + 1, None)
+
+    workers = [threading.Thread(target=work) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+def test_concurrent_updates_are_not_lost_in_memory():
+    backend = MemoryBackend(100, CacheStats())
+    increment_concurrently(backend)
+    assert backend.get('counters', 'hits') == 400
+
+def test_concurrent_updates_are_not_lost_in_sqlite(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / 'cache.sqlite'), 100, CacheStats())
+    increment_concurrently(backend)
+    assert backend.get('counters', 'hits') == 400
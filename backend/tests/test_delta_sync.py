@@ -0,0 +1,48 @@
+import pytest
+from sqlalchemy import update
+
+from app import create_app, db, init_db
+from app.models.discussion import Discussion, Message
+from app.models.user import User
+from app.models.workspace import Workspace
+from app.services.sync.delta_sync import DeltaSync
+from config import TestingConfig
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'sync.db'}")
+    app = create_app('testing')
+    with app.app_context():
+        yield app
+        db.session.remove()
+
+def test_full_sync_pages_through_legacy_rows(app):
+    user = User('alice', 'alice@example.com', 'password')
+    workspace = Workspace('Team', created_by=user.id)
+    discussion = Discussion(workspace.id, 'Roadmap', created_by=user.id)
+    db.session.add_all([user, workspace, discussion])
+    db.session.commit()
+
+    db.session.add_all([Message(discussion.id, user.id, f"message {i}") for i in range(7)])
+    db.session.commit()
+
+    # Simulate rows written before change sequencing existed
+    db.session.execute(update(Message.__table__).values(seq=None, change_seq=None))
+    db.session.execute(update(Discussion.__table__).values(last_seq=0))
+    db.session.commit()
+
+    init_db()
+    db.session.expire_all()
+
+    seen = []
+    cursor = 0
+    for _ in range(10):
+        page = DeltaSync(db.session.get(Discussion, discussion.id), limit=3).changes_since(cursor)
+        assert page['cursor'] > cursor or not page['has_more']
+        seen.extend(message['id'] for message in page['messages'])
+        cursor = page['cursor']
+        if not page['has_more']:
+            break
+
+    assert not page['has_more']
+    assert sorted(seen) == sorted(row.id for row in Message.query.all())
@@ -0,0 +1,51 @@
+import pytest
+from flask_jwt_extended import create_access_token
+
+from app import archiver, create_app, db
+from app.models.discussion import Discussion, Message
+from app.models.user import User
+from app.models.workspace import Workspace, WorkspaceMember
+from config import TestingConfig
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'archive.db'}")
+    app = create_app('testing')
+    with app.app_context():
+        yield app
+        db.session.remove()
+
+def test_workspace_search_restores_archived_discussions_for_members(app):
+    member = User('alice', 'alice@example.com', 'password')
+    outsider = User('mallory', 'mallory@example.com', 'password')
+    workspace = Workspace('Team', created_by=member.id)
+    discussion = Discussion(workspace.id, 'Roadmap', created_by=member.id)
+    db.session.add_all([member, outsider, workspace, discussion])
+    db.session.add(WorkspaceMember(workspace.id, member.id, 'admin'))
+    db.session.commit()
+    db.session.add(Message(discussion.id, member.id, 'ship the quarterly roadmap'))
+    db.session.commit()
+    ids = {'workspace': workspace.id, 'discussion': discussion.id, 'member': member.id, 'outsider': outsider.id}
+
+    assert archiver.archive(ids['discussion'])['message_count'] == 1
+    assert db.session.get(Discussion, ids['discussion']).archived
+    assert Message.query.count() == 0
+
+    client = app.test_client()
+    def search(user_id):
+        token = create_access_token(identity=user_id)
+        return client.get(
+            f"/api/workspaces/{ids['workspace']}/search", query_string={'q': 'roadmap'},
+            headers={'Authorization': f'Bearer {token}'}
+        )
+
+    assert search(ids['outsider']).status_code == 403
+    db.session.expire_all()
+    assert db.session.get(Discussion, ids['discussion']).archived
+
+    response = search(ids['member'])
+    assert response.status_code == 200
+    assert [result['discussion_id'] for result in response.get_json()['results']] == [ids['discussion']]
+    db.session.expire_all()
+    discussion = db.session.get(Discussion, ids['discussion'])
+    assert not discussion.archived and discussion.status == 'active'
@@ -0,0 +1,25 @@
+import threading
+
+from app.services.ratelimit.rate_limiter import MemoryBucketStore, SQLiteBucketStore
+
+def take_concurrently(store, threads=8, per_thread=50):
+    taken = []
+    lock = threading.Lock()
+
+    def work():
+        granted = sum(1 for _ in range(per_thread) if store.take('user:write', 100, 0.001, 1000.0) == 0)
+        with lock:
+            taken.append(granted)
+
+    workers = [threading.Thread(target=work) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return sum(taken)
+
+def test_memory_bucket_grants_exactly_its_capacity():
+    assert take_concurrently(MemoryBucketStore()) == 100
+
+def test_sqlite_bucket_grants_exactly_its_capacity(tmp_path):
+    assert take_concurrently(SQLiteBucketStore(str(tmp_path / 'ratelimit.sqlite'))) == 100
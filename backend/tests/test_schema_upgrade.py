@@ -0,0 +1,105 @@
+import sqlite3
+
+import pytest
+from sqlalchemy import inspect
+from sqlalchemy.exc import IntegrityError
+
+from app import create_app, db
+from app.models.decision import DecisionDocument
+from app.models.discussion import Discussion, Message
+from app.services.sync.delta_sync import DeltaSync
+from config import TestingConfig
+
+# Tables as the first release's create_all left them on SQLite
+BASELINE_DDL = """
+CREATE TABLE users (
+    id VARCHAR(36) NOT NULL PRIMARY KEY, username VARCHAR(100) NOT NULL UNIQUE,
+    email VARCHAR(255) NOT NULL UNIQUE, password_hash VARCHAR(255) NOT NULL,
+    created_at DATETIME, updated_at DATETIME
+);
+CREATE TABLE workspaces (
+    id VARCHAR(36) NOT NULL PRIMARY KEY, name VARCHAR(100) NOT NULL, description TEXT,
+    created_by VARCHAR(36) REFERENCES users (id), created_at DATETIME, updated_at DATETIME
+);
+CREATE TABLE workspace_members (
+    workspace_id VARCHAR(36) NOT NULL REFERENCES workspaces (id),
+    user_id VARCHAR(36) NOT NULL REFERENCES users (id),
+    role VARCHAR(50) NOT NULL, joined_at DATETIME,
+    PRIMARY KEY (workspace_id, user_id)
+);
+CREATE TABLE discussions (
+    id VARCHAR(36) NOT NULL PRIMARY KEY, workspace_id VARCHAR(36) NOT NULL REFERENCES workspaces (id),
+    title VARCHAR(200) NOT NULL, description TEXT, status VARCHAR(50),
+    created_by VARCHAR(36) REFERENCES users (id), created_at DATETIME, updated_at DATETIME
+);
+CREATE TABLE messages (
+    id VARCHAR(36) NOT NULL PRIMARY KEY, discussion_id VARCHAR(36) NOT NULL REFERENCES discussions (id),
+    parent_id VARCHAR(36) REFERENCES messages (id), user_id VARCHAR(36) NOT NULL REFERENCES users (id),
+    content TEXT NOT NULL, created_at DATETIME, updated_at DATETIME
+);
+CREATE TABLE message_analysis (
+    id VARCHAR(36) NOT NULL PRIMARY KEY, message_id VARCHAR(36) NOT NULL UNIQUE REFERENCES messages (id),
+    sentiment_score FLOAT, perspective_vector TEXT, detected_biases TEXT, analyzed_at DATETIME
+);
+CREATE TABLE decision_processes (
+    id VARCHAR(36) NOT NULL PRIMARY KEY, discussion_id VARCHAR(36) NOT NULL REFERENCES discussions (id),
+    title VARCHAR(200) NOT NULL, status VARCHAR(50), process_template VARCHAR(100),
+    started_at DATETIME, completed_at DATETIME
+);
+CREATE TABLE decision_documents (
+    id VARCHAR(36) NOT NULL PRIMARY KEY, process_id VARCHAR(36) NOT NULL REFERENCES decision_processes (id),
+    title VARCHAR(200) NOT NULL, content TEXT NOT NULL, version INTEGER,
+    created_at DATETIME, updated_at DATETIME
+);
+
+INSERT INTO users VALUES ('u1', 'alice', 'alice@example.com', '!', '2024-01-01 00:00:00', '2024-01-01 00:00:00');
+INSERT INTO workspaces VALUES ('w1', 'Team', '', 'u1', '2024-01-01 00:00:00', '2024-01-01 00:00:00');
+INSERT INTO workspace_members VALUES ('w1', 'u1', 'admin', '2024-01-01 00:00:00');
+INSERT INTO discussions VALUES ('d1', 'w1', 'Roadmap', '', 'active', 'u1', '2024-01-01 00:00:00', '2024-01-01 00:00:00');
+INSERT INTO messages VALUES ('m1', 'd1', NULL, 'u1', 'first', '2024-01-02 00:00:00', '2024-01-02 00:00:00');
+INSERT INTO messages VALUES ('m2', 'd1', 'm1', 'u1', 'reply', '2024-01-03 00:00:00', '2024-01-03 00:00:00');
+INSERT INTO message_analysis VALUES ('a1', 'm1', 0.5, NULL, NULL, '2024-01-04 00:00:00');
+INSERT INTO decision_processes VALUES ('p1', 'd1', 'Pick', 'active', NULL, '2024-01-01 00:00:00', NULL);
+INSERT INTO decision_documents VALUES ('doc1', 'p1', 'Plan', 'v1', 1, '2024-01-01 00:00:00', '2024-01-01 00:00:00');
+"""
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    path = tmp_path / 'baseline.db'
+    conn = sqlite3.connect(path)
+    conn.executescript(BASELINE_DDL)
+    conn.close()
+
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{path}")
+    app = create_app('testing')
+    with app.app_context():
+        yield app
+        db.session.remove()
+
+def test_startup_upgrades_a_baseline_database(app):
+    inspector = inspect(db.engine)
+    columns = {table: {column['name'] for column in inspector.get_columns(table)} for table in (
+        'discussions', 'messages', 'message_analysis', 'workspace_members', 'decision_documents'
+    )}
+    assert {'last_seq', 'last_message_at', 'archived'} <= columns['discussions']
+    assert {'seq', 'change_seq'} <= columns['messages']
+    assert {'discussion_id', 'change_seq'} <= columns['message_analysis']
+    assert 'last_read_at' in columns['workspace_members']
+    assert {'delta', 'is_snapshot'} <= columns['decision_documents']
+
+    discussion = db.session.get(Discussion, 'd1')
+    assert discussion.last_seq == 3
+    assert discussion.archived is False
+    page = DeltaSync(discussion).changes_since(0)
+    assert [message['id'] for message in page['messages']] == ['m1', 'm2']
+    assert Message.query.filter(Message.change_seq.is_(None)).count() == 0
+
+    # Existing documents hold their full text
+    assert db.session.get(DecisionDocument, 'doc1').is_snapshot is True
+
+    # Version numbers are unique from now on
+    duplicate = DecisionDocument(process_id='p1', title='Plan', content='v1 again', version=1)
+    db.session.add(duplicate)
+    with pytest.raises(IntegrityError):
+        db.session.commit()
+    db.session.rollback()
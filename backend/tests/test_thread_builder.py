@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import create_app, db
+from app.models.discussion import Discussion, Message
+from app.models.user import User
+from app.models.workspace import Workspace
+from app.services.threads.thread_builder import ThreadBuilder
+from config import TestingConfig
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'threads.db'}")
+    app = create_app('testing')
+    with app.app_context():
+        yield app
+        db.session.remove()
+
+def test_replies_are_paged_per_parent(app):
+    user = User('alice', 'alice@example.com', 'password')
+    workspace = Workspace('Team', created_by=user.id)
+    discussion = Discussion(workspace.id, 'Roadmap', created_by=user.id)
+    db.session.add_all([user, workspace, discussion])
+    db.session.commit()
+
+    started = datetime(2024, 1, 1)
+    root = Message(discussion.id, user.id, 'root')
+    root.created_at = started
+    replies = []
+    for i in range(5):
+        reply = Message(discussion.id, user.id, f"reply {i}", parent_id=root.id)
+        reply.created_at = started + timedelta(minutes=i + 1)
+        replies.append(reply)
+    nested = Message(discussion.id, user.id, 'nested', parent_id=replies[3].id)
+    nested.created_at = started + timedelta(minutes=10)
+    db.session.add_all([root, *replies, nested])
+    db.session.commit()
+
+    thread = ThreadBuilder(max_depth=1, limit=2).message_thread(root.id, offset=2)
+
+    assert thread['reply_count'] == 5
+    assert thread['has_more_replies']
+    assert [reply['content'] for reply in thread['replies']] == ['reply 2', 'reply 3']
+    # Replies below max_depth are counted, not loaded
+    assert thread['replies'][1]['reply_count'] == 1
+    assert thread['replies'][1]['has_more_replies']
+    assert thread['replies'][1]['replies'] == []
+
+    page = ThreadBuilder(max_depth=2, limit=2).discussion_thread(discussion.id)
+    assert [reply['content'] for reply in page['messages'][0]['replies']] == ['reply 0', 'reply 1']
@@ -0,0 +1,131 @@
+import uuid
+from datetime import datetime
+
+import pytest
+from sqlalchemy import func, select
+
+from app import create_app, db, group_commit, shard_router
+from app.models.analysis import MessageAnalysis
+from app.models.decision import DecisionDocument, DecisionProcess, DecisionStage
+from app.models.discussion import Discussion, Message
+from app.models.shard import WorkspaceShard
+from app.models.user import User
+from app.models.workspace import Workspace
+from app.services.database import workspace_mover
+from app.services.database.sharding import WorkspaceMoving
+from app.services.database.workspace_mover import WorkspaceMover
+from config import TestingConfig
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'primary.db'}")
+    monkeypatch.setattr(TestingConfig, 'SHARDS', {'a': f"sqlite:///{tmp_path / 'a.db'}"})
+    monkeypatch.setattr(TestingConfig, 'SQLITE_PRAGMAS', dict(TestingConfig.SQLITE_PRAGMAS, foreign_keys='ON'))
+    app = create_app('testing')
+    with app.app_context():
+        yield app
+        db.session.remove()
+
+def count(shard, table):
+    with shard_router.engine(shard).connect() as conn:
+        return conn.execute(select(func.count()).select_from(db.metadata.tables[table])).scalar()
+
+def test_move_with_foreign_keys_and_writes_during_freeze(app, monkeypatch):
+    user = User('alice', 'alice@example.com', 'password')
+    workspace = Workspace('Team', created_by=user.id)
+    discussion = Discussion(workspace.id, 'Roadmap', created_by=user.id)
+    db.session.add_all([user, workspace, discussion])
+    db.session.commit()
+    shard_router.replicate_user(user)
+
+    first = Message(discussion.id, user.id, 'first')
+    db.session.add(first)
+    db.session.commit()
+    reply = Message(discussion.id, user.id, 'reply', parent_id=first.id)
+    doomed = Message(discussion.id, user.id, 'removed during the move')
+    process = DecisionProcess(discussion.id, 'Pick a plan')
+    db.session.add_all([reply, doomed, process])
+    db.session.commit()
+    db.session.add_all([
+        MessageAnalysis(first.id, 0.5), MessageAnalysis(doomed.id, 0.1),
+        DecisionStage(process.id, 'Diverge', 'Collect options', 0),
+        DecisionDocument(process.id, 'Plan', 'v1')
+    ])
+    db.session.commit()
+    ids = {'discussion': discussion.id, 'first': first.id, 'reply': reply.id, 'doomed': doomed.id, 'user': user.id}
+
+    def write_during_freeze(seconds):
+        # Queued writes are held back while the workspace is read-only
+        with pytest.raises(WorkspaceMoving):
+            shard_router.write_shard(workspace.id)
+
+        # Writes that committed just after the freeze still reach the target
+        db.session.get(Discussion, ids['discussion']).title = 'Roadmap 2'
+        db.session.get(Message, ids['first']).content = 'first, edited'
+        db.session.add(Message(ids['discussion'], ids['user'], 'late reply', parent_id=ids['reply']))
+        MessageAnalysis.query.filter_by(message_id=ids['doomed']).delete()
+        db.session.delete(db.session.get(Message, ids['doomed']))
+        db.session.commit()
+
+    monkeypatch.setattr(workspace_mover.time, 'sleep', write_during_freeze)
+    counts = WorkspaceMover(shard_router, workspace.id, 'a', batch_size=1, grace=0, log=lambda line: None).run()
+
+    assert counts['messages'] == 3
+    assert counts['message_analysis'] == 1
+    assert db.session.get(WorkspaceShard, workspace.id).shard == 'a'
+    assert shard_router.write_shard(workspace.id) == 'a'
+    for table in ('discussions', 'messages', 'message_analysis', 'decision_processes', 'decision_stages'):
+        assert count('default', table) == 0
+
+    db.session.remove()
+    with shard_router.use('a'):
+        assert db.session.get(Discussion, ids['discussion']).title == 'Roadmap 2'
+        assert db.session.get(Message, ids['first']).content == 'first, edited'
+        assert db.session.get(Message, ids['doomed']) is None
+        assert Message.query.filter_by(content='late reply').one().parent_id == ids['reply']
+    db.session.remove()
+
+    # Re-copying the user to the shard updates the row its messages reference
+    user = db.session.get(User, ids['user'])
+    user.username = 'alice2'
+    db.session.commit()
+    shard_router.replicate_user(user)
+    with shard_router.engine('a').connect() as conn:
+        assert conn.execute(select(User.username).where(User.id == ids['user'])).scalar() == 'alice2'
+
+def test_group_commit_routes_by_the_directory_at_write_time(app):
+    user = User('bob', 'bob@example.com', 'password')
+    workspace = Workspace('Team', created_by=user.id)
+    db.session.add_all([user, workspace])
+    assert shard_router.assign_new_workspace(workspace.id) == 'a'
+    db.session.commit()
+    shard_router.replicate_user(user)
+    with shard_router.use('a'):
+        discussion = Discussion(workspace.id, 'Roadmap', created_by=user.id)
+        db.session.add(discussion)
+        db.session.commit()
+        discussion_id = discussion.id
+
+    def submit(content):
+        now = datetime.utcnow()
+        return group_commit.submit({
+            'id': str(uuid.uuid4()), 'discussion_id': discussion_id, 'parent_id': None,
+            'user_id': user.id, 'content': content, 'created_at': now, 'updated_at': now
+        })
+
+    entry = db.session.get(WorkspaceShard, workspace.id)
+    entry.status = 'readonly'
+    db.session.commit()
+    with pytest.raises(WorkspaceMoving):
+        submit('held back').result(timeout=5)
+
+    entry.status = 'active'
+    db.session.commit()
+    futures = [submit(f"message {i}") for i in range(20)]
+    results = [future.result(timeout=5) for future in futures]
+
+    assert len({result['id'] for result in results}) == 20
+    assert count('default', 'messages') == 0
+    with shard_router.engine('a').connect() as conn:
+        seqs = conn.execute(select(Message.seq).where(Message.discussion_id == discussion_id)).scalars().all()
+    assert sorted(seqs) == list(range(1, 21))